@@ -1,10 +1,17 @@
 import os
 import time
-import json
 from web3 import Web3
 from dotenv import load_dotenv
+from chain_monitor import ChainMonitor, ChainChange
+from campaign_indexer import DEFAULT_DB_PATH
+from contract_abi import CROWDFUNDING_ABI
+from contract_agent import ContractAgent
+from rpc_batch import ChainReader
+from tx_manager import TransactionManager
+from contract_state import STATE_DIR
+from fee_estimator import FeeEstimator
 
-# --- 1. CONFIGURATION AND SETUP ---
+# --- 1. CONFIGURATION ---
 
 # Load environment variables from .env file
 load_dotenv()
@@ -12,458 +19,180 @@ load_dotenv()
 PROVIDER_URL = os.getenv("PROVIDER_URL")
 AGENT_PRIVATE_KEY = os.getenv("AGENT_PRIVATE_KEY")
 CROWDFUNDING_CONTRACT_ADDRESS = os.getenv("CROWDFUNDING_CONTRACT_ADDRESS")
-
-# Check if configuration is loaded
-if not all([PROVIDER_URL, AGENT_PRIVATE_KEY, CROWDFUNDING_CONTRACT_ADDRESS]):
-    raise Exception("Please create a .env file and set PROVIDER_URL, AGENT_PRIVATE_KEY, and CROWDFUNDING_CONTRACT_ADDRESS")
-
-# Initialize Web3
-w3 = Web3(Web3.HTTPProvider(PROVIDER_URL))
-agent_account = w3.eth.account.from_key(AGENT_PRIVATE_KEY)
-
-print(f"Agent started successfully.")
-print(f"Connected to blockchain: {w3.is_connected()}")
-print(f"Agent Wallet Address: {agent_account.address}")
-
-
-# --- 2. SMART CONTRACT ABI ---
-
-#
-# >>>>> CRITICAL ACTION REQUIRED <<<<<
-# YOU MUST REPLACE THE ABI BELOW WITH THE ABI FROM YOUR NEWLY DEPLOYED CONTRACT.
-# THE CORRECT ABI WILL INCLUDE THE "invest" AND "reclaim" FUNCTIONS.
-# GET THIS FROM THE COMPILER TAB IN REMIX AFTER YOU DEPLOY.
-#
-
-CROWDFUNDING_ABI = """
-[
-  {
-    "inputs": [
-      {
-        "internalType": "address",
-        "name": "_wethGatewayAddress",
-        "type": "address"
-      },
-      {
-        "internalType": "address",
-        "name": "_aavePoolAddress",
-        "type": "address"
-      }
-    ],
-    "stateMutability": "nonpayable",
-    "type": "constructor"
-  },
-  {
-    "anonymous": false,
-    "inputs": [
-      {
-        "indexed": false,
-        "internalType": "uint256",
-        "name": "amount",
-        "type": "uint256"
-      }
-    ],
-    "name": "FundsInvested",
-    "type": "event"
-  },
-  {
-    "anonymous": false,
-    "inputs": [
-      {
-        "indexed": false,
-        "internalType": "uint256",
-        "name": "amount",
-        "type": "uint256"
-      }
-    ],
-    "name": "FundsReclaimed",
-    "type": "event"
-  },
-  {
-    "inputs": [],
-    "name": "aavePool",
-    "outputs": [
-      {
-        "internalType": "address",
-        "name": "",
-        "type": "address"
-      }
-    ],
-    "stateMutability": "view",
-    "type": "function"
-  },
-  {
-    "inputs": [
-      {
-        "internalType": "uint256",
-        "name": "",
-        "type": "uint256"
-      }
-    ],
-    "name": "campaigns",
-    "outputs": [
-      {
-        "internalType": "address",
-        "name": "owner",
-        "type": "address"
-      },
-      {
-        "internalType": "string",
-        "name": "title",
-        "type": "string"
-      },
-      {
-        "internalType": "string",
-        "name": "description",
-        "type": "string"
-      },
-      {
-        "internalType": "uint256",
-        "name": "target",
-        "type": "uint256"
-      },
-      {
-        "internalType": "uint256",
-        "name": "deadline",
-        "type": "uint256"
-      },
-      {
-        "internalType": "uint256",
-        "name": "amountCollected",
-        "type": "uint256"
-      },
-      {
-        "internalType": "string",
-        "name": "image",
-        "type": "string"
-      },
-      {
-        "internalType": "bool",
-        "name": "claimed",
-        "type": "bool"
-      }
-    ],
-    "stateMutability": "view",
-    "type": "function"
-  },
-  {
-    "inputs": [
-      {
-        "internalType": "uint256",
-        "name": "_id",
-        "type": "uint256"
-      }
-    ],
-    "name": "claimFunds",
-    "outputs": [],
-    "stateMutability": "nonpayable",
-    "type": "function"
-  },
-  {
-    "inputs": [
-      {
-        "internalType": "address",
-        "name": "_owner",
-        "type": "address"
-      },
-      {
-        "internalType": "string",
-        "name": "_title",
-        "type": "string"
-      },
-      {
-        "internalType": "string",
-        "name": "_description",
-        "type": "string"
-      },
-      {
-        "internalType": "uint256",
-        "name": "_target",
-        "type": "uint256"
-      },
-      {
-        "internalType": "uint256",
-        "name": "_deadline",
-        "type": "uint256"
-      },
-      {
-        "internalType": "string",
-        "name": "_image",
-        "type": "string"
-      }
-    ],
-    "name": "createCampaign",
-    "outputs": [
-      {
-        "internalType": "uint256",
-        "name": "",
-        "type": "uint256"
-      }
-    ],
-    "stateMutability": "nonpayable",
-    "type": "function"
-  },
-  {
-    "inputs": [
-      {
-        "internalType": "uint256",
-        "name": "_id",
-        "type": "uint256"
-      }
-    ],
-    "name": "donateToCampaign",
-    "outputs": [],
-    "stateMutability": "payable",
-    "type": "function"
-  },
-  {
-    "inputs": [],
-    "name": "getCampaigns",
-    "outputs": [
-      {
-        "components": [
-          {
-            "internalType": "address",
-            "name": "owner",
-            "type": "address"
-          },
-          {
-            "internalType": "string",
-            "name": "title",
-            "type": "string"
-          },
-          {
-            "internalType": "string",
-            "name": "description",
-            "type": "string"
-          },
-          {
-            "internalType": "uint256",
-            "name": "target",
-            "type": "uint256"
-          },
-          {
-            "internalType": "uint256",
-            "name": "deadline",
-            "type": "uint256"
-          },
-          {
-            "internalType": "uint256",
-            "name": "amountCollected",
-            "type": "uint256"
-          },
-          {
-            "internalType": "string",
-            "name": "image",
-            "type": "string"
-          },
-          {
-            "internalType": "address[]",
-            "name": "donators",
-            "type": "address[]"
-          },
-          {
-            "internalType": "uint256[]",
-            "name": "donations",
-            "type": "uint256[]"
-          },
-          {
-            "internalType": "bool",
-            "name": "claimed",
-            "type": "bool"
-          }
-        ],
-        "internalType": "struct CrowdFunding.Campaign[]",
-        "name": "",
-        "type": "tuple[]"
-      }
-    ],
-    "stateMutability": "view",
-    "type": "function"
-  },
-  {
-    "inputs": [
-      {
-        "internalType": "uint256",
-        "name": "_id",
-        "type": "uint256"
-      }
-    ],
-    "name": "getDonators",
-    "outputs": [
-      {
-        "internalType": "address[]",
-        "name": "",
-        "type": "address[]"
-      },
-      {
-        "internalType": "uint256[]",
-        "name": "",
-        "type": "uint256[]"
-      }
-    ],
-    "stateMutability": "view",
-    "type": "function"
-  },
-  {
-    "inputs": [],
-    "name": "invest",
-    "outputs": [],
-    "stateMutability": "payable",
-    "type": "function"
-  },
-  {
-    "inputs": [],
-    "name": "numberofCampaigns",
-    "outputs": [
-      {
-        "internalType": "uint256",
-        "name": "",
-        "type": "uint256"
-      }
-    ],
-    "stateMutability": "view",
-    "type": "function"
-  },
-  {
-    "inputs": [],
-    "name": "owner",
-    "outputs": [
-      {
-        "internalType": "address",
-        "name": "",
-        "type": "address"
-      }
-    ],
-    "stateMutability": "view",
-    "type": "function"
-  },
-  {
-    "inputs": [
-      {
-        "internalType": "uint256",
-        "name": "amount",
-        "type": "uint256"
-      }
-    ],
-    "name": "reclaim",
-    "outputs": [],
-    "stateMutability": "nonpayable",
-    "type": "function"
-  },
-  {
-    "inputs": [
-      {
-        "internalType": "uint256",
-        "name": "_id",
-        "type": "uint256"
-      }
-    ],
-    "name": "refundDonors",
-    "outputs": [],
-    "stateMutability": "nonpayable",
-    "type": "function"
-  },
-  {
-    "inputs": [],
-    "name": "wethGateway",
-    "outputs": [
-      {
-        "internalType": "contract IWETHGateway",
-        "name": "",
-        "type": "address"
-      }
-    ],
-    "stateMutability": "view",
-    "type": "function"
-  }
-]
-"""
-
-
-# Create contract instance
-crowdfunding_contract = w3.eth.contract(address=CROWDFUNDING_CONTRACT_ADDRESS, abi=CROWDFUNDING_ABI)
+# "events" follows new blocks and contract events; "poll" is the old fixed 60-second balance check
+MONITOR_MODE = os.getenv("MONITOR_MODE", "events")
+CAMPAIGN_DB_PATH = os.getenv("CAMPAIGN_DB_PATH", DEFAULT_DB_PATH)
+# Block the contract was deployed in; the first index sync reads events from here
+CONTRACT_START_BLOCK = int(os.getenv("CONTRACT_START_BLOCK", "0"))
+# How hard to bid for inclusion (low / medium / high), and an optional ceiling on the max fee
+FEE_URGENCY = os.getenv("FEE_URGENCY", "medium")
+MAX_FEE_GWEI = os.getenv("MAX_FEE_GWEI")
+# Invest/reclaim state and transactions in flight, kept across restarts
+AGENT_STATE_PATH = os.getenv("AGENT_STATE_PATH", os.path.join(STATE_DIR, "agent.json"))
+
+
+# --- 2. SETUP ---
+
+# Built by setup(), from .env or from what the caller passes in (e.g. simulate.py's dev chain)
+w3 = None
+agent_account = None
+crowdfunding_contract = None
+chain_reader = None
+fee_estimator = None
+tx_manager = None
+contract_agent = None
+clock = time.time
+
+def connect(provider_url):
+    """
+    Web3 for `provider_url` (a ws:// or wss:// URL keeps one connection open instead of one HTTP request per call).
+    cache_allowed_requests keeps web3 from asking for eth_chainId again before every call.
+    """
+    if provider_url.startswith("ws"):
+        return Web3(Web3.LegacyWebSocketProvider(provider_url, cache_allowed_requests=True))
+    return Web3(Web3.HTTPProvider(provider_url, cache_allowed_requests=True))
+
+def setup(web3=None, account=None, contract_address=None, clock_func=time.time,
+          db_path=CAMPAIGN_DB_PATH, state_path=AGENT_STATE_PATH):
+    """
+    Builds the agent on `web3` (default: a connection to PROVIDER_URL) with `account` (default:
+    AGENT_PRIVATE_KEY), reading the time from `clock_func`. Nothing connects until this is called.
+    """
+    global w3, agent_account, crowdfunding_contract, chain_reader, fee_estimator, tx_manager, contract_agent, clock
+    contract_address = contract_address or CROWDFUNDING_CONTRACT_ADDRESS
+    if (web3 is None and not PROVIDER_URL) or (account is None and not AGENT_PRIVATE_KEY) or not contract_address:
+        raise Exception("Please create a .env file and set PROVIDER_URL, AGENT_PRIVATE_KEY, and CROWDFUNDING_CONTRACT_ADDRESS")
+
+    w3 = web3 if web3 is not None else connect(PROVIDER_URL)
+    agent_account = account or w3.eth.account.from_key(AGENT_PRIVATE_KEY)
+    clock = clock_func
+    print(f"Agent started successfully.")
+    print(f"Connected to blockchain: {w3.is_connected()}")
+    print(f"Agent Wallet Address: {agent_account.address}")
+
+    # The ABI lives in contract_abi.py so the indexer, the batched reader and the dev chain can share it.
+    crowdfunding_contract = w3.eth.contract(address=contract_address, abi=CROWDFUNDING_ABI)
+
+    # Batched reads: one round-trip per check cycle, Multicall3 for per-campaign reads
+    chain_reader = ChainReader(w3, crowdfunding_contract, agent_account.address)
+
+    # Fees from recent blocks (eth_feeHistory) and gas limits from cached estimate_gas calls
+    max_fee_cap = w3.to_wei(float(MAX_FEE_GWEI), 'gwei') if MAX_FEE_GWEI else None
+    fee_estimator = FeeEstimator(w3, urgency=FEE_URGENCY, max_fee_cap=max_fee_cap)
+
+    # Local nonces and background receipt tracking, so transactions don't block the loop
+    tx_manager = TransactionManager(w3, agent_account, reader=chain_reader, max_fee_cap=max_fee_cap, fee_estimator=fee_estimator)
+
+    # The invest/reclaim/refund rules, with a local copy of campaign state (so deadline questions
+    # don't need RPC calls), the deadline scheduler and the idle / investing / invested / reclaiming
+    # state persisted to disk. runtime.py runs the same ContractAgent for many contracts.
+    contract_agent = ContractAgent("agent", w3, agent_account, crowdfunding_contract.address, tx_manager,
+                                   db_path, state_path, start_block=CONTRACT_START_BLOCK, reader=chain_reader, clock=clock)
+    return contract_agent
 
 
 # --- 3. AGENT'S CORE LOGIC ---
 
-def send_transaction(txn):
-    """Signs and sends a transaction, then waits for the receipt."""
-    signed_txn = w3.eth.account.sign_transaction(txn, private_key=AGENT_PRIVATE_KEY)
-    tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-    print(f"Transaction sent with hash: {tx_hash.hex()}")
-    print("Waiting for transaction receipt...")
-    tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
-    print(f"Transaction successful! Block: {tx_receipt.blockNumber}")
-    return tx_receipt
-
 def call_invest_function():
     """Tells the smart contract to invest its own funds."""
-    print(">>> Condition met. Telling contract to invest funds...")
-    try:
-        txn = crowdfunding_contract.functions.invest().build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 350000,
-            'maxFeePerGas': w3.to_wei(20, 'gwei'),
-            'maxPriorityFeePerGas': w3.to_wei(2, 'gwei'),
-            'chainId': w3.eth.chain_id
-        })
-        send_transaction(txn)
-        return True
-    except Exception as e:
-        print(f"!!! Error calling invest function: {e}")
-        return False
+    return contract_agent.invest()
 
 def call_reclaim_function(amount_to_reclaim):
     """Tells the smart contract to reclaim its funds from Aave."""
-    print(f">>> Deadline approaching. Telling contract to reclaim {w3.from_wei(amount_to_reclaim, 'ether')} ETH...")
-    try:
-        txn = crowdfunding_contract.functions.reclaim(amount_to_reclaim).build_transaction({
-            'from': agent_account.address,
-            'nonce': w3.eth.get_transaction_count(agent_account.address),
-            'gas': 400000,
-            'maxFeePerGas': w3.to_wei(20, 'gwei'),
-            'maxPriorityFeePerGas': w3.to_wei(2, 'gwei'),
-            'chainId': w3.eth.chain_id
-        })
-        send_transaction(txn)
-    except Exception as e:
-        print(f"!!! Error calling reclaim function: {e}")
+    return contract_agent.reclaim(amount_to_reclaim)
 
+def call_refund_function(campaign_id):
+    """Tells the smart contract to refund the donors of a campaign that missed its target."""
+    return contract_agent.refund(campaign_id)
+
+
+def run_check_cycle(contract_balance_wei, block_number=None, nonce=None):
+    """Applies the invest/reclaim/refund rules to the current balance; the outcome is kept in the contract state."""
+    print(f"Crowdfunding contract balance: {w3.from_wei(contract_balance_wei, 'ether')} ETH")
+    if nonce is not None:
+        # Picks up transactions sent with the same key from elsewhere
+        tx_manager.nonces.observe(nonce)
+
+    synced = contract_agent.cycle(contract_balance_wei, block_number)
+    print(f"Campaign index at block {synced['block']}: {synced['new']} new, {synced['refreshed']} updated.")
+    if tx_manager.take_finished():
+        fee_estimator.print_report()
+
+    scheduler = contract_agent.scheduler
+    next_action = scheduler.next_due()
+    if next_action is not None:
+        print(f"Next scheduled action: {next_action.kind} for campaign {next_action.campaign_id} "
+              f"in {scheduler.seconds_until_next(now=clock()):.0f} s.")
+
+
+def polling_step():
+    """One check cycle of polling_loop. Returns how long to sleep before the next one."""
+    print("\n--- Running Check Cycle ---")
+    # Balance, block and nonce in a single batched request
+    snapshot = chain_reader.snapshot()
+    run_check_cycle(snapshot.contract_balance, snapshot.block_number, snapshot.agent_nonce)
+    print("--- Check Cycle Complete ---")
+    return contract_agent.scheduler.seconds_until_next(now=clock(), max_sleep=60)
 
-def main_loop():
-    """The main monitoring loop for the agent."""
-    INVESTMENT_THRESHOLD_WEI = w3.to_wei(0.01, 'ether')
-    # Simple state management: track if funds are currently invested
-    funds_are_invested = False
 
+def polling_loop():
+    """The original monitoring loop: check the balance every 60 seconds (sooner if a scheduled action is due)."""
     while True:
         try:
-            print("\n--- Running Check Cycle ---")
-            
-            contract_balance_wei = w3.eth.get_balance(CROWDFUNDING_CONTRACT_ADDRESS)
-            print(f"Crowdfunding contract balance: {w3.from_wei(contract_balance_wei, 'ether')} ETH")
-
-            # --- INVESTMENT LOGIC ---
-            if not funds_are_invested and contract_balance_wei >= INVESTMENT_THRESHOLD_WEI:
-                if call_invest_function():
-                    funds_are_invested = True  # Update state only after a successful call
-
-            # --- RECLAIM LOGIC ---
-            # This is simplified. A real agent would check campaign deadlines to decide when to reclaim.
-            if funds_are_invested and contract_balance_wei < w3.to_wei(0.001, 'ether'):
-                 print("Funds are invested. In a real scenario, you would check deadlines to reclaim.")
-                 # When ready, you can uncomment and adapt the line below:
-                 # call_reclaim_function(INVESTMENT_THRESHOLD_WEI)
-                 # funds_are_invested = False
-            
-            print("--- Check Cycle Complete ---")
+            time.sleep(polling_step())
+        except Exception as e:
+            print(f"An error occurred in the main loop: {e}")
             time.sleep(60)
 
+
+def start_monitor():
+    """A ChainMonitor on the contract, started. Returns (monitor, the initial ChainChange)."""
+    monitor = ChainMonitor(w3, crowdfunding_contract, reader=chain_reader)
+    return monitor, monitor.start()
+
+
+def event_step(monitor, change=None, timeout=None):
+    """
+    One pass of event_loop: waits up to `timeout` seconds for a change (unless one is given), then
+    runs a check cycle if something changed or a scheduled action is due. Returns whether it ran one.
+    """
+    if change is None:
+        change = monitor.wait_for_change(timeout=timeout)
+    if change is None:
+        if contract_agent.scheduler.seconds_until_next(now=clock()) > 0:
+            return False
+        # Nothing happened on chain, but a reclaim/refund is due
+        change = ChainChange(monitor.last_block, monitor.last_balance, [])
+    print(f"\n--- Running Check Cycle (block {change.block_number}) ---")
+    for event in change.events:
+        print(f"Event {event.name}: {w3.from_wei(event.amount, 'ether')} ETH in block {event.block_number}")
+    nonce = monitor.last_snapshot.agent_nonce if monitor.last_snapshot else None
+    run_check_cycle(change.balance, change.block_number, nonce)
+    print("--- Check Cycle Complete ---")
+    return True
+
+
+def event_loop():
+    """Re-evaluates when a new block changes the balance, a FundsInvested/FundsReclaimed event fires, or a scheduled action is due."""
+    monitor, change = start_monitor()
+    while True:
+        try:
+            event_step(monitor, change, timeout=contract_agent.scheduler.seconds_until_next(now=clock()))
         except Exception as e:
             print(f"An error occurred in the main loop: {e}")
-            time.sleep(60)
+            time.sleep(monitor.min_interval)
+        change = None
+
+
+def main_loop():
+    """The main monitoring loop for the agent. Sets it up from .env unless setup() was called first."""
+    if contract_agent is None:
+        setup()
+    tx_manager.start_tracking()
+    if MONITOR_MODE == "poll":
+        polling_loop()
+    else:
+        event_loop()
 
 if __name__ == "__main__":
-    main_loop()
\ No newline at end of file
+    main_loop()
@@ -0,0 +1,246 @@
+import os
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+
+# --- 1. CONFIGURATION ---
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "campaigns.sqlite")
+
+# Scanning blocks for calls to the contract is cheap for short gaps. After a long
+# downtime it is cheaper to just re-read every campaign that is still open.
+MAX_SCAN_BLOCKS = 2000
+# Most providers cap the block range of a single eth_getLogs request
+LOG_CHUNK_BLOCKS = 5000
+
+# Functions whose `_id` argument tells us which campaign a transaction touched
+CAMPAIGN_FUNCTIONS = ("donateToCampaign", "claimFunds", "refundDonors")
+TREASURY_EVENTS = ("FundsInvested", "FundsReclaimed")
+
+Campaign = namedtuple("Campaign", ["id", "owner", "title", "target", "deadline", "amount_collected", "claimed", "synced_block"])
+
+
+# --- 2. THE INDEXER ---
+
+class CampaignIndexer:
+    """
+    Keeps a local SQLite copy of the crowdfunding contract's campaigns.
+
+    `sync()` reads only what changed since the last synced block: new ids past the
+    stored campaign count, campaigns touched by transactions in the new blocks,
+    and FundsInvested / FundsReclaimed logs. The query methods (`expiring_within`,
+    `expired_unclaimed`, ...) answer from the database without any RPC calls.
+    Amounts are stored as decimal text because wei values overflow SQLite integers.
+
+    With a ChainReader, campaign reads go through Multicall3 and block scans
+    through JSON-RPC batches instead of one request each.
+    """
+
+    def __init__(self, w3, contract, db_path=DEFAULT_DB_PATH, start_block=0, max_scan_blocks=MAX_SCAN_BLOCKS, reader=None):
+        self.w3 = w3
+        self.contract = contract
+        self.reader = reader
+        self.db_path = db_path
+        self.start_block = start_block
+        self.max_scan_blocks = max_scan_blocks
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS campaigns (
+                id INTEGER PRIMARY KEY,
+                owner TEXT NOT NULL,
+                title TEXT NOT NULL,
+                target TEXT NOT NULL,
+                deadline INTEGER NOT NULL,
+                amount_collected TEXT NOT NULL,
+                claimed INTEGER NOT NULL,
+                synced_block INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_campaigns_deadline ON campaigns (deadline);
+            CREATE INDEX IF NOT EXISTS idx_campaigns_claimed_deadline ON campaigns (claimed, deadline);
+
+            CREATE TABLE IF NOT EXISTS treasury_events (
+                tx_hash TEXT NOT NULL,
+                log_index INTEGER NOT NULL,
+                block_number INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                amount TEXT NOT NULL,
+                PRIMARY KEY (tx_hash, log_index)
+            );
+
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    # --- Sync state ---
+
+    def _get_state(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def _set_state(self, key, value):
+        self._conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def last_synced_block(self):
+        return self._get_state("last_synced_block")
+
+    # --- Reading from the chain ---
+
+    def _campaign_count(self, block):
+        # The agent's ABI spells the getter `numberofCampaigns`; the Solidity source says `numberOfCampaigns`
+        functions = self.contract.functions
+        getter = functions.numberOfCampaigns if hasattr(functions, "numberOfCampaigns") else functions.numberofCampaigns
+        return getter().call(block_identifier=block)
+
+    def _to_campaign(self, campaign_id, raw, block):
+        owner, title, _description, target, deadline, amount_collected, _image, claimed = raw
+        return Campaign(campaign_id, owner, title, target, deadline, amount_collected, claimed, block)
+
+    def read_campaign(self, campaign_id, block):
+        """Fetches one campaign through the public `campaigns(i)` getter (which skips the donator arrays)."""
+        return self._to_campaign(campaign_id, self.contract.functions.campaigns(campaign_id).call(block_identifier=block), block)
+
+    def read_campaigns(self, campaign_ids, block):
+        if self.reader is None:
+            return [self.read_campaign(i, block) for i in campaign_ids]
+        raw = self.reader.read_campaigns(campaign_ids, block)
+        return [self._to_campaign(i, r, block) for i, r in zip(campaign_ids, raw)]
+
+    def _touched_campaign_ids(self, from_block, to_block):
+        """Ids passed to donate/claim/refund calls in the given block range."""
+        touched = set()
+        address = self.contract.address.lower()
+        numbers = range(from_block, to_block + 1)
+        if self.reader is not None:
+            blocks = self.reader.get_blocks(numbers, full_transactions=True)
+        else:
+            blocks = (self.w3.eth.get_block(number, full_transactions=True) for number in numbers)
+        for block in blocks:
+            for tx in block['transactions']:
+                if not tx.get('to') or tx['to'].lower() != address:
+                    continue
+                try:
+                    function, args = self.contract.decode_function_input(tx['input'])
+                except ValueError:
+                    continue
+                if function.fn_name in CAMPAIGN_FUNCTIONS:
+                    touched.add(args['_id'])
+        return touched
+
+    def _fetch_events(self, from_block, to_block):
+        rows = []
+        for chunk_start in range(from_block, to_block + 1, LOG_CHUNK_BLOCKS):
+            chunk_end = min(to_block, chunk_start + LOG_CHUNK_BLOCKS - 1)
+            for name in TREASURY_EVENTS:
+                for log in getattr(self.contract.events, name).get_logs(from_block=chunk_start, to_block=chunk_end):
+                    rows.append((log['transactionHash'].hex(), log['logIndex'], log['blockNumber'], name, str(log['args']['amount'])))
+        return rows
+
+    # --- Sync ---
+
+    def sync(self):
+        """Brings the local store up to the current head block. Returns a summary dict."""
+        with self._lock:
+            head = self.w3.eth.block_number
+            last = self.last_synced_block
+            if last is not None and last >= head:
+                return {"block": head, "new": 0, "refreshed": 0, "events": 0, "changed": []}
+
+            known_count = self._get_state("campaign_count", 0)
+            count = self._campaign_count(head)
+            new_ids = set(range(known_count, count))
+
+            if last is None:
+                refresh_ids = set()
+                events = self._fetch_events(self.start_block, head)
+            elif head - last > self.max_scan_blocks:
+                # Too far behind to scan block by block; re-read everything still open
+                refresh_ids = {row[0] for row in self._conn.execute("SELECT id FROM campaigns WHERE claimed = 0")}
+                events = self._fetch_events(last + 1, head)
+            else:
+                refresh_ids = self._touched_campaign_ids(last + 1, head)
+                events = self._fetch_events(last + 1, head)
+            refresh_ids = {i for i in refresh_ids if i < count} - new_ids
+
+            campaigns = self.read_campaigns(sorted(new_ids | refresh_ids), head)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO campaigns (id, owner, title, target, deadline, amount_collected, claimed, synced_block) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(c.id, c.owner, c.title, str(c.target), c.deadline, str(c.amount_collected), int(c.claimed), c.synced_block)
+                 for c in campaigns],
+            )
+            self._conn.executemany("INSERT OR IGNORE INTO treasury_events VALUES (?, ?, ?, ?, ?)", events)
+            self._set_state("campaign_count", count)
+            self._set_state("last_synced_block", head)
+            self._conn.commit()
+            return {"block": head, "new": len(new_ids), "refreshed": len(refresh_ids), "events": len(events),
+                    "changed": [c.id for c in campaigns]}
+
+    # --- Local queries (no RPC) ---
+
+    def _rows_to_campaigns(self, rows):
+        return [Campaign(r[0], r[1], r[2], int(r[3]), r[4], int(r[5]), bool(r[6]), r[7]) for r in rows]
+
+    def _query(self, where, params=()):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, owner, title, target, deadline, amount_collected, claimed, synced_block "
+                f"FROM campaigns WHERE {where} ORDER BY deadline", params
+            ).fetchall()
+        return self._rows_to_campaigns(rows)
+
+    def get(self, campaign_id):
+        found = self._query("id = ?", (campaign_id,))
+        return found[0] if found else None
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM campaigns").fetchone()[0]
+
+    def expiring_within(self, hours, now=None):
+        """Unclaimed campaigns whose deadline falls in the next `hours` hours."""
+        now = int(now if now is not None else time.time())
+        return self._query("claimed = 0 AND deadline > ? AND deadline <= ?", (now, now + int(hours * 3600)))
+
+    def expired_unclaimed(self, now=None):
+        """Campaigns past their deadline that were neither claimed nor emptied by a refund."""
+        now = int(now if now is not None else time.time())
+        return self._query("claimed = 0 AND deadline <= ? AND amount_collected != '0'", (now,))
+
+    def open_campaigns(self, now=None):
+        now = int(now if now is not None else time.time())
+        return self._query("claimed = 0 AND deadline > ?", (now,))
+
+    def unpaid_campaigns(self):
+        """Campaigns still holding donations: not claimed and not refunded, whatever their deadline."""
+        return self._query("claimed = 0 AND amount_collected != '0'")
+
+    def payout_liability(self, until, since=None):
+        """
+        Wei the contract must be able to pay out for unpaid campaigns whose deadline is at or
+        before `until` (and after `since`, if given).
+        """
+        if since is None:
+            return sum(c.amount_collected for c in self._query("claimed = 0 AND amount_collected != '0' AND deadline <= ?", (int(until),)))
+        return sum(c.amount_collected for c in self._query("claimed = 0 AND amount_collected != '0' AND deadline > ? AND deadline <= ?",
+                                                           (int(since), int(until))))
+
+    def invested_amount(self):
+        """Principal currently in Aave according to the FundsInvested / FundsReclaimed events (interest not included)."""
+        total = 0
+        for _, name, amount in self.treasury_events():
+            total += amount if name == "FundsInvested" else -amount
+        return max(total, 0)
+
+    def treasury_events(self, since_block=0):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT block_number, name, amount FROM treasury_events WHERE block_number >= ? ORDER BY block_number, log_index",
+                (since_block,),
+            ).fetchall()
+        return [(block_number, name, int(amount)) for block_number, name, amount in rows]
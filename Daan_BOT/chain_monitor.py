@@ -0,0 +1,167 @@
+import time
+from collections import namedtuple
+
+# --- 1. CONFIGURATION ---
+
+MIN_POLL_INTERVAL = 2     # seconds between checks right after something changed
+MAX_POLL_INTERVAL = 60    # ...backing off to this while the chain is quiet
+FILTER_MAX_INTERVAL = 12  # a filter check is one cheap call, so never wait much longer than a block
+BACKOFF_FACTOR = 2.0
+MAX_FILTER_FAILURES = 3   # after this many broken filters in a row, fall back to plain polling
+
+# The contract events that change what the agent should do
+WATCHED_EVENTS = ("FundsInvested", "FundsReclaimed")
+
+ChainChange = namedtuple("ChainChange", ["block_number", "balance", "events"])
+ContractEvent = namedtuple("ContractEvent", ["name", "amount", "block_number", "tx_hash"])
+
+
+# --- 2. THE MONITOR ---
+
+class ChainMonitor:
+    """
+    Follows new blocks through a node block filter, and reports a ChainChange only
+    when the contract balance moved or a FundsInvested / FundsReclaimed event fired.
+    Donations emit no event, so they show up as a balance change on the next block.
+
+    Events are read with eth_getLogs from the block after the last one processed up
+    to the new head, so none are lost when a filter expires, is recreated, or the
+    monitor falls back to polling.
+
+    If the node doesn't support filters (or keeps dropping them), the monitor
+    falls back to polling the block number with an interval that backs off while
+    nothing happens and snaps back to MIN_POLL_INTERVAL after a change.
+
+    With a ChainReader, the block number and balance are read in one batched
+    request, and the latest snapshot (incl. the agent's nonce) is kept in `last_snapshot`.
+    """
+
+    def __init__(self, w3, contract, watch_address=None, use_filters=True,
+                 min_interval=MIN_POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL, backoff=BACKOFF_FACTOR, reader=None):
+        self.w3 = w3
+        self.contract = contract
+        self.watch_address = watch_address or contract.address
+        # The reader's snapshot only covers the contract's own balance
+        self.reader = reader if self.watch_address == contract.address else None
+        self.last_snapshot = None
+        self.use_filters = use_filters
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.last_block = None
+        self.last_balance = None
+        self.last_event_block = None  # events up to and including this block have been reported
+        self._block_filter = None
+        self._filter_failures = 0
+
+    # --- Filters ---
+
+    def _create_filters(self):
+        self._block_filter = self.w3.eth.filter('latest')
+
+    def _drop_filters(self):
+        if self._block_filter is not None:
+            try:
+                self.w3.eth.uninstall_filter(self._block_filter.filter_id)
+            except Exception:
+                pass
+        self._block_filter = None
+
+    @property
+    def mode(self):
+        return "filters" if self.use_filters else "polling"
+
+    def start(self):
+        """Takes the initial snapshot the first change is measured against."""
+        if self.use_filters:
+            try:
+                self._create_filters()
+            except Exception as e:
+                print(f"Node does not support filters ({e}). Falling back to adaptive polling.")
+                self.use_filters = False
+        self.last_block, self.last_balance = self._read_head()
+        self.last_event_block = self.last_block
+        print(f"Chain monitor started in {self.mode} mode at block {self.last_block}.")
+        return ChainChange(self.last_block, self.last_balance, [])
+
+    # --- Checking for changes ---
+
+    def _read_head(self):
+        """Current block number and watched balance."""
+        if self.reader is not None:
+            self.last_snapshot = self.reader.snapshot()
+            return self.last_snapshot.block_number, self.last_snapshot.contract_balance
+        return self.w3.eth.block_number, self.w3.eth.get_balance(self.watch_address)
+
+    def _new_events(self, to_block):
+        """Watched events from the block after the last processed one up to `to_block`, in chain order."""
+        if to_block <= self.last_event_block:
+            return []
+        logs = []
+        for name in WATCHED_EVENTS:
+            for log in getattr(self.contract.events, name).get_logs(from_block=self.last_event_block + 1, to_block=to_block):
+                logs.append((log['blockNumber'], log['logIndex'], name, log))
+        logs.sort(key=lambda row: row[:2])
+        # Only moved on once every event type was read, so a failed call is retried from the same block
+        self.last_event_block = to_block
+        return [ContractEvent(name, log['args']['amount'], log['blockNumber'], log['transactionHash'])
+                for _, _, name, log in logs]
+
+    def poll_once(self):
+        """Checks the chain once. Returns a ChainChange, or None if nothing relevant happened."""
+        if self.use_filters:
+            try:
+                new_blocks = self._block_filter.get_new_entries()
+                self._filter_failures = 0
+            except Exception as e:
+                # Filters expire on some nodes, or vanish when the node restarts
+                self._filter_failures += 1
+                print(f"Filter error ({e}); recreating filters ({self._filter_failures}/{MAX_FILTER_FAILURES}).")
+                self._drop_filters()
+                if self._filter_failures >= MAX_FILTER_FAILURES:
+                    print("Filters keep failing. Switching to adaptive polling.")
+                    self.use_filters = False
+                else:
+                    self._create_filters()
+                return None
+            if not new_blocks:
+                return None
+            block_number, balance = self._read_head()
+        elif self.reader is not None:
+            block_number, balance = self._read_head()
+            if block_number == self.last_block:
+                return None
+        else:
+            block_number = self.w3.eth.block_number
+            if block_number == self.last_block:
+                return None
+            balance = self.w3.eth.get_balance(self.watch_address)
+
+        events = self._new_events(block_number)
+        self.last_block = block_number
+        if balance == self.last_balance and not events:
+            return None
+        self.last_balance = balance
+        return ChainChange(block_number, balance, events)
+
+    def wait_for_change(self, timeout=None):
+        """Blocks until the state changes (returns the ChainChange) or `timeout` seconds pass (returns None)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            change = self.poll_once()
+            if change is not None:
+                self.interval = self.min_interval
+                return change
+            ceiling = min(self.max_interval, FILTER_MAX_INTERVAL) if self.use_filters else self.max_interval
+            self.interval = min(ceiling, self.interval * self.backoff)
+            sleep_for = self.interval
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                sleep_for = min(sleep_for, remaining)
+            time.sleep(sleep_for)
+
+    def stop(self):
+        self._drop_filters()
@@ -0,0 +1,52 @@
+import pytest
+from eth_account import Account
+from web3 import Web3
+
+from contract_abi import CROWDFUNDING_ABI
+from dev_chain import DevChain, DevChainProvider
+
+START_TIME = 1_800_000_000
+DAY = 86400
+
+
+@pytest.fixture
+def owner():
+    return Account.create()
+
+
+@pytest.fixture
+def chain(owner):
+    chain = DevChain(CROWDFUNDING_ABI, owner.address, start_time=START_TIME)
+    chain.fund(owner.address, 10 ** 21)
+    return chain
+
+
+@pytest.fixture
+def w3(chain):
+    return Web3(DevChainProvider(chain, cache_allowed_requests=True))
+
+
+@pytest.fixture
+def contract(w3, chain):
+    return w3.eth.contract(address=chain.contract_address, abi=CROWDFUNDING_ABI)
+
+
+@pytest.fixture
+def create_campaign(chain, contract):
+    """Creates a campaign ending `days` from now and returns its id."""
+    creator = chain.new_account()
+
+    def create(target=10 ** 18, days=1):
+        data = contract.encode_abi("createCampaign", args=[creator.address, "Campaign", "", target, chain.time + days * DAY, ""])
+        chain.send_as(creator, chain.contract_address, data)
+        return len(chain.campaigns) - 1
+    return create
+
+
+@pytest.fixture
+def donate(chain, contract):
+    donor = chain.new_account(10 ** 22)
+
+    def send(campaign_id, amount):
+        return chain.send_as(donor, chain.contract_address, contract.encode_abi("donateToCampaign", args=[campaign_id]), value=amount)
+    return send
@@ -0,0 +1,183 @@
+import time
+
+from web3 import Web3
+
+from campaign_indexer import CampaignIndexer
+from contract_abi import CROWDFUNDING_ABI
+from contract_state import ContractState
+from rpc_batch import ChainReader
+from scheduler import DeadlineScheduler
+
+# --- 1. CONFIGURATION ---
+
+INVESTMENT_THRESHOLD_WEI = 10 ** 16  # 0.01 ETH: smaller balances are not worth the gas of invest()
+RESYNC_BLOCKS = 50                   # re-sync the index at least this often, even if the balance hasn't moved
+# Campaigns that met their target but whose owner hasn't claimed this long after the deadline stop
+# holding back invest(), which would otherwise never run again. Their funds go to Aave with the rest
+# and come back with the next scheduled reclaim, so a very late claim may have to wait for it.
+CLAIM_WINDOW = 7 * 86400
+
+
+# --- 2. THE RULES FOR ONE CONTRACT ---
+
+class ContractAgent:
+    """
+    The agent's invest/reclaim/refund rules for one crowdfunding contract, with its
+    own campaign index, deadline scheduler and persisted ContractState. agent.py
+    runs one of these; runtime.py runs one per contract, sharing a Web3 connection
+    and a TransactionManager between the contracts on the same chain.
+
+    Only one transaction per label (invest, reclaim, refund:<id>) is ever in flight,
+    counting a timed-out one that the TransactionManager says may still be mined.
+    A scheduled action counts as done once its transaction succeeds; if it fails,
+    can't be sent, or has to wait for one still in flight, it is retried later.
+    """
+
+    def __init__(self, name, w3, account, address, tx_manager, index_path, state_path,
+                 start_block=0, reader=None, clock=time.time):
+        self.name = name
+        self.w3 = w3
+        self.tx_manager = tx_manager
+        self.clock = clock
+        self.contract = w3.eth.contract(address=Web3.to_checksum_address(address), abi=CROWDFUNDING_ABI)
+        self.address = self.contract.address
+        self.reader = reader or ChainReader(w3, self.contract, account.address)
+        self.indexer = CampaignIndexer(w3, self.contract, index_path, start_block=start_block, reader=self.reader)
+        self.state = ContractState(state_path, name=name)
+        self.scheduler = DeadlineScheduler()
+        # Campaigns indexed in earlier runs; sync() only reports what changed since then
+        self.scheduler.load(self.indexer.unpaid_campaigns())
+        self.pendings = {}   # label -> PendingTransaction sent by this process
+        self.actions = {}    # label -> the scheduled actions that transaction carries out
+        self.last_balance = None
+        self.last_synced_block = None
+        self.cycles = 0
+
+    def needs_cycle(self, balance, block_number, now):
+        """Whether anything changed that the rules could act on. Cheap: no RPC calls."""
+        if balance != self.last_balance:
+            return True
+        if any(p.receipt is not None or p.timed_out for p in self.pendings.values()):
+            return True
+        if set(self.state.in_flight) - set(self.pendings):
+            # Restored from disk; only a receipt lookup can tell how they ended
+            return True
+        next_action = self.scheduler.next_due()
+        if next_action is not None and next_action.due <= now:
+            return True
+        return self.last_synced_block is None or block_number - self.last_synced_block >= RESYNC_BLOCKS
+
+    # --- Transactions ---
+
+    def in_flight(self, label):
+        return (label in self.pendings or label in self.state.in_flight
+                or self.tx_manager.is_watching(f"{self.name} {label}"))
+
+    def _submit(self, label, contract_function, urgency=None):
+        if self.in_flight(label):
+            print(f"[{self.name}] {label} is still in flight; not sending another.")
+            return None
+        try:
+            pending = self.tx_manager.submit(contract_function, label=f"{self.name} {label}", urgency=urgency)
+        except Exception as e:
+            print(f"!!! [{self.name}] Error sending {label}: {e}")
+            return None
+        self.pendings[label] = pending
+        self.state.track(label, pending)
+        return pending
+
+    def invest(self):
+        """Tells the smart contract to invest its own funds."""
+        print(f">>> [{self.name}] Condition met. Telling contract to invest funds...")
+        if self._submit("invest", self.contract.functions.invest()):
+            self.state.set("investing")
+            return True
+        return False
+
+    def reclaim(self, amount):
+        """Tells the smart contract to reclaim `amount` wei from Aave."""
+        print(f">>> [{self.name}] Deadline approaching. Telling contract to reclaim {Web3.from_wei(amount, 'ether')} ETH...")
+        # Reclaims race campaign deadlines, so they bid higher than the default
+        if self._submit("reclaim", self.contract.functions.reclaim(amount), urgency="high"):
+            self.state.set("reclaiming")
+            return True
+        return False
+
+    def refund(self, campaign_id):
+        """Tells the smart contract to refund the donors of a campaign that missed its target."""
+        print(f">>> [{self.name}] Campaign {campaign_id} ended below its target. Telling contract to refund its donors...")
+        return self._submit(f"refund:{campaign_id}", self.contract.functions.refundDonors(campaign_id), urgency="high") is not None
+
+    # --- The check cycle ---
+
+    def settle(self):
+        """Moves the state on for transactions that finished, and syncs the index. Returns the sync summary."""
+        # Looked up before the sync, so the index already holds their events when the state moves on
+        finished = self.state.finished(self.pendings, self.reader)
+        synced = self.indexer.sync()
+        self.scheduler.update_from_index(self.indexer, synced['changed'])
+        self.last_synced_block = synced['block']
+        invested = self.indexer.invested_amount()
+        now = self.clock()
+        for label, succeeded in finished:
+            if not succeeded:
+                print(f"!!! [{self.name}] The {label} transaction did not go through.")
+            self.state.apply(label, succeeded, invested)
+            for action in self.actions.pop(label, []):
+                if succeeded:
+                    self.scheduler.done(action)
+                else:
+                    self.scheduler.retry(action, now)
+        # FundsInvested/FundsReclaimed events, including calls made by someone other than this agent
+        self.state.reconcile(invested)
+        return synced
+
+    def run_scheduled_actions(self, balance, now):
+        """Runs every reclaim/refund that is due, together with those falling in the same window."""
+        actions = self.scheduler.pop_due(now)
+        if not actions:
+            return
+        print(f"[{self.name}] {len(actions)} scheduled action(s) due.")
+
+        reclaims = [action for action in actions if action.kind == "reclaim"]
+        if reclaims:
+            # One reclaim covers every unpaid campaign whose deadline falls within the reclaim lead (and the window)
+            needed = self.indexer.payout_liability(now + self.scheduler.reclaim_lead + self.scheduler.window) - balance
+            amount = min(needed, self.indexer.invested_amount())
+            self._carry_out("reclaim", reclaims, amount > 0, lambda: self.reclaim(amount), now)
+
+        for action in actions:
+            if action.kind != "refund":
+                continue
+            # Re-check against the freshly synced index: the owner may have claimed, or someone refunded already
+            campaign = self.indexer.get(action.campaign_id)
+            needed = campaign is not None and not campaign.claimed and 0 < campaign.amount_collected < campaign.target
+            self._carry_out(f"refund:{action.campaign_id}", [action], needed, lambda: self.refund(action.campaign_id), now)
+
+    def _carry_out(self, label, actions, needed, send, now):
+        """Sends the transaction for due `actions`, or marks them done if there is nothing to do."""
+        if not needed:
+            for action in actions:
+                self.scheduler.done(action)
+        elif not self.in_flight(label) and send():
+            self.actions[label] = actions
+        else:
+            # Still waiting on an earlier one, or the send failed: look again shortly
+            for action in actions:
+                self.scheduler.retry(action, now)
+
+    def run_invest_rule(self, balance, now):
+        # invest() moves the whole balance, so hold off while payouts are coming up
+        payouts_soon = self.indexer.payout_liability(now + self.scheduler.reclaim_lead, since=now - CLAIM_WINDOW)
+        if self.state.state == "idle" and balance >= INVESTMENT_THRESHOLD_WEI and not payouts_soon:
+            self.invest()
+
+    def cycle(self, balance, block_number=None):
+        """One check cycle: settle finished transactions, sync the index, then run the due actions and the invest rule."""
+        now = self.clock()
+        self.cycles += 1
+        self.last_balance = balance
+        synced = self.settle()
+        self.run_scheduled_actions(balance, now)
+        self.run_invest_rule(balance, now)
+        return synced
@@ -0,0 +1,111 @@
+import os
+import json
+import time
+
+from hexbytes import HexBytes
+
+from tx_manager import RECEIPT_TIMEOUT
+
+# --- 1. CONFIGURATION ---
+
+STATE_DIR = os.path.join(os.path.dirname(__file__), "state")
+
+# idle -> investing -> invested -> reclaiming -> invested (or idle once nothing is left in Aave)
+STATES = ("idle", "investing", "invested", "reclaiming")
+
+
+# --- 2. PERSISTED CONTRACT STATE ---
+
+class ContractState:
+    """
+    The agent's view of one contract's treasury, kept in a small JSON file so a
+    restart carries on where it stopped instead of re-deriving it from the chain.
+
+    Transactions in flight are stored by label with every hash sent for them, so
+    their outcome can still be looked up after a restart.
+    """
+
+    def __init__(self, path, name=None):
+        self.path = path
+        self.name = name or os.path.splitext(os.path.basename(path))[0]
+        self.state = "idle"
+        self.in_flight = {}   # label -> {"hashes": [...], "sent_at": unix time}
+        self.updated_at = None
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            self.state = saved.get("state", "idle")
+            self.in_flight = saved.get("in_flight", {})
+            self.updated_at = saved.get("updated_at")
+
+    @property
+    def funds_are_invested(self):
+        return self.state != "idle"
+
+    def save(self):
+        self.updated_at = time.time()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Write-then-rename, so a crash mid-write never leaves a half-written file
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"state": self.state, "in_flight": self.in_flight, "updated_at": self.updated_at}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def set(self, state):
+        if state not in STATES:
+            raise ValueError(f"Unknown contract state: '{state}'. Choose one of {STATES}.")
+        if state != self.state:
+            print(f"[{self.name}] {self.state} -> {state}")
+            self.state = state
+            self.save()
+
+    # --- Transactions in flight ---
+
+    def track(self, label, pending):
+        """Remembers a PendingTransaction (from tx_manager) under `label`."""
+        self.in_flight[label] = {"hashes": [HexBytes(h).to_0x_hex() for h in pending.hashes], "sent_at": time.time()}
+        self.save()
+
+    def finished(self, pendings, reader):
+        """
+        Returns (label, succeeded) for every tracked transaction that finished.
+        `pendings` maps label -> PendingTransaction for what this process sent; labels
+        known only from disk are looked up by hash through `reader`.
+        """
+        results = []
+        for label, pending in list(pendings.items()):
+            if pending.receipt is not None or pending.timed_out:
+                results.append((label, pending.succeeded))
+                del pendings[label]
+            elif label in self.in_flight and len(pending.hashes) != len(self.in_flight[label]["hashes"]):
+                # Sped up since it was saved
+                self.in_flight[label]["hashes"] = [HexBytes(h).to_0x_hex() for h in pending.hashes]
+                self.save()
+
+        done = {label for label, _ in results}
+        orphaned = {label: entry for label, entry in self.in_flight.items() if label not in pendings and label not in done}
+        if orphaned:
+            hashes = [h for entry in orphaned.values() for h in entry["hashes"]]
+            receipts = dict(zip(hashes, reader.get_receipts([HexBytes(h) for h in hashes])))
+            for label, entry in orphaned.items():
+                receipt = next((receipts[h] for h in entry["hashes"] if receipts[h] is not None), None)
+                if receipt is not None:
+                    results.append((label, receipt['status'] == 1))
+                elif time.time() - entry["sent_at"] > RECEIPT_TIMEOUT:
+                    results.append((label, False))
+        return results
+
+    def apply(self, label, succeeded, invested_amount):
+        """Moves the state machine on for a finished transaction and stops tracking it."""
+        self.in_flight.pop(label, None)
+        if label == "invest":
+            self.set("invested" if succeeded else "idle")
+        elif label == "reclaim":
+            self.set("invested" if invested_amount > 0 or not succeeded else "idle")
+        self.save()
+
+    def reconcile(self, invested_amount):
+        """With no invest/reclaim of ours in flight, follow the FundsInvested/FundsReclaimed events (e.g. sent by someone else)."""
+        if "invest" in self.in_flight or "reclaim" in self.in_flight:
+            return
+        self.set("invested" if invested_amount > 0 else "idle")
@@ -0,0 +1,736 @@
+import json
+import time
+import functools
+import threading
+from collections import Counter, defaultdict
+
+from eth_abi import encode, decode
+from eth_account import Account
+from eth_account.typed_transactions import TypedTransaction
+from eth_utils import keccak, to_checksum_address, function_abi_to_4byte_selector, event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3._utils.caching import handle_request_caching
+from web3.providers.base import JSONBaseProvider
+
+# --- 1. CONFIGURATION ---
+#
+# An in-process stand-in for a dev node (Anvil/Hardhat) running the CrowdFunding
+# contract against a mock Aave pool. It speaks the JSON-RPC methods the agent uses,
+# so real Web3 objects, contract calls and signed transactions work unchanged, and
+# every RPC round-trip is counted. It is a model of the contract in Python, not an
+# EVM: gas figures come from the table below.
+
+CHAIN_ID = 31337
+BLOCK_TIME = 12
+BLOCK_GAS_LIMIT = 30_000_000
+INITIAL_BASE_FEE = 10 ** 9
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+GAS_COSTS = {
+    "transfer": 21000,
+    "createCampaign": 180000,
+    "donateToCampaign": 95000,
+    "claimFunds": 60000,
+    "refundDonors": 45000,       # plus REFUND_GAS_PER_DONOR per donation
+    "invest": 230000,
+    "reclaim": 200000,
+}
+REFUND_GAS_PER_DONOR = 12000
+CALL_GAS = 30000
+
+
+class Revert(Exception):
+    """A require() failure inside the simulated contract."""
+
+
+class OutOfGas(Revert):
+    """A transaction whose gas limit is below what its call costs."""
+
+
+def _as_int(value):
+    if isinstance(value, int):
+        return value
+    return int(value, 16)
+
+
+def _hex(value):
+    return hex(value)
+
+
+def _address(value):
+    return to_checksum_address(value) if value else None
+
+
+def _locked(method):
+    """Serialises access to the chain, so RPC calls from worker threads don't interleave with mining."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# --- 2. THE SIMULATED CHAIN ---
+
+class DevChain:
+    """
+    Chain state: balances, nonces, blocks, a mempool with EIP-1559 fee rules and
+    nonce replacement, node filters, plus the CrowdFunding contract and Aave pool.
+    With `auto_mine` on, every accepted transaction is mined immediately (like
+    Hardhat's automine); otherwise call `mine()` yourself.
+    """
+
+    def __init__(self, abi, owner, chain_id=CHAIN_ID, start_time=None, block_time=BLOCK_TIME,
+                 base_fee=INITIAL_BASE_FEE, block_gas_limit=BLOCK_GAS_LIMIT, auto_mine=True, aave_apy=0.0):
+        self.abi = json.loads(abi) if isinstance(abi, str) else abi
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self.block_gas_limit = block_gas_limit
+        self.auto_mine = auto_mine
+        self.aave_apy = aave_apy
+        self.time = int(start_time if start_time is not None else time.time())
+        self.lock = threading.RLock()
+
+        self.balances = defaultdict(int)
+        self.nonces = defaultdict(int)
+        self.owner = to_checksum_address(owner)
+        self.contract_address = to_checksum_address(keccak(b"daan-crowdfunding")[:20])
+        self.aave_pool_address = to_checksum_address(keccak(b"daan-aave-pool")[:20])
+        self.weth_gateway_address = to_checksum_address(keccak(b"daan-weth-gateway")[:20])
+        self.campaigns = []
+        self.aave_deposit = 0
+        # Demand from other users per block, and the tip they pay on average. Demand above
+        # the block gas limit simulates congestion: low-tip transactions then wait.
+        self.background_gas = 0
+        self.background_tip = 10 ** 9
+
+        self.functions = {}
+        for item in self.abi:
+            if item.get("type") == "function":
+                self.functions[function_abi_to_4byte_selector(item)] = item
+        self.event_topics = {
+            item["name"]: event_abi_to_log_topic(item) for item in self.abi if item.get("type") == "event"
+        }
+        self._multicall_selector = keccak(b"aggregate3((address,bool,bytes)[])")[:4]
+
+        self.pending = {}        # (sender, nonce) -> tx
+        self.transactions = {}   # hash -> tx (mined or pending)
+        self.receipts = {}       # hash -> receipt
+        self.blocks = []
+        self.filters = {}
+        self._next_filter_id = 1
+        self._make_block([], base_fee, 0)
+
+    # --- Accounts ---
+
+    @_locked
+    def fund(self, address, amount_wei):
+        self.balances[to_checksum_address(address)] += amount_wei
+
+    def new_account(self, balance_wei=10 ** 20):
+        account = Account.create()
+        self.fund(account.address, balance_wei)
+        return account
+
+    @property
+    def head(self):
+        return self.blocks[-1]
+
+    @property
+    def base_fee(self):
+        """Base fee of the next block, from the EIP-1559 update rule."""
+        parent = self.head
+        target = self.block_gas_limit // 2
+        delta = parent["baseFeePerGas"] * (parent["gasUsed"] - target) // target // 8
+        return max(7, parent["baseFeePerGas"] + delta)
+
+    def _next_timestamp(self):
+        return max(self.time, self.head["timestamp"] + 1)
+
+    @_locked
+    def advance_time(self, seconds):
+        self.time += seconds
+
+    # --- Contract model ---
+
+    def _campaign(self, campaign_id):
+        if campaign_id >= len(self.campaigns):
+            return {"owner": "0x" + "00" * 20, "title": "", "description": "", "target": 0, "deadline": 0,
+                    "amountCollected": 0, "image": "", "donators": [], "donations": [], "claimed": False}
+        return self.campaigns[campaign_id]
+
+    def _campaign_tuple(self, c, full=False):
+        if full:
+            return (c["owner"], c["title"], c["description"], c["target"], c["deadline"], c["amountCollected"],
+                    c["image"], list(c["donators"]), list(c["donations"]), c["claimed"])
+        return (c["owner"], c["title"], c["description"], c["target"], c["deadline"], c["amountCollected"],
+                c["image"], c["claimed"])
+
+    def _log(self, name, amount):
+        return {"address": self.contract_address, "topics": [self.event_topics[name]], "data": encode(["uint256"], [amount])}
+
+    def _run_contract(self, sender, value, fn_name, args, now, dry_run):
+        """Executes one contract function. Returns (gas_used, logs, return_values). Raises Revert."""
+        contract_balance = self.balances[self.contract_address]
+
+        # View functions
+        if fn_name == "campaigns":
+            return CALL_GAS, [], self._campaign_tuple(self._campaign(args[0]))
+        if fn_name in ("numberofCampaigns", "numberOfCampaigns"):
+            return CALL_GAS, [], (len(self.campaigns),)
+        if fn_name == "getCampaigns":
+            return CALL_GAS, [], ([self._campaign_tuple(c, full=True) for c in self.campaigns],)
+        if fn_name == "getDonators":
+            c = self._campaign(args[0])
+            return CALL_GAS, [], (list(c["donators"]), list(c["donations"]))
+        if fn_name == "owner":
+            return CALL_GAS, [], (self.owner,)
+        if fn_name == "aavePool":
+            return CALL_GAS, [], (self.aave_pool_address,)
+        if fn_name == "wethGateway":
+            return CALL_GAS, [], (self.weth_gateway_address,)
+
+        # State-changing functions: every require() is checked before anything is mutated
+        if fn_name == "createCampaign":
+            owner, title, description, target, deadline, image = args
+            if deadline <= now:
+                raise Revert("Deadline must be in the future.")
+            if not dry_run:
+                self.campaigns.append({"owner": owner, "title": title, "description": description, "target": target,
+                                       "deadline": deadline, "amountCollected": 0, "image": image,
+                                       "donators": [], "donations": [], "claimed": False})
+            return GAS_COSTS["createCampaign"], [], (len(self.campaigns) - (0 if dry_run else 1),)
+
+        if fn_name == "donateToCampaign":
+            c = self._campaign(args[0])
+            if now >= c["deadline"]:
+                raise Revert("Campaign has ended.")
+            if not dry_run:
+                c["donators"].append(sender)
+                c["donations"].append(value)
+                c["amountCollected"] += value
+            return GAS_COSTS["donateToCampaign"], [], ()
+
+        if fn_name == "claimFunds":
+            c = self._campaign(args[0])
+            if sender != c["owner"]:
+                raise Revert("Only the campaign owner can claim funds.")
+            if now <= c["deadline"]:
+                raise Revert("Campaign has not ended yet.")
+            if c["amountCollected"] < c["target"]:
+                raise Revert("Campaign did not meet its target.")
+            if c["claimed"]:
+                raise Revert("Funds have already been claimed.")
+            if contract_balance < c["amountCollected"]:
+                raise Revert("CrowdFunding: Failed to send funds to owner")
+            if not dry_run:
+                self.balances[self.contract_address] -= c["amountCollected"]
+                self.balances[c["owner"]] += c["amountCollected"]
+                c["amountCollected"] = 0
+                c["claimed"] = True
+            return GAS_COSTS["claimFunds"], [], ()
+
+        if fn_name == "refundDonors":
+            c = self._campaign(args[0])
+            if now <= c["deadline"]:
+                raise Revert("Campaign has not ended yet.")
+            if c["amountCollected"] >= c["target"]:
+                raise Revert("Campaign met its target, funds cannot be refunded.")
+            if c["claimed"]:
+                raise Revert("Funds have already been claimed by owner.")
+            if contract_balance < sum(c["donations"]):
+                raise Revert("CrowdFunding: Refund failed")
+            gas = GAS_COSTS["refundDonors"] + REFUND_GAS_PER_DONOR * len(c["donators"])
+            if not dry_run:
+                for donator, donation in zip(c["donators"], c["donations"]):
+                    self.balances[self.contract_address] -= donation
+                    self.balances[donator] += donation
+                    c["amountCollected"] -= donation
+                c["donators"], c["donations"] = [], []
+            return gas, [], ()
+
+        if fn_name == "invest":
+            if sender != self.owner:
+                raise Revert("Only the contract owner can invest funds.")
+            amount = contract_balance + value
+            if amount <= 0:
+                raise Revert("No funds to invest.")
+            if not dry_run:
+                self.balances[self.contract_address] = 0
+                self.aave_deposit += amount
+            return GAS_COSTS["invest"], [self._log("FundsInvested", amount)], ()
+
+        if fn_name == "reclaim":
+            amount = args[0]
+            if sender != self.owner:
+                raise Revert("Only the contract owner can reclaim funds.")
+            if amount > self.aave_deposit:
+                raise Revert("Aave: not enough balance")
+            if not dry_run:
+                self.aave_deposit -= amount
+                self.balances[self.contract_address] += amount
+            return GAS_COSTS["reclaim"], [self._log("FundsReclaimed", amount)], ()
+
+        raise Revert(f"function {fn_name} is not modelled")
+
+    def _multicall(self, data, now):
+        (calls,) = decode(["(address,bool,bytes)[]"], data)
+        results = []
+        for target, allow_failure, call_data in calls:
+            try:
+                _, _, output = self._execute(self.owner, target, 0, call_data, now, dry_run=True)
+                results.append((True, output))
+            except Revert as e:
+                if not allow_failure:
+                    raise
+                results.append((False, str(e).encode()))
+        return encode(["(bool,bytes)[]"], [results])
+
+    def _execute(self, sender, to, value, data, now, dry_run):
+        """Routes a call or transaction. Returns (gas_used, logs, encoded_output)."""
+        to = _address(to)
+        data = bytes(data or b"")
+        if to == self.contract_address and len(data) >= 4:
+            fn = self.functions.get(data[:4])
+            if fn is None:
+                raise Revert("unknown function selector")
+            input_types = [i["type"] for i in fn["inputs"]]
+            args = decode(input_types, data[4:]) if input_types else ()
+            args = tuple(to_checksum_address(a) if t == "address" else a for a, t in zip(args, input_types))
+            if value and fn.get("stateMutability") != "payable":
+                raise Revert("non-payable function")
+            gas, logs, values = self._run_contract(sender, value, fn["name"], args, now, dry_run)
+            if fn.get("stateMutability") in ("view", "pure"):
+                output = encode([self._abi_type(o) for o in fn["outputs"]], list(values))
+            else:
+                output = b""
+            if value and not dry_run:
+                self.balances[self.contract_address] += value
+            return gas, logs, output
+        if to == MULTICALL3_ADDRESS and data[:4] == self._multicall_selector:
+            return CALL_GAS, [], self._multicall(data[4:], now)
+        # Plain ETH transfer
+        if value and not dry_run:
+            self.balances[to] += value
+        return GAS_COSTS["transfer"], [], b""
+
+    def _abi_type(self, output):
+        if output["type"].startswith("tuple"):
+            inner = ",".join(self._abi_type(c) for c in output["components"])
+            return f"({inner})" + output["type"][len("tuple"):]
+        return output["type"]
+
+    # --- Blocks and the mempool ---
+
+    def _make_block(self, txs, base_fee, gas_used, tips=()):
+        number = len(self.blocks)
+        timestamp = self._next_timestamp() if self.blocks else self.time
+        block = {
+            "number": number,
+            "hash": keccak(f"block-{number}-{timestamp}".encode()),
+            "parentHash": self.blocks[-1]["hash"] if self.blocks else b"\x00" * 32,
+            "timestamp": timestamp,
+            "baseFeePerGas": base_fee,
+            "gasLimit": self.block_gas_limit,
+            "gasUsed": gas_used,
+            "transactions": txs,
+            "tips": sorted(tips),
+        }
+        self.blocks.append(block)
+        self.time = timestamp
+        return block
+
+    def _accrue_interest(self, seconds):
+        if self.aave_apy and self.aave_deposit and seconds > 0:
+            self.aave_deposit += int(self.aave_deposit * self.aave_apy * seconds / SECONDS_PER_YEAR)
+
+    @_locked
+    def mine(self, blocks=1):
+        """
+        Mines `blocks` blocks. Pending transactions that pay the base fee compete with the
+        background demand by tip (ten slices tipping 0.5x-1.4x `background_tip`) until the block is full.
+        """
+        for _ in range(blocks):
+            base_fee = self.base_fee
+            now = self._next_timestamp()
+            self._accrue_interest(now - self.head["timestamp"])
+            background = [[self.background_tip * (5 + i) // 10, self.background_gas // 10] for i in range(10)] if self.background_gas else []
+            included, tips, gas_used, all_logs = [], [], 0, []
+            while True:
+                space = self.block_gas_limit - gas_used
+                ready = [tx for (sender, nonce), tx in self.pending.items()
+                         if nonce == self.nonces[sender] and tx["maxFeePerGas"] >= base_fee and tx["gas"] <= space]
+                best_tx = max(ready, key=lambda t: min(t["maxPriorityFeePerGas"], t["maxFeePerGas"] - base_fee), default=None)
+                best_tx_tip = -1 if best_tx is None else min(best_tx["maxPriorityFeePerGas"], best_tx["maxFeePerGas"] - base_fee)
+                best_slice = max(background, key=lambda s: s[0], default=None)
+                if best_slice is not None and space > 0 and best_slice[0] >= best_tx_tip:
+                    background.remove(best_slice)
+                    gas_used += min(best_slice[1], space)
+                    tips.append(best_slice[0])
+                    continue
+                if best_tx is None:
+                    break
+                del self.pending[(best_tx["from"], best_tx["nonce"])]
+                receipt = self._apply_transaction(best_tx, base_fee, now, len(self.blocks), len(included), len(all_logs))
+                gas_used += receipt["gasUsed"]
+                all_logs.extend(receipt["logs"])
+                included.append(best_tx)
+                tips.append(best_tx_tip)
+            block = self._make_block(included, base_fee, gas_used, tips)
+            for i, tx in enumerate(included):
+                tx["blockNumber"], tx["blockHash"], tx["transactionIndex"] = block["number"], block["hash"], i
+                receipt = self.receipts[tx["hash"]]
+                receipt["blockHash"] = block["hash"]
+                for log in receipt["logs"]:
+                    log["blockHash"] = block["hash"]
+            self.time = max(self.time, block["timestamp"]) + self.block_time
+        return self.head
+
+    def _apply_transaction(self, tx, base_fee, now, block_number, index, log_offset):
+        sender = tx["from"]
+        price = min(tx["maxFeePerGas"], base_fee + tx["maxPriorityFeePerGas"])
+        try:
+            if self.balances[sender] < tx["value"]:
+                raise Revert("insufficient funds for transfer")
+            # Priced before anything changes: out of gas fails the whole call and uses the full limit
+            gas, _, _ = self._execute(sender, tx["to"], tx["value"], tx["input"], now, dry_run=True)
+            if gas > tx["gas"]:
+                raise OutOfGas()
+            gas, logs, _ = self._execute(sender, tx["to"], tx["value"], tx["input"], now, dry_run=False)
+            if tx["value"]:
+                self.balances[sender] -= tx["value"]
+            status = 1
+        except OutOfGas:
+            gas, logs, status = tx["gas"], [], 0
+        except Revert:
+            gas, logs, status = min(GAS_COSTS["transfer"], tx["gas"]), [], 0
+        self.balances[sender] -= gas * price
+        self.nonces[sender] += 1
+        receipt_logs = [
+            dict(log, blockNumber=block_number, transactionHash=tx["hash"], transactionIndex=index,
+                 logIndex=log_offset + i, removed=False)
+            for i, log in enumerate(logs)
+        ]
+        self.receipts[tx["hash"]] = {
+            "transactionHash": tx["hash"], "transactionIndex": index, "blockNumber": block_number,
+            "from": sender, "to": tx["to"], "gasUsed": gas, "cumulativeGasUsed": gas, "effectiveGasPrice": price,
+            "status": status, "logs": receipt_logs, "contractAddress": None, "type": 2,
+            "logsBloom": b"\x00" * 256,
+        }
+        return self.receipts[tx["hash"]]
+
+    @_locked
+    def submit(self, raw_tx):
+        """Validates and queues a signed transaction, as eth_sendRawTransaction would."""
+        raw_tx = HexBytes(raw_tx)
+        decoded = TypedTransaction.from_bytes(raw_tx).as_dict()
+        sender = Account.recover_transaction(raw_tx)
+        tx = {
+            "hash": keccak(raw_tx), "from": sender, "to": _address(decoded["to"]) if decoded["to"] else None,
+            "value": decoded["value"], "input": bytes(decoded["data"]), "nonce": decoded["nonce"],
+            "gas": decoded["gas"], "maxFeePerGas": decoded["maxFeePerGas"],
+            "maxPriorityFeePerGas": decoded["maxPriorityFeePerGas"], "chainId": decoded["chainId"], "type": 2,
+            "blockNumber": None, "blockHash": None, "transactionIndex": None,
+        }
+        return self._queue(tx)
+
+    def _queue(self, tx):
+        sender = tx["from"]
+        if tx["chainId"] != self.chain_id:
+            raise Revert("invalid chain id")
+        if tx["nonce"] < self.nonces[sender]:
+            raise Revert("nonce too low")
+        if self.balances[sender] < tx["value"] + tx["gas"] * tx["maxFeePerGas"]:
+            raise Revert("insufficient funds for gas * price + value")
+        existing = self.pending.get((sender, tx["nonce"]))
+        if existing is not None:
+            # Same rule as geth: a replacement must raise both fees by at least 10%
+            if (tx["maxFeePerGas"] * 10 < existing["maxFeePerGas"] * 11
+                    or tx["maxPriorityFeePerGas"] * 10 < existing["maxPriorityFeePerGas"] * 11):
+                raise Revert("replacement transaction underpriced")
+            del self.transactions[existing["hash"]]
+        self.pending[(sender, tx["nonce"])] = tx
+        self.transactions[tx["hash"]] = tx
+        if self.auto_mine:
+            self.mine()
+        return tx["hash"]
+
+    @_locked
+    def send_as(self, account, to, data=b"", value=0, gas=500000, tip=10 ** 9):
+        """Signs and submits a transaction from a local account (used to seed campaigns and donations)."""
+        txn = {
+            "to": to, "value": value, "data": data, "gas": gas, "chainId": self.chain_id,
+            "nonce": self._pending_nonce(account.address),
+            "maxFeePerGas": self.base_fee * 2 + tip, "maxPriorityFeePerGas": tip,
+        }
+        return self.submit(account.sign_transaction(txn).raw_transaction)
+
+    @_locked
+    def send_from(self, address, to, data=b"", value=0, gas=500000, tip=10 ** 9):
+        """
+        Queues an unsigned transaction from any address, like Anvil's impersonated accounts.
+        Skips ECDSA signing and recovery, so simulations can push thousands of user transactions.
+        """
+        sender = to_checksum_address(address)
+        nonce = self._pending_nonce(sender)
+        max_fee = self.base_fee * 2 + tip
+        tx = {
+            "hash": keccak(f"{sender}:{nonce}:{max_fee}:{tip}".encode()), "from": sender, "to": _address(to),
+            "value": value, "input": bytes(HexBytes(data)), "nonce": nonce, "gas": gas, "maxFeePerGas": max_fee,
+            "maxPriorityFeePerGas": tip, "chainId": self.chain_id, "type": 2,
+            "blockNumber": None, "blockHash": None, "transactionIndex": None,
+        }
+        return self._queue(tx)
+
+    def _pending_nonce(self, address):
+        address = to_checksum_address(address)
+        nonce = self.nonces[address]
+        while (address, nonce) in self.pending:
+            nonce += 1
+        return nonce
+
+    # --- Filters and logs ---
+
+    def _logs_in_range(self, from_block, to_block, address=None, topics=None):
+        logs = []
+        for block in self.blocks[from_block:to_block + 1]:
+            for tx in block["transactions"]:
+                for log in self.receipts[tx["hash"]]["logs"]:
+                    if address and log["address"].lower() not in address:
+                        continue
+                    if topics and topics[0] and log["topics"][0] not in topics[0]:
+                        continue
+                    logs.append(log)
+        return logs
+
+    def _block_number_param(self, value, default="latest"):
+        value = value if value is not None else default
+        if value in ("latest", "pending", "safe", "finalized"):
+            return self.head["number"]
+        if value == "earliest":
+            return 0
+        return _as_int(value)
+
+    def _parse_log_filter(self, params):
+        address = params.get("address")
+        if isinstance(address, str):
+            address = [address]
+        address = [a.lower() for a in address] if address else None
+        topics = []
+        for topic in params.get("topics") or []:
+            if topic is None:
+                topics.append(None)
+            else:
+                topic_list = topic if isinstance(topic, list) else [topic]
+                topics.append([HexBytes(t) for t in topic_list])
+        return address, topics
+
+    # --- JSON-RPC ---
+
+    @_locked
+    def handle(self, method, params):
+        """Returns (result, error) for one JSON-RPC call."""
+        handler = getattr(self, "rpc_" + method, None)
+        if handler is None:
+            return None, {"code": -32601, "message": f"the method {method} does not exist/is not available"}
+        try:
+            return handler(*(params or [])), None
+        except Revert as e:
+            message = str(e)
+            if message.startswith(("nonce too low", "replacement transaction", "insufficient funds", "invalid chain")):
+                return None, {"code": -32000, "message": message}
+            return None, {"code": 3, "message": f"execution reverted: {message}",
+                          "data": "0x08c379a0" + encode(["string"], [message]).hex()}
+
+    def rpc_eth_chainId(self):
+        return _hex(self.chain_id)
+
+    def rpc_net_version(self):
+        return str(self.chain_id)
+
+    def rpc_eth_blockNumber(self):
+        return _hex(self.head["number"])
+
+    def rpc_eth_getBalance(self, address, block="latest"):
+        return _hex(self.balances[to_checksum_address(address)])
+
+    def rpc_eth_getTransactionCount(self, address, block="latest"):
+        if block == "pending":
+            return _hex(self._pending_nonce(address))
+        return _hex(self.nonces[to_checksum_address(address)])
+
+    def rpc_eth_getCode(self, address, block="latest"):
+        return "0x6080" if _address(address) in (self.contract_address, MULTICALL3_ADDRESS) else "0x"
+
+    def rpc_eth_call(self, tx, block="latest"):
+        sender = _address(tx.get("from")) or self.owner
+        _, _, output = self._execute(sender, tx.get("to"), _as_int(tx.get("value", 0)),
+                                     HexBytes(tx.get("data") or tx.get("input") or "0x"), self._next_timestamp(), dry_run=True)
+        return "0x" + output.hex()
+
+    def rpc_eth_estimateGas(self, tx, block="latest"):
+        sender = _address(tx.get("from")) or self.owner
+        gas, _, _ = self._execute(sender, tx.get("to"), _as_int(tx.get("value", 0)),
+                                  HexBytes(tx.get("data") or tx.get("input") or "0x"), self._next_timestamp(), dry_run=True)
+        return _hex(gas)
+
+    def rpc_eth_gasPrice(self):
+        return _hex(self.base_fee + 10 ** 9)
+
+    def rpc_eth_maxPriorityFeePerGas(self):
+        return _hex(10 ** 9)
+
+    def rpc_eth_feeHistory(self, block_count, newest="latest", percentiles=None):
+        count = min(_as_int(block_count), len(self.blocks))
+        newest = self._block_number_param(newest)
+        blocks = self.blocks[newest - count + 1:newest + 1]
+        rewards = []
+        for block in blocks:
+            tips = block["tips"] or [0]
+            rewards.append([_hex(tips[min(len(tips) - 1, int(len(tips) * p / 100))]) for p in (percentiles or [])])
+        return {
+            "oldestBlock": _hex(blocks[0]["number"]),
+            "baseFeePerGas": [_hex(b["baseFeePerGas"]) for b in blocks] + [_hex(self.base_fee)],
+            "gasUsedRatio": [b["gasUsed"] / b["gasLimit"] for b in blocks],
+            "reward": rewards,
+        }
+
+    def rpc_eth_sendRawTransaction(self, raw_tx):
+        return "0x" + self.submit(raw_tx).hex()
+
+    def _format_tx(self, tx):
+        return {
+            "hash": tx["hash"], "from": tx["from"], "to": tx["to"], "value": _hex(tx["value"]), "input": tx["input"],
+            "nonce": _hex(tx["nonce"]), "gas": _hex(tx["gas"]), "maxFeePerGas": _hex(tx["maxFeePerGas"]),
+            "maxPriorityFeePerGas": _hex(tx["maxPriorityFeePerGas"]), "chainId": _hex(tx["chainId"]), "type": "0x2",
+            "blockNumber": None if tx["blockNumber"] is None else _hex(tx["blockNumber"]),
+            "blockHash": tx["blockHash"],
+            "transactionIndex": None if tx["transactionIndex"] is None else _hex(tx["transactionIndex"]),
+        }
+
+    def _format_log(self, log):
+        return {
+            "address": log["address"], "topics": [HexBytes(t).to_0x_hex() for t in log["topics"]],
+            "data": "0x" + bytes(log["data"]).hex(), "blockNumber": _hex(log["blockNumber"]),
+            "blockHash": HexBytes(log.get("blockHash") or b"\x00" * 32).to_0x_hex(),
+            "transactionHash": HexBytes(log["transactionHash"]).to_0x_hex(),
+            "transactionIndex": _hex(log["transactionIndex"]), "logIndex": _hex(log["logIndex"]), "removed": False,
+        }
+
+    def rpc_eth_getTransactionByHash(self, tx_hash):
+        tx = self.transactions.get(HexBytes(tx_hash))
+        return None if tx is None else self._format_tx(tx)
+
+    def rpc_eth_getTransactionReceipt(self, tx_hash):
+        receipt = self.receipts.get(HexBytes(tx_hash))
+        if receipt is None:
+            return None
+        formatted = dict(receipt)
+        for key in ("transactionIndex", "blockNumber", "gasUsed", "cumulativeGasUsed", "effectiveGasPrice", "status", "type"):
+            formatted[key] = _hex(receipt[key])
+        formatted["logs"] = [self._format_log(log) for log in receipt["logs"]]
+        return formatted
+
+    def _format_block(self, block, full_transactions):
+        return {
+            "number": _hex(block["number"]), "hash": block["hash"], "parentHash": block["parentHash"],
+            "timestamp": _hex(block["timestamp"]), "baseFeePerGas": _hex(block["baseFeePerGas"]),
+            "gasLimit": _hex(block["gasLimit"]), "gasUsed": _hex(block["gasUsed"]),
+            "miner": "0x" + "00" * 20, "difficulty": "0x0", "extraData": "0x", "nonce": "0x0000000000000000",
+            "transactions": [self._format_tx(tx) if full_transactions else tx["hash"] for tx in block["transactions"]],
+        }
+
+    def rpc_eth_getBlockByNumber(self, number, full_transactions=False):
+        number = self._block_number_param(number)
+        return self._format_block(self.blocks[number], full_transactions) if number < len(self.blocks) else None
+
+    def rpc_eth_getBlockByHash(self, block_hash, full_transactions=False):
+        for block in self.blocks:
+            if block["hash"] == HexBytes(block_hash):
+                return self._format_block(block, full_transactions)
+        return None
+
+    def rpc_eth_getLogs(self, params):
+        address, topics = self._parse_log_filter(params)
+        from_block = self._block_number_param(params.get("fromBlock"))
+        to_block = self._block_number_param(params.get("toBlock"))
+        return [self._format_log(log) for log in self._logs_in_range(from_block, to_block, address, topics)]
+
+    def rpc_eth_newBlockFilter(self):
+        filter_id = _hex(self._next_filter_id)
+        self._next_filter_id += 1
+        self.filters[filter_id] = {"type": "block", "cursor": self.head["number"] + 1}
+        return filter_id
+
+    def rpc_eth_newFilter(self, params):
+        filter_id = _hex(self._next_filter_id)
+        self._next_filter_id += 1
+        address, topics = self._parse_log_filter(params)
+        start = self._block_number_param(params.get("fromBlock"))
+        if params.get("fromBlock", "latest") == "latest":
+            start = self.head["number"] + 1
+        self.filters[filter_id] = {"type": "log", "cursor": start, "address": address, "topics": topics}
+        return filter_id
+
+    def rpc_eth_getFilterChanges(self, filter_id):
+        f = self.filters.get(filter_id)
+        if f is None:
+            raise Revert("filter not found")
+        head = self.head["number"]
+        start, f["cursor"] = f["cursor"], head + 1
+        if f["type"] == "block":
+            return [HexBytes(b["hash"]).to_0x_hex() for b in self.blocks[start:head + 1]]
+        return [self._format_log(log) for log in self._logs_in_range(start, head, f["address"], f["topics"])]
+
+    def rpc_eth_uninstallFilter(self, filter_id):
+        return self.filters.pop(filter_id, None) is not None
+
+
+# --- 3. THE WEB3 PROVIDER ---
+
+class DevChainProvider(JSONBaseProvider):
+    """
+    Web3 provider backed by a DevChain. Counts round-trips (a JSON-RPC batch is one
+    round-trip) and calls per method, and can add a fixed latency per round-trip to
+    mimic a remote node. Like HTTPProvider, it honours `cache_allowed_requests=True`.
+    """
+
+    def __init__(self, chain, latency=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.chain = chain
+        self.latency = latency
+        self.round_trips = 0
+        self.calls = Counter()
+        self._request_id = 0
+
+    def _response(self, method, params):
+        self._request_id += 1
+        self.calls[method] += 1
+        result, error = self.chain.handle(method, params)
+        response = {"jsonrpc": "2.0", "id": self._request_id}
+        if error is not None:
+            response["error"] = error
+        else:
+            response["result"] = result
+        return response
+
+    @handle_request_caching
+    def make_request(self, method, params):
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._response(method, params)
+
+    def make_batch_request(self, requests):
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._response(method, params) for method, params in requests]
+
+    def is_connected(self, show_traceback=False):
+        return True
+
+    def reset_counters(self):
+        self.round_trips = 0
+        self.calls.clear()
@@ -0,0 +1,123 @@
+import time
+import threading
+
+import requests
+from web3 import Web3
+from web3.exceptions import ProviderConnectionError, RequestTimedOut
+from web3.providers.base import JSONBaseProvider
+
+# --- 1. CONFIGURATION ---
+
+COOLDOWN = 30           # seconds a failing endpoint is skipped before it is tried again
+RATE_LIMIT_CODES = (-32005, 429)
+# Answers that never change on one chain: asked once, then served from memory
+CONSTANT_METHODS = ("eth_chainId", "net_version")
+# Requests that must not be repeated on another endpoint: the first one may have been
+# accepted even though its answer was lost, and a retry would look like a failure
+NO_FAILOVER_METHODS = ("eth_sendRawTransaction", "eth_sendTransaction")
+
+# Errors that say "this endpoint is down or overloaded", as opposed to "this request is wrong"
+FAILOVER_ERRORS = (requests.exceptions.RequestException, ProviderConnectionError, RequestTimedOut, OSError)
+
+
+def make_provider(url, **kwargs):
+    """An HTTP or WebSocket provider for `url`, like agent.py builds from PROVIDER_URL."""
+    if url.startswith("ws"):
+        return Web3.LegacyWebSocketProvider(url, **kwargs)
+    return Web3.HTTPProvider(url, **kwargs)
+
+
+# --- 2. THE PROVIDER ---
+
+class FailoverProvider(JSONBaseProvider):
+    """
+    Web3 provider over several RPC endpoints for the same chain. Requests go to the
+    active endpoint; on a connection error, timeout, HTTP error or rate-limit
+    response it is benched for `cooldown` seconds and the request is retried on the
+    next one. Endpoints can be URLs or ready-made providers (e.g. a DevChainProvider).
+
+    Sending a transaction is never retried elsewhere: its error goes to the caller,
+    who can check the nonce before sending again. The chain id is asked only once.
+    """
+
+    def __init__(self, endpoints, cooldown=COOLDOWN, **kwargs):
+        super().__init__(**kwargs)
+        if not endpoints:
+            raise ValueError("FailoverProvider needs at least one endpoint.")
+        self.providers = [make_provider(e) if isinstance(e, str) else e for e in endpoints]
+        self.cooldown = cooldown
+        self.active = 0
+        self.failovers = 0
+        self._benched_until = [0.0] * len(self.providers)
+        self._constants = {}
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"FailoverProvider({', '.join(str(p) for p in self.providers)})"
+
+    def _candidates(self):
+        """The active endpoint first, then the others in order; benched ones go last, soonest-back first."""
+        now = time.monotonic()
+        with self._lock:
+            order = [(self.active + i) % len(self.providers) for i in range(len(self.providers))]
+            ready = [i for i in order if self._benched_until[i] <= now]
+            benched = sorted((i for i in order if self._benched_until[i] > now), key=lambda i: self._benched_until[i])
+        return ready + benched
+
+    def _bench(self, index, reason):
+        with self._lock:
+            self._benched_until[index] = time.monotonic() + self.cooldown
+        print(f"RPC endpoint {self.providers[index]} failed ({reason}); benched for {self.cooldown} s.")
+
+    @staticmethod
+    def _rate_limited(response):
+        responses = response if isinstance(response, list) else [response]
+        for r in responses:
+            error = r.get("error") if isinstance(r, dict) else None
+            if isinstance(error, dict) and (error.get("code") in RATE_LIMIT_CODES or "rate limit" in str(error.get("message", "")).lower()):
+                return True
+        return False
+
+    def _call(self, send, failover=True):
+        last_error = None
+        candidates = self._candidates()
+        for index in candidates if failover else candidates[:1]:
+            try:
+                response = send(self.providers[index])
+            except NotImplementedError:
+                raise
+            except FAILOVER_ERRORS as e:
+                self._bench(index, e)
+                if not failover:
+                    raise
+                last_error = e
+                continue
+            if self._rate_limited(response):
+                self._bench(index, "rate limited")
+                if not failover:
+                    return response
+                last_error = ProviderConnectionError(f"{self.providers[index]} is rate limiting requests")
+                continue
+            if index != self.active:
+                with self._lock:
+                    self.active = index
+                    self.failovers += 1
+                print(f"Switched to RPC endpoint {self.providers[index]}.")
+            return response
+        raise ProviderConnectionError(f"All {len(self.providers)} RPC endpoints failed; last error: {last_error}")
+
+    def make_request(self, method, params):
+        if method in CONSTANT_METHODS and method in self._constants:
+            return self._constants[method]
+        response = self._call(lambda provider: provider.make_request(method, params),
+                              failover=method not in NO_FAILOVER_METHODS)
+        if method in CONSTANT_METHODS and "result" in response:
+            self._constants[method] = response
+        return response
+
+    def make_batch_request(self, requests):
+        failover = not any(method in NO_FAILOVER_METHODS for method, _ in requests)
+        return self._call(lambda provider: provider.make_batch_request(requests), failover=failover)
+
+    def is_connected(self, show_traceback=False):
+        return any(provider.is_connected() for provider in self.providers)
@@ -0,0 +1,208 @@
+import time
+from collections import namedtuple, defaultdict
+
+from eth_utils import function_abi_to_4byte_selector
+
+# --- 1. CONFIGURATION ---
+
+FEE_HISTORY_BLOCKS = 20
+FEE_HISTORY_TTL = 6        # seconds; a burst of transactions shares one eth_feeHistory call
+GAS_BUFFER = 1.2           # headroom on top of estimate_gas
+MIN_PRIORITY_FEE = 10 ** 8  # 0.1 gwei, so a tip is never zero when recent blocks were empty
+# Functions whose gas depends on their arguments (refundDonors pays every donor of the
+# campaign), so they are estimated for every call instead of once per selector
+PER_CALL_GAS_FUNCTIONS = {"refundDonors"}
+
+# Per urgency: which percentile of recent tips to pay, and how many blocks of maximum
+# base-fee growth (12.5% each) the max fee should survive before the transaction gets stuck.
+URGENCY_LEVELS = {
+    "low": {"percentile": 10, "base_fee_blocks": 1},
+    "medium": {"percentile": 50, "base_fee_blocks": 3},
+    "high": {"percentile": 90, "base_fee_blocks": 6},
+}
+DEFAULT_URGENCY = "medium"
+
+FeeQuote = namedtuple("FeeQuote", ["urgency", "max_fee", "priority_fee", "base_fee", "block_number"])
+
+
+# --- 2. THE ESTIMATOR ---
+
+class FeeEstimator:
+    """
+    Prices EIP-1559 transactions from recent blocks instead of fixed numbers.
+
+    - The tip is the urgency's percentile of the tips paid over the last
+      FEE_HISTORY_BLOCKS blocks (eth_feeHistory), fetched at most once per FEE_HISTORY_TTL.
+    - The max fee is the next block's base fee grown by the urgency's number of
+      full blocks, plus the tip, optionally capped.
+    - Gas limits come from estimate_gas, cached per contract and function selector
+      and raised if a receipt ever shows more gas used. Functions in
+      PER_CALL_GAS_FUNCTIONS are estimated for every call and never cached.
+
+    `record` takes finished transactions and `report` summarises the inclusion
+    latency and cost achieved per urgency level.
+    """
+
+    def __init__(self, w3, urgency=DEFAULT_URGENCY, blocks=FEE_HISTORY_BLOCKS, max_fee_cap=None, gas_buffer=GAS_BUFFER):
+        if urgency not in URGENCY_LEVELS:
+            raise ValueError(f"Unknown urgency: '{urgency}'. Choose one of {tuple(URGENCY_LEVELS)}.")
+        self.w3 = w3
+        self.urgency = urgency
+        self.blocks = blocks
+        self.max_fee_cap = max_fee_cap
+        self.gas_buffer = gas_buffer
+        self._history = None
+        self._history_at = 0.0
+        self._gas_limits = {}
+        self._outcomes = defaultdict(list)
+
+    # --- Fees ---
+
+    def _fee_history(self):
+        if self._history is None or time.monotonic() - self._history_at > FEE_HISTORY_TTL:
+            percentiles = sorted({level["percentile"] for level in URGENCY_LEVELS.values()})
+            try:
+                history = self.w3.eth.fee_history(self.blocks, 'latest', percentiles)
+                newest = history['oldestBlock'] + len(history['gasUsedRatio']) - 1
+                tips = {p: [block[i] for block in history['reward']] for i, p in enumerate(percentiles)}
+                self._history = (history['baseFeePerGas'][-1], tips, newest)
+            except Exception as e:
+                # Nodes without eth_feeHistory: fall back to the node's own suggestion
+                print(f"eth_feeHistory unavailable ({e}); using eth_maxPriorityFeePerGas.")
+                block = self.w3.eth.get_block('latest')
+                tip = self.w3.eth.max_priority_fee
+                self._history = (block['baseFeePerGas'], defaultdict(lambda: [tip]), block['number'])
+            self._history_at = time.monotonic()
+        return self._history
+
+    def quote(self, urgency=None):
+        urgency = urgency or self.urgency
+        level = URGENCY_LEVELS[urgency]
+        next_base_fee, tips, block_number = self._fee_history()
+
+        paid = sorted(tip for tip in tips[level["percentile"]] if tip > 0)
+        priority_fee = max(MIN_PRIORITY_FEE, paid[len(paid) // 2] if paid else 0)
+        max_fee = int(next_base_fee * 1.125 ** level["base_fee_blocks"]) + priority_fee
+        if self.max_fee_cap:
+            max_fee = min(max_fee, self.max_fee_cap)
+            priority_fee = min(priority_fee, max_fee)
+        return FeeQuote(urgency, max_fee, priority_fee, next_base_fee, block_number)
+
+    # --- Gas limits ---
+
+    def gas_key(self, contract_function):
+        """The cache key for the function's gas limit, or None if it is estimated per call."""
+        if contract_function.abi['name'] in PER_CALL_GAS_FUNCTIONS:
+            return None
+        return contract_function.address, function_abi_to_4byte_selector(contract_function.abi)
+
+    def gas_limit(self, contract_function, from_address, value=0):
+        key = self.gas_key(contract_function)
+        if key is None or key not in self._gas_limits:
+            limit = int(contract_function.estimate_gas({'from': from_address, 'value': value}) * self.gas_buffer)
+            if key is None:
+                return limit
+            self._gas_limits[key] = limit
+        return self._gas_limits[key]
+
+    # --- Outcomes ---
+
+    def record(self, pending):
+        """Records a finished PendingTransaction (from tx_manager) that was priced by this estimator."""
+        quote = getattr(pending, "quote", None)
+        if quote is None or pending.receipt is None:
+            return
+        receipt = pending.receipt
+        gas_key = getattr(pending, "gas_key", None)
+        if gas_key is not None and receipt['gasUsed'] * self.gas_buffer > self._gas_limits.get(gas_key, 0):
+            # e.g. a function that took a costlier branch than the one it was estimated on
+            self._gas_limits[gas_key] = int(receipt['gasUsed'] * self.gas_buffer)
+        self._outcomes[quote.urgency].append({
+            "blocks": receipt['blockNumber'] - quote.block_number,
+            "seconds": time.monotonic() - pending.first_sent_at,
+            "cost": receipt['gasUsed'] * receipt['effectiveGasPrice'],
+            "effective_price": receipt['effectiveGasPrice'],
+            "speed_ups": pending.speed_ups,
+            "succeeded": pending.succeeded,
+        })
+
+    def report(self):
+        summary = {}
+        for urgency, outcomes in self._outcomes.items():
+            n = len(outcomes)
+            summary[urgency] = {
+                "transactions": n,
+                "avg_inclusion_blocks": sum(o["blocks"] for o in outcomes) / n,
+                "max_inclusion_blocks": max(o["blocks"] for o in outcomes),
+                "avg_inclusion_seconds": sum(o["seconds"] for o in outcomes) / n,
+                "avg_effective_gwei": sum(o["effective_price"] for o in outcomes) / n / 10 ** 9,
+                "total_cost_eth": sum(o["cost"] for o in outcomes) / 10 ** 18,
+                "speed_ups": sum(o["speed_ups"] for o in outcomes),
+                "failed": sum(not o["succeeded"] for o in outcomes),
+            }
+        return summary
+
+    def print_report(self):
+        for urgency, s in self.report().items():
+            print(f"[fees:{urgency}] {s['transactions']} tx, included after {s['avg_inclusion_blocks']:.1f} blocks "
+                  f"(max {s['max_inclusion_blocks']}, {s['avg_inclusion_seconds']:.1f} s), "
+                  f"{s['avg_effective_gwei']:.2f} gwei, {s['total_cost_eth']:.6f} ETH total, "
+                  f"{s['speed_ups']} speed-up(s), {s['failed']} failed")
+
+
+# --- 3. FIXED FEES VS. ESTIMATED FEES ON THE DEV CHAIN ---
+
+if __name__ == "__main__":
+    from web3 import Web3
+    from eth_account import Account
+    from contract_abi import CROWDFUNDING_ABI
+    from dev_chain import DevChain, DevChainProvider
+    from tx_manager import TransactionManager
+
+    NUM_TXS = 5
+    MAX_BLOCKS = 40
+    # The agent's old hard-coded values
+    FIXED_FIELDS = {'gas': 350000, 'maxFeePerGas': 20 * 10 ** 9, 'maxPriorityFeePerGas': 2 * 10 ** 9}
+    SCENARIOS = {
+        # name: (starting base fee, other users' demand as a share of the gas limit, their average tip)
+        "quiet": (10 ** 9, 0.3, 10 ** 8),
+        "busy": (18 * 10 ** 9, 1.3, 3 * 10 ** 9),
+    }
+
+    def run(scenario, strategy):
+        base_fee, demand, tip = SCENARIOS[scenario]
+        agent = Account.create()
+        chain = DevChain(CROWDFUNDING_ABI, agent.address, base_fee=base_fee, auto_mine=False)
+        chain.fund(agent.address, 10 ** 21)
+        w3 = Web3(DevChainProvider(chain, cache_allowed_requests=True))
+        contract = w3.eth.contract(address=chain.contract_address, abi=CROWDFUNDING_ABI)
+        creator = chain.new_account()
+        chain.send_as(creator, chain.contract_address, contract.encode_abi(
+            "createCampaign", args=[creator.address, "Campaign", "", 10 ** 18, chain.time + 86400, ""]), tip=10 ** 10)
+        chain.background_gas, chain.background_tip = int(chain.block_gas_limit * demand), tip
+        chain.mine(10)  # some fee history to look at
+
+        estimator = FeeEstimator(w3, urgency=strategy if strategy != "fixed" else DEFAULT_URGENCY)
+        manager = TransactionManager(w3, agent, stuck_after=3600, fee_estimator=estimator)
+        fields = dict(FIXED_FIELDS) if strategy == "fixed" else {}
+        sent = [manager.submit(contract.functions.donateToCampaign(0), dict(fields, value=10 ** 15)) for _ in range(NUM_TXS)]
+        start_block = chain.head["number"]
+        for _ in range(MAX_BLOCKS):
+            chain.mine()
+            manager.poll()
+            if all(p.receipt is not None for p in sent):
+                break
+        mined = [p for p in sent if p.receipt is not None]
+        blocks = [p.receipt['blockNumber'] - start_block for p in mined]
+        cost = sum(p.receipt['gasUsed'] * p.receipt['effectiveGasPrice'] for p in mined)
+        return len(mined), (sum(blocks) / len(blocks) if blocks else None), cost, sent[0].txn['gas'], sent[0].txn['maxFeePerGas']
+
+    import contextlib, io
+    print(f"{NUM_TXS} donations per run, gave up after {MAX_BLOCKS} blocks\n")
+    print(f"{'scenario':<8} {'strategy':<8} {'included':>9} {'avg blocks':>11} {'gas limit':>10} {'max fee gwei':>13} {'cost ETH':>11}")
+    for scenario in SCENARIOS:
+        for strategy in ("fixed", "low", "medium", "high"):
+            with contextlib.redirect_stdout(io.StringIO()):
+                included, avg_blocks, cost, gas, max_fee = run(scenario, strategy)
+            blocks = f"{avg_blocks:.1f}" if avg_blocks is not None else "-"
+            print(f"{scenario:<8} {strategy:<8} {included:>5}/{NUM_TXS:<3} {blocks:>11} {gas:>10} {max_fee / 10 ** 9:>13.2f} {cost / 10 ** 18:>11.6f}")
@@ -0,0 +1,234 @@
+import json
+from collections import namedtuple
+
+from eth_utils import get_abi_output_types, to_checksum_address
+from web3.exceptions import TransactionNotFound
+
+from contract_abi import MULTICALL3_ADDRESS, MULTICALL3_ABI
+
+# --- 1. CONFIGURATION ---
+
+BATCH_SIZE = 100        # requests per JSON-RPC batch; most providers cap batches at 100-1000
+MULTICALL_CHUNK = 200   # view calls per aggregate3 call, kept well under the node's eth_call gas cap
+
+ChainSnapshot = namedtuple("ChainSnapshot", ["block_number", "timestamp", "base_fee", "contract_balance", "agent_nonce"])
+
+
+# --- 2. THE BATCHED READER ---
+
+class ChainReader:
+    """
+    Groups the agent's reads into as few round-trips as possible.
+
+    - Plain RPC reads (block, balance, nonce) go out as one JSON-RPC batch.
+    - Many view calls on the contract (e.g. `campaigns(i)` for every campaign)
+      go through Multicall3 as a single eth_call when it is deployed, and as
+      JSON-RPC batches of eth_call otherwise.
+    - Values that never change (chain id, whether Multicall3 exists) are fetched once.
+
+    Providers that can't batch are detected on the first try and served one call at a time.
+    """
+
+    def __init__(self, w3, contract, agent_address=None, use_multicall=True, batch_size=BATCH_SIZE):
+        self.w3 = w3
+        self.contract = contract
+        self.agent_address = agent_address
+        self.use_multicall = use_multicall
+        self.batch_size = batch_size
+        self.batching = True
+        self.multicall = w3.eth.contract(address=MULTICALL3_ADDRESS, abi=json.loads(MULTICALL3_ABI))
+        self._chain_id = None
+        self._multicall_available = None
+        self._output_types = {}
+
+    # --- Immutable values ---
+
+    @property
+    def chain_id(self):
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+
+    @property
+    def multicall_available(self):
+        if self._multicall_available is None:
+            self._multicall_available = self.use_multicall and len(self.w3.eth.get_code(MULTICALL3_ADDRESS)) > 0
+        return self._multicall_available
+
+    # --- JSON-RPC batching ---
+
+    def batch(self, requests):
+        """
+        Runs a list of zero-argument callables (e.g. `lambda: w3.eth.get_balance(a)`)
+        as JSON-RPC batches and returns their results in order.
+        """
+        results = []
+        for start in range(0, len(requests), self.batch_size):
+            chunk = requests[start:start + self.batch_size]
+            if self.batching and len(chunk) > 1:
+                try:
+                    with self.w3.batch_requests() as batch:
+                        for request in chunk:
+                            batch.add(request())
+                        results.extend(batch.execute())
+                    continue
+                except NotImplementedError:
+                    print("Provider does not support JSON-RPC batches. Sending requests one by one.")
+                    self.batching = False
+            results.extend(request() for request in chunk)
+        return results
+
+    def snapshot(self):
+        """Latest block, contract balance and the agent's pending nonce in one round-trip."""
+        requests = [
+            lambda: self.w3.eth.get_block('latest'),
+            lambda: self.w3.eth.get_balance(self.contract.address),
+        ]
+        if self.agent_address:
+            requests.append(lambda: self.w3.eth.get_transaction_count(self.agent_address, 'pending'))
+        if self._chain_id is None:
+            requests.append(lambda: self.w3.eth.chain_id)
+
+        results = self.batch(requests)
+        block, balance = results[0], results[1]
+        nonce = results[2] if self.agent_address else None
+        if self._chain_id is None:
+            self._chain_id = results[-1]
+        return ChainSnapshot(block['number'], block['timestamp'], block.get('baseFeePerGas'), balance, nonce)
+
+    def tx_params(self, nonce=None):
+        """The from/nonce/chainId fields for build_transaction. Pass a nonce from a snapshot to skip the lookup."""
+        if nonce is None:
+            nonce = self.w3.eth.get_transaction_count(self.agent_address, 'pending')
+        return {'from': self.agent_address, 'nonce': nonce, 'chainId': self.chain_id}
+
+    def get_blocks(self, numbers, full_transactions=False):
+        return self.batch([
+            lambda n=n: self.w3.eth.get_block(n, full_transactions=full_transactions) for n in numbers
+        ])
+
+    def get_receipts(self, tx_hashes):
+        """
+        Receipts for many transactions, None for the ones not mined yet. web3 raises for a
+        missing receipt inside a batch, so the first (raw) batch only finds out which exist.
+        """
+        tx_hashes = list(tx_hashes)
+        if not tx_hashes:
+            return []
+        if not self.batching:
+            return [self._get_receipt(tx_hash) for tx_hash in tx_hashes]
+        try:
+            raw = self.w3.provider.make_batch_request(
+                [("eth_getTransactionReceipt", [self.w3.to_hex(tx_hash)]) for tx_hash in tx_hashes]
+            )
+        except NotImplementedError:
+            raw = None
+        if not isinstance(raw, list):
+            # Either the provider class can't batch or the node answered the batch with a single error
+            print("Provider does not support JSON-RPC batches. Sending requests one by one.")
+            self.batching = False
+            return [self._get_receipt(tx_hash) for tx_hash in tx_hashes]
+        mined = [tx_hash for tx_hash, response in zip(tx_hashes, raw) if response.get('result')]
+        found = dict(zip(mined, self.batch([lambda h=h: self.w3.eth.get_transaction_receipt(h) for h in mined])))
+        return [found.get(tx_hash) for tx_hash in tx_hashes]
+
+    def _get_receipt(self, tx_hash):
+        try:
+            return self.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+
+    # --- Contract view calls ---
+
+    def _decode_output(self, fn_name, data):
+        if fn_name not in self._output_types:
+            self._output_types[fn_name] = get_abi_output_types(self.contract.get_function_by_name(fn_name).abi)
+        types = self._output_types[fn_name]
+        # Match what contract.functions.x().call() returns: checksummed addresses
+        values = [to_checksum_address(v) if t == 'address' else v for t, v in zip(types, self.w3.codec.decode(types, data))]
+        return values[0] if len(values) == 1 else tuple(values)
+
+    def call_many(self, calls, block='latest'):
+        """
+        Runs view calls given as (function_name, args) pairs against the contract at
+        `block`. Returns the decoded results in order.
+        """
+        if not calls:
+            return []
+        if not self.multicall_available:
+            return self.batch([
+                lambda name=name, args=args: getattr(self.contract.functions, name)(*args).call(block_identifier=block)
+                for name, args in calls
+            ])
+
+        results = []
+        for start in range(0, len(calls), MULTICALL_CHUNK):
+            chunk = calls[start:start + MULTICALL_CHUNK]
+            payload = [(self.contract.address, False, self.contract.encode_abi(name, args=list(args))) for name, args in chunk]
+            returned = self.multicall.functions.aggregate3(payload).call(block_identifier=block)
+            results.extend(self._decode_output(name, data) for (name, _), (_, data) in zip(chunk, returned))
+        return results
+
+    def read_campaigns(self, campaign_ids, block='latest'):
+        """Raw `campaigns(i)` tuples for every id, in as few round-trips as the provider allows."""
+        return self.call_many([("campaigns", (campaign_id,)) for campaign_id in campaign_ids], block)
+
+
+# --- 3. ROUND-TRIP COMPARISON ON THE DEV CHAIN ---
+
+if __name__ == "__main__":
+    import time
+    from web3 import Web3
+    from eth_account import Account
+    from contract_abi import CROWDFUNDING_ABI
+    from dev_chain import DevChain, DevChainProvider
+
+    NUM_CAMPAIGNS = 500
+    LATENCY = 0.02  # a 20 ms round-trip, typical for a hosted RPC endpoint
+
+    agent = Account.create()
+    chain = DevChain(CROWDFUNDING_ABI, agent.address)
+    chain.fund(agent.address, 10 ** 20)
+    creator = chain.new_account()
+    # The agent's old setup (no request caching) next to the new one
+    plain_w3 = Web3(DevChainProvider(chain, latency=LATENCY))
+    w3 = Web3(DevChainProvider(chain, latency=LATENCY, cache_allowed_requests=True))
+    contract = w3.eth.contract(address=chain.contract_address, abi=CROWDFUNDING_ABI)
+    plain_contract = plain_w3.eth.contract(address=chain.contract_address, abi=CROWDFUNDING_ABI)
+    for i in range(NUM_CAMPAIGNS):
+        data = contract.encode_abi("createCampaign", args=[creator.address, f"Campaign {i}", "", 10 ** 18, chain.time + 86400 * (i + 1), ""])
+        chain.send_as(creator, chain.contract_address, data)
+
+    def measure(label, func, provider=w3.provider):
+        provider.reset_counters()
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{label:<46} {provider.round_trips:>6} round-trips {elapsed:>9.1f} ms")
+
+    def one_by_one_cycle():
+        plain_w3.eth.get_balance(plain_contract.address)
+        plain_contract.functions.invest().build_transaction({
+            'from': agent.address, 'nonce': plain_w3.eth.get_transaction_count(agent.address),
+            'gas': 350000, 'maxFeePerGas': 2 * 10 ** 10, 'maxPriorityFeePerGas': 2 * 10 ** 9, 'chainId': plain_w3.eth.chain_id,
+        })
+
+    reader = ChainReader(w3, contract, agent.address)
+    reader.snapshot()  # warms the chain id cache, like the agent's first cycle
+
+    def batched_cycle():
+        snap = reader.snapshot()
+        contract.functions.invest().build_transaction({
+            **reader.tx_params(snap.agent_nonce),
+            'gas': 350000, 'maxFeePerGas': 2 * 10 ** 10, 'maxPriorityFeePerGas': 2 * 10 ** 9,
+        })
+
+    print(f"Dev chain with {NUM_CAMPAIGNS} campaigns, {LATENCY * 1000:.0f} ms per round-trip\n")
+    measure("check cycle + invest tx, one call at a time", one_by_one_cycle, plain_w3.provider)
+    measure("check cycle + invest tx, batched", batched_cycle)
+    measure(f"read {NUM_CAMPAIGNS} campaigns, one call at a time",
+            lambda: [plain_contract.functions.campaigns(i).call() for i in range(NUM_CAMPAIGNS)], plain_w3.provider)
+    measure(f"read {NUM_CAMPAIGNS} campaigns, JSON-RPC batches",
+            lambda: ChainReader(w3, contract, use_multicall=False).read_campaigns(range(NUM_CAMPAIGNS)))
+    measure(f"read {NUM_CAMPAIGNS} campaigns, Multicall3",
+            lambda: reader.read_campaigns(range(NUM_CAMPAIGNS)))
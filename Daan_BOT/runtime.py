@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import asyncio
+
+from dotenv import load_dotenv
+from web3 import Web3
+
+from contract_agent import ContractAgent
+from contract_state import STATE_DIR
+from failover_provider import FailoverProvider
+from fee_estimator import FeeEstimator, DEFAULT_URGENCY
+from rpc_batch import ChainReader
+from tx_manager import TransactionManager
+
+# --- 1. CONFIGURATION ---
+
+load_dotenv()
+
+# A JSON file listing chains (each with one or more RPC endpoints) and the contracts on them:
+# {"chains": {"sepolia": ["https://...", "wss://..."]},
+#  "contracts": [{"name": "main", "chain": "sepolia", "address": "0x...", "start_block": 0}]}
+# Without it, PROVIDER_URLS / PROVIDER_URL and CROWDFUNDING_CONTRACT_ADDRESSES /
+# CROWDFUNDING_CONTRACT_ADDRESS (comma-separated) describe a single chain.
+DEPLOYMENTS_FILE = os.getenv("DEPLOYMENTS_FILE")
+RUNTIME_STATE_DIR = os.getenv("RUNTIME_STATE_DIR", STATE_DIR)
+
+TICK_INTERVAL = 4           # seconds between head checks per chain (about a third of a block)
+MAX_CONCURRENT_CYCLES = 16  # contract cycles running at once, across all chains
+
+
+# --- 2. ONE CHAIN ---
+
+class ChainGroup:
+    """
+    The contracts on one chain that share an agent key. They share one Web3
+    connection (a FailoverProvider over the chain's endpoints), one transaction
+    manager, so nonces never collide, one fee estimator, and one batched read of
+    the head block and every contract's balance per tick.
+    """
+
+    def __init__(self, name, endpoints, account, urgency=DEFAULT_URGENCY, max_fee_cap=None, cooldown=None):
+        self.name = name
+        provider_kwargs = {"cooldown": cooldown} if cooldown is not None else {}
+        self.w3 = Web3(FailoverProvider(endpoints, **provider_kwargs))
+        self.account = account
+        self.reader = ChainReader(self.w3, None, account.address)
+        self.fee_estimator = FeeEstimator(self.w3, urgency=urgency, max_fee_cap=max_fee_cap)
+        self.tx_manager = TransactionManager(self.w3, account, reader=self.reader, max_fee_cap=max_fee_cap,
+                                             fee_estimator=self.fee_estimator)
+        self.agents = []
+
+    def add_contract(self, name, address, state_dir=RUNTIME_STATE_DIR, start_block=0, clock=time.time):
+        contract_dir = os.path.join(state_dir, self.name)
+        os.makedirs(contract_dir, exist_ok=True)
+        address = Web3.to_checksum_address(address)
+        agent = ContractAgent(name, self.w3, self.account, address, self.tx_manager,
+                              os.path.join(contract_dir, f"{address}.sqlite"), os.path.join(contract_dir, f"{address}.json"),
+                              start_block=start_block, clock=clock)
+        self.agents.append(agent)
+        return agent
+
+    def read_heads(self):
+        """Latest block number and {address: balance} for every contract, batched (BATCH_SIZE per round-trip)."""
+        eth = self.w3.eth
+        requests = [lambda: eth.block_number, lambda: eth.get_transaction_count(self.account.address, 'pending')]
+        requests += [lambda a=agent.address: eth.get_balance(a) for agent in self.agents]
+        results = self.reader.batch(requests)
+        # Picks up transactions sent with the same key from elsewhere
+        self.tx_manager.nonces.observe(results[1])
+        return results[0], {agent.address: balance for agent, balance in zip(self.agents, results[2:])}
+
+
+# --- 3. THE SUPERVISOR ---
+
+class AgentRuntime:
+    """
+    Runs many ChainGroups in one process. Each chain gets an asyncio task that
+    reads the head and all balances once per tick and runs the check cycle only
+    for the contracts that need it. Cycles are blocking web3 code, so they run
+    in worker threads, at most `max_concurrent` at a time. A failing contract or
+    endpoint is reported and retried on the next tick without stopping the others.
+    """
+
+    def __init__(self, groups, max_concurrent=MAX_CONCURRENT_CYCLES, tick_interval=TICK_INTERVAL, clock=time.time):
+        self.groups = groups
+        self.max_concurrent = max_concurrent
+        self.tick_interval = tick_interval
+        self.clock = clock
+        self.ticks = 0
+        self._stop = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    async def _sleep(self, seconds):
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _cycle(self, agent, balance, block_number):
+        async with self._slots:
+            try:
+                await asyncio.to_thread(agent.cycle, balance, block_number)
+            except Exception as e:
+                print(f"!!! [{agent.name}] Check cycle failed: {e}")
+
+    async def tick(self, group):
+        """One head check for `group`, then the cycles of the contracts that need one. Returns how many ran."""
+        block_number, balances = await asyncio.to_thread(group.read_heads)
+        now = self.clock()
+        due = [agent for agent in group.agents if agent.needs_cycle(balances[agent.address], block_number, now)]
+        await asyncio.gather(*(self._cycle(agent, balances[agent.address], block_number) for agent in due))
+        if group.tx_manager.take_finished():
+            group.fee_estimator.print_report()
+        self.ticks += 1
+        return len(due)
+
+    async def run_group(self, group):
+        group.tx_manager.start_tracking()
+        try:
+            while not self._stop.is_set():
+                try:
+                    await self.tick(group)
+                except Exception as e:
+                    print(f"!!! [{group.name}] Could not read the chain: {e}")
+                await self._sleep(self.tick_interval)
+        finally:
+            await asyncio.to_thread(group.tx_manager.stop_tracking)
+
+    async def run(self):
+        contracts = sum(len(group.agents) for group in self.groups)
+        print(f"Runtime started: {contracts} contract(s) on {len(self.groups)} chain(s).")
+        await asyncio.gather(*(self.run_group(group) for group in self.groups))
+
+    def stop(self):
+        self._stop.set()
+
+
+# --- 4. LOADING DEPLOYMENTS ---
+
+def _split(value):
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+def load_deployments(path=None):
+    """The deployments file as a dict, or the single-chain equivalent built from the environment."""
+    if path:
+        with open(path) as f:
+            return json.load(f)
+    endpoints = _split(os.getenv("PROVIDER_URLS")) or _split(os.getenv("PROVIDER_URL"))
+    addresses = _split(os.getenv("CROWDFUNDING_CONTRACT_ADDRESSES")) or _split(os.getenv("CROWDFUNDING_CONTRACT_ADDRESS"))
+    start_block = int(os.getenv("CONTRACT_START_BLOCK", "0"))
+    return {
+        "chains": {"default": endpoints},
+        "contracts": [{"name": f"contract-{i}", "chain": "default", "address": a, "start_block": start_block}
+                      for i, a in enumerate(addresses)],
+    }
+
+def build_runtime(deployments, account, state_dir=RUNTIME_STATE_DIR, urgency=DEFAULT_URGENCY, max_fee_cap=None, clock=time.time):
+    groups = {name: ChainGroup(name, endpoints, account, urgency=urgency, max_fee_cap=max_fee_cap)
+              for name, endpoints in deployments["chains"].items()}
+    for entry in deployments["contracts"]:
+        groups[entry["chain"]].add_contract(entry.get("name", entry["address"]), entry["address"], state_dir,
+                                            start_block=entry.get("start_block", 0), clock=clock)
+    return AgentRuntime([group for group in groups.values() if group.agents], clock=clock)
+
+def main():
+    private_key = os.getenv("AGENT_PRIVATE_KEY")
+    deployments = load_deployments(DEPLOYMENTS_FILE)
+    if not private_key or not deployments["chains"] or not deployments["contracts"]:
+        raise Exception("Please set AGENT_PRIVATE_KEY and either DEPLOYMENTS_FILE or PROVIDER_URL(S) and CROWDFUNDING_CONTRACT_ADDRESS(ES)")
+    account = Web3().eth.account.from_key(private_key)
+    max_fee_gwei = os.getenv("MAX_FEE_GWEI")
+    runtime = build_runtime(deployments, account, urgency=os.getenv("FEE_URGENCY", DEFAULT_URGENCY),
+                            max_fee_cap=Web3.to_wei(float(max_fee_gwei), 'gwei') if max_fee_gwei else None)
+    print(f"Agent Wallet Address: {account.address}")
+    try:
+        asyncio.run(runtime.run())
+    except KeyboardInterrupt:
+        print("Runtime stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import time
+import heapq
+from collections import namedtuple
+
+# --- 1. CONFIGURATION ---
+
+RECLAIM_LEAD = 3600     # reclaim from Aave this long before a deadline, so payouts never wait on liquidity
+REFUND_DELAY = 60       # refundDonors needs block.timestamp > deadline; leave a few blocks of slack
+GROUP_WINDOW = 900      # actions due within this many seconds of each other run in the same cycle
+MAX_SLEEP = 3600        # never sleep longer than this, even with nothing scheduled
+RETRY_DELAY = 60        # an action whose transaction failed (or could not be sent yet) is due again after this
+
+ScheduledAction = namedtuple("ScheduledAction", ["due", "kind", "campaign_id"])
+
+
+# --- 2. THE SCHEDULER ---
+
+class DeadlineScheduler:
+    """
+    A priority queue of the agent's deadline-driven actions, keyed by due time:
+
+    - "reclaim" RECLAIM_LEAD seconds before the deadline of every campaign still
+      holding donations, so the contract has the funds when the owner claims or
+      the donors are refunded;
+    - "refund" REFUND_DELAY seconds after the deadline of campaigns that missed
+      their target (refundDonors).
+
+    `seconds_until_next` says how long the agent can sleep, and `pop_due` returns
+    every action falling in the same GROUP_WINDOW as the earliest due one, so
+    nearby deadlines are handled in one cycle. Re-scheduling a campaign leaves its
+    old heap entry behind; stale entries are skipped when they reach the top.
+
+    An action handed out by `pop_due` is not scheduled again until the caller
+    reports it: `done` once its transaction succeeded (or it turned out not to be
+    needed), `retry` if the transaction failed or could not be sent.
+    """
+
+    def __init__(self, reclaim_lead=RECLAIM_LEAD, refund_delay=REFUND_DELAY, window=GROUP_WINDOW):
+        self.reclaim_lead = reclaim_lead
+        self.refund_delay = refund_delay
+        self.window = window
+        self._heap = []
+        self._due = {}      # (kind, campaign_id) -> due time of the live entry
+        self._running = set()  # handed out by pop_due, outcome not reported yet
+        self._done = set()     # finished, so a re-sync doesn't schedule them again while the campaign still needs it
+
+    def __len__(self):
+        return len(self._due)
+
+    # --- Scheduling ---
+
+    def _set(self, kind, campaign_id, due):
+        key = (kind, campaign_id)
+        if due is None:
+            # Claimed or paid out: the action is never needed again, so neither is its done marker
+            self._done.discard(key)
+        if due is None or key in self._done or key in self._running:
+            self._due.pop(key, None)
+            return
+        if self._due.get(key) != due:
+            self._due[key] = due
+            heapq.heappush(self._heap, (due, kind, campaign_id))
+
+    def schedule(self, campaign):
+        """(Re)schedules the actions for one indexed Campaign."""
+        holds_funds = not campaign.claimed and campaign.amount_collected > 0
+        reclaim_due = campaign.deadline - self.reclaim_lead if holds_funds else None
+        missed_target = holds_funds and campaign.amount_collected < campaign.target
+        refund_due = campaign.deadline + self.refund_delay if missed_target else None
+        self._set("reclaim", campaign.id, reclaim_due)
+        self._set("refund", campaign.id, refund_due)
+
+    def load(self, campaigns):
+        for campaign in campaigns:
+            self.schedule(campaign)
+
+    def done(self, action):
+        """The action handed out by pop_due succeeded; it is not scheduled again."""
+        key = (action.kind, action.campaign_id)
+        self._running.discard(key)
+        self._done.add(key)
+
+    def retry(self, action, now=None, delay=RETRY_DELAY):
+        """The action handed out by pop_due did not go through; it is due again `delay` seconds from now."""
+        now = now if now is not None else time.time()
+        self._running.discard((action.kind, action.campaign_id))
+        self._set(action.kind, action.campaign_id, now + delay)
+
+    def update_from_index(self, indexer, campaign_ids):
+        """Re-schedules the campaigns a CampaignIndexer.sync() reported as changed."""
+        for campaign_id in campaign_ids:
+            campaign = indexer.get(campaign_id)
+            if campaign is not None:
+                self.schedule(campaign)
+
+    # --- Waking up ---
+
+    def _drop_stale(self):
+        while self._heap:
+            due, kind, campaign_id = self._heap[0]
+            if self._due.get((kind, campaign_id)) == due:
+                return
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        """The earliest scheduled ScheduledAction, or None."""
+        self._drop_stale()
+        if not self._heap:
+            return None
+        return ScheduledAction(*self._heap[0])
+
+    def seconds_until_next(self, now=None, max_sleep=MAX_SLEEP):
+        now = now if now is not None else time.time()
+        action = self.next_due()
+        if action is None:
+            return max_sleep
+        return min(max(action.due - now, 0), max_sleep)
+
+    def pop_due(self, now=None):
+        """
+        If the earliest action is due, returns it together with the actions due
+        within `window` seconds after it, in due order. Otherwise returns [].
+        Reclaims may be pulled forward this way; refunds only run once they are
+        due, since refundDonors reverts before the deadline.
+        """
+        now = now if now is not None else time.time()
+        first = self.next_due()
+        if first is None or first.due > now:
+            return []
+        actions, not_yet = [], []
+        while True:
+            action = self.next_due()
+            if action is None or action.due > first.due + self.window:
+                break
+            heapq.heappop(self._heap)
+            if action.kind == "refund" and action.due > now:
+                not_yet.append(action)
+                continue
+            key = (action.kind, action.campaign_id)
+            del self._due[key]
+            self._running.add(key)
+            actions.append(action)
+        for action in not_yet:
+            heapq.heappush(self._heap, tuple(action))
+        return actions
@@ -0,0 +1,256 @@
+# simulate.py
+#
+# Runs the agent (contract_agent.ContractAgent, the invest / reclaim / refund rules shared by
+# agent.py and runtime.py) against the in-process chain in dev_chain.py, with its mock Aave pool,
+# thousands of synthetic campaigns and donations, and owners claiming their funds after the
+# deadline. One block is mined per STEP_SECONDS of simulated time and the agent gets one tick per
+# block: either a runtime.AgentRuntime tick, or one pass of agent.py's event loop (event_step, with
+# agent.py set up on the dev chain and its clock).
+#
+# Reports decision latency, RPC calls per cycle, transaction throughput and gas spent, and checks
+# the outcome: every owner claim should find the funds in the contract and every campaign that
+# missed its target should be refunded.
+#
+#   python simulate.py                  # 2000 campaigns over 30 days, through runtime.py
+#   python simulate.py 5000 60 20       # campaigns, days, simulated RPC latency in ms
+#   python simulate.py 2000 30 0 agent  # through agent.py instead
+
+import io
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+import contextlib
+from collections import Counter
+
+from eth_account import Account
+from eth_utils import keccak, to_checksum_address
+from web3 import Web3
+
+import agent as agent_module
+from contract_abi import CROWDFUNDING_ABI
+from dev_chain import DevChain, DevChainProvider, GAS_COSTS
+from runtime import ChainGroup, AgentRuntime
+
+NUM_CAMPAIGNS = 2000
+SIM_DAYS = 30
+LATENCY_MS = 0
+DRIVERS = ("runtime", "agent")
+STEP_SECONDS = 900            # simulated time per block
+CREATE_BATCH = 100            # campaigns created per block during setup
+DONATIONS_PER_CAMPAIGN = 5    # on average
+NUM_CREATORS = 100
+NUM_DONORS = 50
+MET_TARGET_SHARE = 0.6        # share of campaigns whose donations reach the target
+AAVE_APY = 0.04
+START_TIME = 1_800_000_000
+SEED = 42
+VERBOSE = False               # show the agent's own output
+
+
+def plan_campaigns(rng, num_campaigns, days):
+    """(creator index, target, deadline) per campaign, and a time-ordered list of user actions."""
+    campaigns, actions = [], []
+    for campaign_id in range(num_campaigns):
+        deadline = START_TIME + rng.randint(86400, days * 86400)
+        target = rng.randint(1, 20) * 10 ** 17
+        meets_target = rng.random() < MET_TARGET_SHARE
+        total = target + rng.randint(0, target // 2) if meets_target else rng.randint(target // 10, target * 9 // 10)
+        campaigns.append((rng.randrange(NUM_CREATORS), target, deadline))
+
+        count = rng.randint(1, 2 * DONATIONS_PER_CAMPAIGN - 1)
+        weights = [rng.random() + 0.1 for _ in range(count)]
+        amounts = [int(total * w / sum(weights)) for w in weights]
+        amounts[-1] += total - sum(amounts)
+        for amount in amounts:
+            when = rng.randint(START_TIME + 2 * STEP_SECONDS, deadline - STEP_SECONDS)
+            actions.append((when, "donate", campaign_id, rng.randrange(NUM_DONORS), amount))
+        if meets_target:
+            actions.append((deadline + rng.randint(STEP_SECONDS, 86400), "claim", campaign_id, None, 0))
+    actions.sort(key=lambda a: a[0])
+    return campaigns, actions
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+class RuntimeDriver:
+    """Ticks the contract through runtime.AgentRuntime, as runtime.py runs it."""
+
+    def __init__(self, provider, account, address, state_dir, clock):
+        self.group = ChainGroup("sim", [provider], account)
+        self.contract_agent = self.group.add_contract("sim", address, state_dir, clock=clock)
+        self.tx_manager = self.group.tx_manager
+        self.runtime = AgentRuntime([self.group], clock=clock)
+
+    async def tick(self):
+        await self.runtime.tick(self.group)
+
+
+class AgentDriver:
+    """Ticks the contract through agent.py's event loop, one event_step per block, without waiting."""
+
+    def __init__(self, provider, account, address, state_dir, clock):
+        self.contract_agent = agent_module.setup(Web3(provider), account, address, clock_func=clock,
+                                                 db_path=os.path.join(state_dir, "campaigns.sqlite"),
+                                                 state_path=os.path.join(state_dir, "agent.json"))
+        self.tx_manager = agent_module.tx_manager
+        self.monitor, self.change = agent_module.start_monitor()
+
+    async def tick(self):
+        change, self.change = self.change, None
+        agent_module.event_step(self.monitor, change, timeout=0)
+
+
+DRIVER_CLASSES = {"runtime": RuntimeDriver, "agent": AgentDriver}
+
+
+async def simulate(num_campaigns, days, latency_ms, driver="runtime"):
+    rng = random.Random(SEED)
+    agent = Account.create()
+    chain = DevChain(CROWDFUNDING_ABI, agent.address, start_time=START_TIME, block_time=STEP_SECONDS,
+                     auto_mine=False, aave_apy=AAVE_APY)
+    chain.background_tip = 10 ** 9
+    chain.fund(agent.address, 10 ** 21)
+    # Users send unsigned (impersonated) transactions; only the agent signs, as it would on a real chain
+    creators = [to_checksum_address(keccak(f"creator-{i}".encode())[:20]) for i in range(NUM_CREATORS)]
+    donors = [to_checksum_address(keccak(f"donor-{i}".encode())[:20]) for i in range(NUM_DONORS)]
+    for address in creators + donors:
+        chain.fund(address, 10 ** 24)
+    encoder = Web3().eth.contract(address=chain.contract_address, abi=CROWDFUNDING_ABI)
+
+    campaigns, actions = plan_campaigns(rng, num_campaigns, days)
+    for campaign_id, (creator, target, deadline) in enumerate(campaigns):
+        data = encoder.encode_abi("createCampaign", args=[creators[creator], f"Campaign {campaign_id}", "", target, deadline, ""])
+        chain.send_from(creators[creator], chain.contract_address, data)
+        if len(chain.pending) >= CREATE_BATCH:
+            chain.mine()
+    while chain.pending:
+        chain.mine()
+
+    # agent.connect() asks web3 to cache eth_chainId; FailoverProvider (runtime.py) does it itself
+    provider = DevChainProvider(chain, latency=latency_ms / 1000, cache_allowed_requests=driver == "agent")
+    with contextlib.nullcontext() if VERBOSE else contextlib.redirect_stdout(io.StringIO()):
+        driver = DRIVER_CLASSES[driver](provider, agent, chain.contract_address, tempfile.mkdtemp(prefix="daan-sim-"),
+                                        clock=lambda: chain.time)
+    contract_agent, tx_manager = driver.contract_agent, driver.tx_manager
+
+    stats = {"tick_ms": [], "cycle_ms": [], "decision_ms": [], "cycle_round_trips": [], "cycle_calls": [],
+             "idle_round_trips": [], "labels": Counter(), "inclusion_blocks": [], "failed": 0, "gas": 0, "cost": 0}
+    method_calls = Counter()
+    sent_in_block = {}
+    claims = {"ok": 0, "reverted": 0}
+    donations = 0
+    end_time = START_TIME + (days + 2) * 86400
+    next_action = 0
+    started = time.perf_counter()
+
+    while chain.time < end_time:
+        # --- Users act, the block is mined ---
+        claim_hashes = []
+        while next_action < len(actions) and actions[next_action][0] <= chain.time:
+            _, kind, campaign_id, donor, amount = actions[next_action]
+            next_action += 1
+            if kind == "donate":
+                chain.send_from(donors[donor], chain.contract_address, encoder.encode_abi("donateToCampaign", args=[campaign_id]), value=amount)
+                donations += 1
+            else:
+                owner = creators[campaigns[campaign_id][0]]
+                claim_hashes.append(chain.send_from(owner, chain.contract_address, encoder.encode_abi("claimFunds", args=[campaign_id])))
+        # Other users fill the block up to the gas target, so the base fee holds steady instead of drifting
+        chain.background_gas = max(0, chain.block_gas_limit // 2 - len(chain.pending) * GAS_COSTS["donateToCampaign"])
+        chain.mine()
+        for tx_hash in claim_hashes:
+            claims["ok" if chain.receipts[tx_hash]["status"] == 1 else "reverted"] += 1
+
+        # --- The agent reacts ---
+        provider.reset_counters()
+        cycles_before = contract_agent.cycles
+        nonces_before = set(tx_manager.in_flight)
+        output = contextlib.nullcontext() if VERBOSE else contextlib.redirect_stdout(io.StringIO())
+        with output:
+            tick_start = time.perf_counter()
+            await driver.tick()
+            tick_ms = (time.perf_counter() - tick_start) * 1000
+            finished = tx_manager.poll()
+
+        sent = set(tx_manager.in_flight) - nonces_before
+        for nonce in sent:
+            sent_in_block[nonce] = chain.head["number"]
+        stats["tick_ms"].append(tick_ms)
+        method_calls.update(provider.calls)
+        if contract_agent.cycles > cycles_before:
+            stats["cycle_ms"].append(tick_ms)
+            stats["cycle_round_trips"].append(provider.round_trips)
+            stats["cycle_calls"].append(sum(provider.calls.values()))
+        else:
+            stats["idle_round_trips"].append(provider.round_trips)
+        if sent:
+            stats["decision_ms"].append(tick_ms)
+        for pending in finished:
+            stats["labels"][pending.label.split(" ", 1)[1].split(":")[0]] += 1
+            if pending.receipt is None:
+                stats["failed"] += 1
+                continue
+            stats["failed"] += not pending.succeeded
+            stats["gas"] += pending.receipt["gasUsed"]
+            stats["cost"] += pending.receipt["gasUsed"] * pending.receipt["effectiveGasPrice"]
+            stats["inclusion_blocks"].append(pending.receipt["blockNumber"] - sent_in_block.pop(pending.nonce))
+
+    elapsed = time.perf_counter() - started
+    # Campaigns that met their target are the ones with a planned claim
+    claimed = {campaign_id for _, kind, campaign_id, _, _ in actions if kind == "claim"}
+    missed = [i for i in range(len(campaigns)) if i not in claimed]
+    refunded = sum(1 for i in missed if not chain.campaigns[i]["donations"])
+    invested = contract_agent.indexer.invested_amount()
+    return {
+        "stats": stats, "method_calls": method_calls, "claims": claims, "elapsed": elapsed, "donations": donations,
+        "blocks": chain.head["number"], "missed": len(missed), "refunded": refunded,
+        "aave_deposit": chain.aave_deposit, "interest": chain.aave_deposit - invested,
+        "contract_balance": chain.balances[chain.contract_address], "state": contract_agent.state.state,
+    }
+
+
+def report(result, num_campaigns, days, latency_ms, driver="runtime"):
+    s = result["stats"]
+    mined = len(s["inclusion_blocks"])
+    ether = lambda wei: wei / 10 ** 18
+    print(f"Simulated {days} days through {driver}.py: {num_campaigns} campaigns, {result['donations']} donations, "
+          f"{result['blocks']} blocks, {latency_ms} ms per RPC round-trip, in {result['elapsed']:.1f} s\n")
+    print(f"Agent ticks: {len(s['tick_ms'])}, check cycles: {len(s['cycle_ms'])}")
+    for label, values in (("every tick", s["tick_ms"]), ("ticks with a check cycle", s["cycle_ms"]),
+                          ("ticks that sent transactions", s["decision_ms"])):
+        print(f"Decision latency, {label:<29} p50 {percentile(values, 50):7.2f} ms  "
+              f"p95 {percentile(values, 95):7.2f} ms  max {max(values, default=0):7.2f} ms")
+    cycles = len(s["cycle_round_trips"]) or 1
+    print(f"RPC per tick without a cycle: {sum(s['idle_round_trips']) / max(len(s['idle_round_trips']), 1):.2f} round-trips")
+    print(f"RPC per check cycle: {sum(s['cycle_round_trips']) / cycles:.2f} round-trips, {sum(s['cycle_calls']) / cycles:.2f} calls "
+          f"(max {max(s['cycle_round_trips'], default=0)} / {max(s['cycle_calls'], default=0)})")
+    print("RPC calls by method: " + ", ".join(f"{m} {n}" for m, n in result["method_calls"].most_common()))
+    print(f"Agent transactions: {sum(s['labels'].values())} finished, {s['failed']} failed "
+          f"({', '.join(f'{label} {n}' for label, n in s['labels'].most_common())})")
+    print(f"Throughput: {mined / result['elapsed']:.1f} tx/s of wall time, included after "
+          f"{sum(s['inclusion_blocks']) / max(mined, 1):.2f} blocks on average (max {max(s['inclusion_blocks'], default=0)})")
+    print(f"Gas spent: {s['gas']} gas, {ether(s['cost']):.6f} ETH")
+    claims = result["claims"]
+    print(f"Owner claims: {claims['ok']} paid, {claims['reverted']} reverted for lack of funds")
+    print(f"Refunds: {result['refunded']}/{result['missed']} campaigns below target refunded")
+    print(f"End state: {result['state']}, {ether(result['contract_balance']):.4f} ETH in the contract, "
+          f"{ether(result['aave_deposit']):.4f} ETH in Aave ({ether(result['interest']):.6f} ETH interest)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:4]]
+    num_campaigns, days, latency_ms = args + [NUM_CAMPAIGNS, SIM_DAYS, LATENCY_MS][len(args):]
+    driver = sys.argv[4] if len(sys.argv) > 4 else DRIVERS[0]
+    if driver not in DRIVERS:
+        print(f"Unknown driver: '{driver}'. Choose one of {DRIVERS}.")
+        sys.exit(1)
+    result = asyncio.run(simulate(num_campaigns, days, latency_ms, driver))
+    report(result, num_campaigns, days, latency_ms, driver)
@@ -0,0 +1,70 @@
+import pytest
+
+from campaign_indexer import CampaignIndexer
+from rpc_batch import ChainReader
+
+DAY = 86400
+
+
+@pytest.fixture(params=["direct", "reader"])
+def indexer(request, w3, contract, tmp_path):
+    reader = ChainReader(w3, contract) if request.param == "reader" else None
+    return CampaignIndexer(w3, contract, str(tmp_path / "campaigns.sqlite"), reader=reader)
+
+
+def test_sync_picks_up_new_campaigns_and_donations(indexer, create_campaign, donate):
+    first = create_campaign()
+    summary = indexer.sync()
+    assert summary["new"] == 1 and summary["changed"] == [first]
+    assert indexer.get(first).amount_collected == 0
+
+    second = create_campaign()
+    donate(first, 3 * 10 ** 17)
+    summary = indexer.sync()
+    assert summary["new"] == 1 and summary["refreshed"] == 1
+    assert sorted(summary["changed"]) == [first, second]
+    assert indexer.get(first).amount_collected == 3 * 10 ** 17
+
+    assert indexer.sync()["changed"] == []
+
+
+def test_long_gap_rereads_every_open_campaign(w3, contract, tmp_path, create_campaign, donate, chain):
+    indexer = CampaignIndexer(w3, contract, str(tmp_path / "campaigns.sqlite"), max_scan_blocks=2)
+    campaign_id = create_campaign()
+    indexer.sync()
+    for _ in range(3):
+        chain.mine()
+    donate(campaign_id, 10 ** 17)
+    assert indexer.sync()["refreshed"] == 1
+    assert indexer.get(campaign_id).amount_collected == 10 ** 17
+
+
+def test_state_survives_a_restart(w3, contract, tmp_path, create_campaign):
+    path = str(tmp_path / "campaigns.sqlite")
+    create_campaign()
+    CampaignIndexer(w3, contract, path).sync()
+    restarted = CampaignIndexer(w3, contract, path)
+    assert restarted.count() == 1
+    assert restarted.sync()["new"] == 0
+
+
+def test_payout_liability_by_deadline(indexer, chain, create_campaign, donate):
+    soon, later, empty = create_campaign(days=1), create_campaign(days=10), create_campaign(days=1)
+    donate(soon, 2 * 10 ** 17)
+    donate(later, 5 * 10 ** 17)
+    indexer.sync()
+    now = chain.time
+    assert indexer.payout_liability(now + 2 * DAY) == 2 * 10 ** 17
+    assert indexer.payout_liability(now + 20 * DAY) == 7 * 10 ** 17
+    assert indexer.payout_liability(now + 20 * DAY, since=now + 2 * DAY) == 5 * 10 ** 17
+    assert [c.id for c in indexer.unpaid_campaigns()] == [soon, later]
+    assert [c.id for c in indexer.expiring_within(48, now)] == [soon, empty]
+
+
+def test_invested_amount_follows_treasury_events(indexer, chain, contract, owner, create_campaign, donate):
+    donate(create_campaign(), 10 ** 18)
+    chain.send_as(owner, chain.contract_address, contract.encode_abi("invest", args=[]))
+    chain.send_as(owner, chain.contract_address, contract.encode_abi("reclaim", args=[4 * 10 ** 17]))
+    indexer.sync()
+    assert indexer.invested_amount() == 6 * 10 ** 17
+    assert [name for _, name, _ in indexer.treasury_events()] == ["FundsInvested", "FundsReclaimed"]
@@ -0,0 +1,57 @@
+import pytest
+
+from chain_monitor import ChainMonitor
+
+
+def invest(chain, contract, owner):
+    return chain.send_as(owner, chain.contract_address, contract.encode_abi("invest", args=[]))
+
+
+@pytest.mark.parametrize("use_filters", [True, False])
+def test_reports_balance_changes_and_events(w3, chain, contract, owner, create_campaign, donate, use_filters):
+    campaign_id = create_campaign()
+    monitor = ChainMonitor(w3, contract, use_filters=use_filters)
+    start = monitor.start()
+    assert start.balance == 0
+    assert monitor.poll_once() is None
+
+    donate(campaign_id, 10 ** 17)
+    change = monitor.poll_once()
+    assert change.balance == 10 ** 17 and change.events == []
+
+    invest(chain, contract, owner)
+    change = monitor.poll_once()
+    assert change.balance == 0
+    assert [(e.name, e.amount) for e in change.events] == [("FundsInvested", 10 ** 17)]
+    assert monitor.last_event_block == chain.head["number"]
+
+
+def test_blocks_without_relevant_changes_are_ignored(w3, chain, contract, create_campaign):
+    monitor = ChainMonitor(w3, contract)
+    monitor.start()
+    create_campaign()
+    assert monitor.poll_once() is None
+    assert monitor.last_block == chain.head["number"]
+
+
+def test_lost_filter_is_recreated_without_losing_events(w3, chain, contract, owner, create_campaign, donate):
+    donate(create_campaign(), 10 ** 17)
+    monitor = ChainMonitor(w3, contract)
+    monitor.start()
+    chain.filters.clear()  # as if the node restarted
+    invest(chain, contract, owner)
+
+    assert monitor.poll_once() is None
+    assert monitor.use_filters
+    chain.mine()
+    change = monitor.poll_once()
+    assert [e.name for e in change.events] == ["FundsInvested"]
+
+
+def test_falls_back_to_polling_when_filters_keep_failing(w3, chain, contract):
+    monitor = ChainMonitor(w3, contract)
+    monitor.start()
+    for _ in range(3):
+        chain.filters.clear()
+        monitor.poll_once()
+    assert monitor.mode == "polling"
@@ -0,0 +1,87 @@
+import pytest
+
+from contract_agent import ContractAgent
+from tx_manager import TransactionManager
+
+DAY = 86400
+ETH = 10 ** 18
+
+
+@pytest.fixture
+def make_agent(w3, chain, owner, tmp_path):
+    def make(receipt_timeout=300):
+        return ContractAgent("test", w3, owner, chain.contract_address, TransactionManager(w3, owner, receipt_timeout=receipt_timeout),
+                             str(tmp_path / "campaigns.sqlite"), str(tmp_path / "state.json"), clock=lambda: chain.time)
+    return make
+
+
+def run_cycle(agent, w3):
+    agent.tx_manager.poll()
+    return agent.cycle(w3.eth.get_balance(agent.address))
+
+
+def test_invests_idle_funds_once(make_agent, w3, chain, create_campaign, donate):
+    donate(create_campaign(days=10), ETH // 10)
+    agent = make_agent()
+    chain.auto_mine = False
+    run_cycle(agent, w3)
+    assert agent.state.state == "investing"
+    # Not mined yet: the next cycle must not send a second invest
+    run_cycle(agent, w3)
+    assert len(agent.tx_manager.in_flight) == 1
+
+    chain.mine()
+    run_cycle(agent, w3)
+    assert agent.state.state == "invested"
+    assert chain.aave_deposit == ETH // 10
+    # Restarting picks the state up from disk
+    assert make_agent().state.state == "invested"
+
+
+def test_timed_out_invest_is_not_sent_again_while_it_may_still_be_mined(make_agent, w3, chain, create_campaign, donate):
+    donate(create_campaign(days=10), ETH // 10)
+    agent = make_agent(receipt_timeout=0)
+    chain.auto_mine = False
+    run_cycle(agent, w3)
+    run_cycle(agent, w3)
+    assert agent.state.state == "idle" and agent.tx_manager.is_watching("test invest")
+    run_cycle(agent, w3)
+    assert len(chain.pending) == 1
+
+    chain.mine()
+    run_cycle(agent, w3)
+    assert chain.aave_deposit == ETH // 10
+    assert agent.state.state == "invested"
+
+
+def test_holds_off_investing_when_a_payout_is_near(make_agent, w3, chain, create_campaign, donate):
+    campaign_id = create_campaign(days=1)
+    donate(campaign_id, ETH // 10)
+    chain.advance_time(DAY - 1800)
+    agent = make_agent()
+    run_cycle(agent, w3)
+    assert agent.state.state == "idle"
+    assert chain.aave_deposit == 0
+
+
+def test_reclaims_before_the_deadline_and_refunds_after(make_agent, w3, chain, create_campaign, donate):
+    missed = create_campaign(target=ETH, days=2)
+    donate(missed, ETH // 10)
+    agent = make_agent()
+    run_cycle(agent, w3)
+    run_cycle(agent, w3)
+    assert chain.aave_deposit == ETH // 10
+
+    chain.advance_time(2 * DAY - 3000)
+    chain.mine()
+    run_cycle(agent, w3)
+    assert chain.aave_deposit == 0
+    assert chain.balances[chain.contract_address] == ETH // 10
+
+    chain.advance_time(3600)
+    chain.mine()
+    run_cycle(agent, w3)
+    run_cycle(agent, w3)
+    assert chain.balances[chain.contract_address] == 0
+    assert chain.campaigns[missed]["amountCollected"] == 0
+    assert len(agent.scheduler) == 0 and agent.state.in_flight == {}
@@ -0,0 +1,41 @@
+from dev_chain import GAS_COSTS, REFUND_GAS_PER_DONOR
+
+
+def refund(chain, contract, owner, campaign_id, gas):
+    tx_hash = chain.send_as(owner, chain.contract_address, contract.encode_abi("refundDonors", args=[campaign_id]), gas=gas)
+    return chain.receipts[tx_hash]
+
+
+def test_out_of_gas_uses_the_whole_limit_and_changes_nothing(chain, contract, owner, create_campaign, donate):
+    campaign_id = create_campaign()
+    for _ in range(3):
+        donate(campaign_id, 10 ** 16)
+    chain.advance_time(2 * 86400)
+    needed = GAS_COSTS["refundDonors"] + 3 * REFUND_GAS_PER_DONOR
+
+    receipt = refund(chain, contract, owner, campaign_id, gas=needed - 1)
+    assert receipt["status"] == 0 and receipt["gasUsed"] == needed - 1
+    assert chain.campaigns[campaign_id]["amountCollected"] == 3 * 10 ** 16
+    assert chain.balances[chain.contract_address] == 3 * 10 ** 16
+
+    receipt = refund(chain, contract, owner, campaign_id, gas=needed)
+    assert receipt["status"] == 1 and receipt["gasUsed"] == needed
+    assert chain.balances[chain.contract_address] == 0
+
+
+def test_estimate_gas_grows_with_the_number_of_donors(w3, chain, contract, owner, create_campaign, donate):
+    campaign_id = create_campaign()
+    for _ in range(4):
+        donate(campaign_id, 10 ** 16)
+    chain.advance_time(2 * 86400)
+    estimate = contract.functions.refundDonors(campaign_id).estimate_gas({"from": owner.address})
+    assert estimate == GAS_COSTS["refundDonors"] + 4 * REFUND_GAS_PER_DONOR
+
+
+def test_reverted_call_keeps_the_balance(chain, contract, owner, create_campaign, donate):
+    campaign_id = create_campaign()
+    donate(campaign_id, 10 ** 16)
+    # Still open, so refundDonors reverts
+    receipt = refund(chain, contract, owner, campaign_id, gas=500000)
+    assert receipt["status"] == 0
+    assert chain.campaigns[campaign_id]["amountCollected"] == 10 ** 16
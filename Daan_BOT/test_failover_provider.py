@@ -0,0 +1,84 @@
+import pytest
+from web3 import Web3
+from web3.exceptions import ProviderConnectionError
+
+from dev_chain import DevChainProvider
+from failover_provider import FailoverProvider
+
+
+class FlakyProvider(DevChainProvider):
+    """A DevChainProvider that can be switched off or made to rate-limit."""
+
+    def __init__(self, chain, name):
+        super().__init__(chain)
+        self.name = name
+        self.down = False
+        self.rate_limited = False
+
+    def __str__(self):
+        return self.name
+
+    def make_request(self, method, params):
+        if self.down:
+            raise ProviderConnectionError(f"{self.name} is down")
+        if self.rate_limited:
+            self.calls[method] += 1
+            return {"jsonrpc": "2.0", "id": 1, "error": {"code": 429, "message": "Too many requests"}}
+        return super().make_request(method, params)
+
+
+@pytest.fixture
+def endpoints(chain):
+    return FlakyProvider(chain, "primary"), FlakyProvider(chain, "backup")
+
+
+def test_fails_over_and_benches_the_broken_endpoint(chain, endpoints):
+    primary, backup = endpoints
+    provider = FailoverProvider([primary, backup], cooldown=60)
+    w3 = Web3(provider)
+    primary.down = True
+    assert w3.eth.block_number == chain.head["number"]
+    assert provider.active == 1 and provider.failovers == 1
+    primary.down = False
+    w3.eth.block_number
+    # Still benched, so the backup keeps serving
+    assert primary.calls["eth_blockNumber"] == 0
+
+
+def test_rate_limit_counts_as_a_failure(chain, endpoints):
+    primary, backup = endpoints
+    primary.rate_limited = True
+    w3 = Web3(FailoverProvider([primary, backup]))
+    assert w3.eth.get_balance(chain.owner) == chain.balances[chain.owner]
+    assert backup.calls["eth_getBalance"] == 1
+
+
+def test_sending_a_transaction_is_not_retried_elsewhere(chain, owner, endpoints):
+    primary, backup = endpoints
+    w3 = Web3(FailoverProvider([primary, backup]))
+    signed = owner.sign_transaction({"to": owner.address, "value": 1, "gas": 21000, "nonce": 0, "chainId": chain.chain_id,
+                                     "maxFeePerGas": 10 ** 10, "maxPriorityFeePerGas": 10 ** 9})
+    primary.down = True
+    with pytest.raises(ProviderConnectionError):
+        w3.eth.send_raw_transaction(signed.raw_transaction)
+    assert backup.calls["eth_sendRawTransaction"] == 0
+
+
+def test_all_endpoints_down(endpoints):
+    for endpoint in endpoints:
+        endpoint.down = True
+    with pytest.raises(ProviderConnectionError):
+        Web3(FailoverProvider(list(endpoints))).eth.block_number
+
+
+def test_chain_id_is_asked_once(chain, endpoints):
+    primary, _ = endpoints
+    w3 = Web3(FailoverProvider([primary]))
+    assert w3.eth.chain_id == chain.chain_id
+    assert w3.eth.chain_id == chain.chain_id
+    assert primary.calls["eth_chainId"] == 1
+
+
+def test_needs_an_endpoint():
+    with pytest.raises(ValueError):
+        FailoverProvider([])
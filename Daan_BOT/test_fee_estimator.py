@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import pytest
+
+from fee_estimator import FeeEstimator, GAS_BUFFER, MIN_PRIORITY_FEE, FeeQuote
+from dev_chain import GAS_COSTS, REFUND_GAS_PER_DONOR
+
+
+@pytest.fixture
+def busy_chain(chain, create_campaign):
+    create_campaign()
+    chain.auto_mine = False
+    chain.background_gas, chain.background_tip = chain.block_gas_limit // 2, 2 * 10 ** 9
+    chain.mine(10)
+    return chain
+
+
+def test_quotes_rise_with_urgency_and_share_one_fee_history_call(w3, busy_chain):
+    estimator = FeeEstimator(w3)
+    w3.provider.reset_counters()
+    low, medium, high = (estimator.quote(urgency) for urgency in ("low", "medium", "high"))
+    assert w3.provider.calls["eth_feeHistory"] == 1
+    assert low.priority_fee <= medium.priority_fee <= high.priority_fee
+    assert low.max_fee < medium.max_fee < high.max_fee
+    assert low.base_fee == busy_chain.base_fee
+    assert low.priority_fee >= MIN_PRIORITY_FEE
+
+
+def test_max_fee_cap(w3, busy_chain):
+    quote = FeeEstimator(w3, max_fee_cap=busy_chain.base_fee).quote("high")
+    assert quote.max_fee == busy_chain.base_fee
+    assert quote.priority_fee <= quote.max_fee
+
+
+def test_unknown_urgency_is_rejected(w3):
+    with pytest.raises(ValueError):
+        FeeEstimator(w3, urgency="urgent")
+
+
+def test_gas_limits_are_cached_per_function(w3, contract, owner, create_campaign):
+    campaign_id = create_campaign()
+    estimator = FeeEstimator(w3)
+    w3.provider.reset_counters()
+    donate = contract.functions.donateToCampaign(campaign_id)
+    first = estimator.gas_limit(donate, owner.address, 10 ** 15)
+    assert estimator.gas_limit(contract.functions.donateToCampaign(campaign_id + 1), owner.address, 10 ** 15) == first
+    assert w3.provider.calls["eth_estimateGas"] == 1
+    assert first == int(GAS_COSTS["donateToCampaign"] * GAS_BUFFER)
+
+
+def test_refund_gas_is_estimated_for_every_call(w3, chain, contract, owner, create_campaign, donate):
+    small, large = create_campaign(), create_campaign()
+    donate(small, 10 ** 16)
+    for _ in range(5):
+        donate(large, 10 ** 16)
+    chain.advance_time(2 * 86400)
+    estimator = FeeEstimator(w3)
+    refund_small, refund_large = contract.functions.refundDonors(small), contract.functions.refundDonors(large)
+    assert estimator.gas_key(refund_small) is None
+    assert estimator.gas_limit(refund_small, owner.address) == int((GAS_COSTS["refundDonors"] + REFUND_GAS_PER_DONOR) * GAS_BUFFER)
+    assert estimator.gas_limit(refund_large, owner.address) == int((GAS_COSTS["refundDonors"] + 5 * REFUND_GAS_PER_DONOR) * GAS_BUFFER)
+
+
+def test_record_raises_a_cached_limit_that_was_too_low(w3, contract, owner, create_campaign):
+    campaign_id = create_campaign()
+    estimator = FeeEstimator(w3)
+    donate = contract.functions.donateToCampaign(campaign_id)
+    limit = estimator.gas_limit(donate, owner.address, 10 ** 15)
+    receipt = {'gasUsed': limit, 'blockNumber': 3, 'effectiveGasPrice': 10 ** 9, 'status': 1}
+    pending = SimpleNamespace(quote=FeeQuote("medium", 0, 0, 0, 1), gas_key=estimator.gas_key(donate), receipt=receipt,
+                              first_sent_at=0.0, speed_ups=0, succeeded=True)
+    estimator.record(pending)
+    assert estimator.gas_limit(donate, owner.address, 10 ** 15) == int(limit * GAS_BUFFER)
+    assert estimator.report()["medium"]["avg_inclusion_blocks"] == 2
@@ -0,0 +1,55 @@
+import pytest
+from web3 import Web3
+
+from dev_chain import DevChainProvider
+from rpc_batch import ChainReader
+
+
+class UnbatchedProvider(DevChainProvider):
+    def make_batch_request(self, requests):
+        raise NotImplementedError
+
+
+@pytest.fixture
+def campaigns(create_campaign, donate):
+    ids = [create_campaign(target=(i + 1) * 10 ** 17) for i in range(5)]
+    donate(ids[2], 10 ** 16)
+    return ids
+
+
+def test_snapshot_is_one_round_trip(w3, chain, contract, owner, campaigns):
+    reader = ChainReader(w3, contract, owner.address)
+    w3.provider.reset_counters()
+    snapshot = reader.snapshot()
+    assert w3.provider.round_trips == 1
+    assert snapshot.block_number == chain.head["number"]
+    assert snapshot.contract_balance == 10 ** 16
+    assert snapshot.agent_nonce == 0
+    assert reader.chain_id == chain.chain_id
+    assert w3.provider.round_trips == 1
+
+
+@pytest.mark.parametrize("use_multicall", [True, False])
+def test_read_campaigns_matches_single_calls(w3, contract, campaigns, use_multicall):
+    reader = ChainReader(w3, contract, use_multicall=use_multicall)
+    assert reader.multicall_available == use_multicall
+    reader.read_campaigns(campaigns[:1])  # web3 looks up the chain id on first use
+    w3.provider.reset_counters()
+    batched = reader.read_campaigns(campaigns)
+    assert w3.provider.round_trips == 1
+    assert [list(c) for c in batched] == [list(contract.functions.campaigns(i).call()) for i in campaigns]
+
+
+def test_falls_back_to_single_requests_without_batching(chain, contract, campaigns):
+    w3 = Web3(UnbatchedProvider(chain, cache_allowed_requests=True))
+    reader = ChainReader(w3, w3.eth.contract(address=contract.address, abi=contract.abi), use_multicall=False)
+    assert len(reader.read_campaigns(campaigns)) == len(campaigns)
+    assert not reader.batching
+    assert w3.provider.calls["eth_call"] == len(campaigns)
+
+
+def test_get_receipts_returns_none_for_unknown_transactions(w3, contract, campaigns, donate):
+    tx_hash = donate(campaigns[0], 10 ** 16)
+    reader = ChainReader(w3, contract)
+    receipt, missing = reader.get_receipts([tx_hash, b"\x01" * 32])
+    assert receipt["status"] == 1 and missing is None
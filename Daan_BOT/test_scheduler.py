@@ -0,0 +1,74 @@
+from campaign_indexer import Campaign
+from scheduler import DeadlineScheduler, ScheduledAction
+
+NOW = 1_800_000_000
+ETH = 10 ** 18
+
+
+def campaign(campaign_id, deadline, collected, target=ETH, claimed=False):
+    return Campaign(campaign_id, "0xowner", "Campaign", target, deadline, collected, claimed, 0)
+
+
+def make_scheduler(*campaigns):
+    scheduler = DeadlineScheduler(reclaim_lead=3600, refund_delay=60, window=900)
+    scheduler.load(campaigns)
+    return scheduler
+
+
+def test_actions_are_scheduled_from_the_deadline():
+    scheduler = make_scheduler(
+        campaign(0, NOW + 10000, ETH),          # met its target: reclaim only
+        campaign(1, NOW + 20000, ETH // 2),     # missed it: reclaim and refund
+        campaign(2, NOW + 30000, 0),            # nothing to pay out
+        campaign(3, NOW + 40000, ETH, claimed=True),
+    )
+    assert len(scheduler) == 3
+    assert scheduler.next_due() == ScheduledAction(NOW + 10000 - 3600, "reclaim", 0)
+    assert scheduler.seconds_until_next(NOW, max_sleep=86400) == 10000 - 3600
+    assert scheduler.seconds_until_next(NOW, max_sleep=60) == 60
+
+
+def test_pop_due_groups_actions_within_the_window():
+    scheduler = make_scheduler(campaign(0, NOW, ETH), campaign(1, NOW + 600, ETH), campaign(2, NOW + 5000, ETH))
+    assert scheduler.pop_due(NOW - 3601) == []
+    # Campaign 1's reclaim is not due yet, but falls in the same window
+    assert [a.campaign_id for a in scheduler.pop_due(NOW - 3600)] == [0, 1]
+    assert scheduler.next_due().campaign_id == 2
+
+
+def test_refund_is_never_pulled_forward():
+    scheduler = make_scheduler(campaign(0, NOW, ETH // 2), campaign(1, NOW + 300, ETH // 2))
+    assert [a.kind for a in scheduler.pop_due(NOW - 3600)] == ["reclaim", "reclaim"]
+    assert scheduler.pop_due(NOW + 60) == [ScheduledAction(NOW + 60, "refund", 0)]
+    assert scheduler.next_due() == ScheduledAction(NOW + 360, "refund", 1)
+    assert scheduler.pop_due(NOW + 360) == [ScheduledAction(NOW + 360, "refund", 1)]
+
+
+def test_done_actions_are_not_scheduled_again():
+    scheduler = make_scheduler(campaign(0, NOW, ETH))
+    (action,) = scheduler.pop_due(NOW)
+    # A re-sync while the transaction is in flight doesn't hand it out twice
+    scheduler.schedule(campaign(0, NOW, ETH))
+    assert scheduler.pop_due(NOW) == []
+    scheduler.done(action)
+    scheduler.schedule(campaign(0, NOW, ETH))
+    assert len(scheduler) == 0
+    # Once the owner claims, the campaign is forgotten
+    scheduler.schedule(campaign(0, NOW, ETH, claimed=True))
+    assert scheduler._done == set()
+
+
+def test_retry_makes_the_action_due_again_later():
+    scheduler = make_scheduler(campaign(0, NOW, ETH))
+    (action,) = scheduler.pop_due(NOW)
+    scheduler.retry(action, NOW, delay=60)
+    assert scheduler.pop_due(NOW + 59) == []
+    assert scheduler.pop_due(NOW + 60) == [ScheduledAction(NOW + 60, "reclaim", 0)]
+
+
+def test_rescheduling_replaces_the_old_entry():
+    scheduler = make_scheduler(campaign(0, NOW, ETH // 2))
+    # The owner claimed: nothing left to reclaim or refund
+    scheduler.schedule(campaign(0, NOW, 0, claimed=True))
+    assert scheduler.next_due() is None
+    assert scheduler.pop_due(NOW + 86400) == []
@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+import agent as agent_module
+from simulate import simulate
+
+
+@pytest.mark.parametrize("driver", ["runtime", "agent"])
+def test_every_claim_is_paid_and_every_missed_target_refunded(driver):
+    result = asyncio.run(simulate(num_campaigns=30, days=3, latency_ms=0, driver=driver))
+    assert result["claims"]["ok"] > 0 and result["claims"]["reverted"] == 0
+    assert result["refunded"] == result["missed"]
+    assert result["stats"]["failed"] == 0
+    assert result["stats"]["labels"]["invest"] > 0
+
+
+def test_event_step_runs_a_cycle_only_on_a_change(w3, chain, owner, create_campaign, donate, tmp_path):
+    agent_module.setup(w3, owner, chain.contract_address, clock_func=lambda: chain.time,
+                       db_path=str(tmp_path / "campaigns.sqlite"), state_path=str(tmp_path / "agent.json"))
+    monitor, change = agent_module.start_monitor()
+    assert agent_module.event_step(monitor, change)
+    assert not agent_module.event_step(monitor, timeout=0)
+
+    donate(create_campaign(days=10), 10 ** 17)
+    cycles = agent_module.contract_agent.cycles
+    assert agent_module.event_step(monitor, timeout=0)
+    assert agent_module.contract_agent.cycles == cycles + 1
+    assert agent_module.contract_agent.state.state == "investing"
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+import pytest
+
+from rpc_batch import ChainReader
+from tx_manager import NonceManager, TransactionManager
+
+FEES = {'gas': 100000, 'maxFeePerGas': 2 * 10 ** 10, 'maxPriorityFeePerGas': 10 ** 9}
+
+
+class FakeNode:
+    """Just enough of w3 for NonceManager: a pending nonce and a count of lookups."""
+
+    def __init__(self, pending_nonce):
+        self.pending_nonce = pending_nonce
+        self.lookups = 0
+        self.eth = SimpleNamespace(get_transaction_count=self.get_transaction_count)
+
+    def get_transaction_count(self, address, block):
+        self.lookups += 1
+        return self.pending_nonce
+
+
+def test_nonces_are_handed_out_locally():
+    node = FakeNode(7)
+    nonces = NonceManager(node, "0xagent")
+    assert [nonces.next() for _ in range(3)] == [7, 8, 9]
+    assert node.lookups == 1
+
+
+def test_release_of_the_last_nonce_reuses_it():
+    nonces = NonceManager(FakeNode(7), "0xagent")
+    nonces.next()
+    nonces.release(nonces.next())
+    assert nonces.next() == 8
+
+
+def test_release_of_an_earlier_nonce_asks_the_node_again():
+    node = FakeNode(7)
+    nonces = NonceManager(node, "0xagent")
+    first = nonces.next()
+    nonces.next()
+    nonces.release(first)
+    node.pending_nonce = 8
+    assert nonces.next() == 8
+    assert node.lookups == 2
+
+
+def test_observe_only_moves_forward_and_resync_asks_the_node():
+    node = FakeNode(7)
+    nonces = NonceManager(node, "0xagent")
+    nonces.next()
+    nonces.observe(5)
+    assert nonces.next() == 8
+    nonces.observe(12)
+    assert nonces.next() == 12
+    node.pending_nonce = 20
+    nonces.resync()
+    assert nonces.next() == 20
+
+
+@pytest.fixture
+def manager(w3, chain, contract, owner):
+    return TransactionManager(w3, owner, reader=ChainReader(w3, contract, owner.address))
+
+
+def test_pipelined_transactions_land_in_one_block(manager, chain, contract, create_campaign):
+    ids = [create_campaign() for _ in range(3)]
+    chain.auto_mine = False
+    sent = [manager.submit(contract.functions.donateToCampaign(i), dict(FEES, value=10 ** 15)) for i in ids]
+    assert [p.nonce for p in sent] == [0, 1, 2]
+    assert manager.poll() == []
+    chain.mine()
+    assert sorted(p.nonce for p in manager.poll()) == [0, 1, 2]
+    assert all(p.succeeded for p in sent)
+    assert len({p.receipt['blockNumber'] for p in sent}) == 1
+    assert manager.in_flight == {}
+
+
+def test_rejected_transaction_gives_its_nonce_back(manager, contract, create_campaign):
+    campaign_id = create_campaign()
+    with pytest.raises(Exception):
+        # Gas estimation reverts: only the campaign owner can claim
+        manager.submit(contract.functions.claimFunds(campaign_id), {'maxFeePerGas': 2 * 10 ** 10, 'maxPriorityFeePerGas': 10 ** 9})
+    pending = manager.submit(contract.functions.donateToCampaign(campaign_id), dict(FEES, value=10 ** 15))
+    assert pending.nonce == 0
+    assert manager.wait([pending])[0].succeeded
+
+
+def test_stuck_transaction_is_sped_up_under_the_same_nonce(w3, chain, contract, owner, create_campaign):
+    campaign_id = create_campaign()
+    chain.auto_mine = False
+    manager = TransactionManager(w3, owner, stuck_after=0, fee_bump=1.5)
+    underpriced = dict(FEES, maxFeePerGas=chain.base_fee // 2, maxPriorityFeePerGas=10 ** 8, value=10 ** 15)
+    pending = manager.submit(contract.functions.donateToCampaign(campaign_id), underpriced)
+    chain.mine()
+    manager.poll()
+    assert pending.speed_ups >= 1 and len(pending.hashes) == pending.speed_ups + 1
+    for _ in range(10):
+        if pending.receipt is not None:
+            break
+        chain.mine()
+        manager.poll()
+    assert pending.succeeded and pending.nonce == 0
+    assert pending.receipt['transactionHash'] == pending.hashes[-1]
+
+
+def test_timed_out_transaction_is_watched_until_it_is_mined(w3, chain, contract, owner, create_campaign):
+    campaign_id = create_campaign()
+    chain.auto_mine = False
+    manager = TransactionManager(w3, owner, receipt_timeout=0)
+    pending = manager.submit(contract.functions.donateToCampaign(campaign_id), dict(FEES, value=10 ** 15), label="donate")
+    assert manager.poll() == [pending] and pending.timed_out
+    assert manager.in_flight == {} and manager.is_watching("donate")
+
+    chain.mine()
+    assert manager.poll() == []
+    assert pending.succeeded and not manager.is_watching("donate")
+
+
+def test_dropped_transaction_is_no_longer_watched(w3, chain, contract, owner, create_campaign):
+    campaign_id = create_campaign()
+    chain.auto_mine = False
+    manager = TransactionManager(w3, owner, receipt_timeout=0)
+    manager.submit(contract.functions.donateToCampaign(campaign_id), dict(FEES, value=10 ** 15), label="donate")
+    manager.poll()
+    assert manager.poll() == [] and manager.is_watching("donate")
+
+    chain.pending.clear()  # evicted from the mempool
+    manager.poll()
+    assert not manager.is_watching("donate")
@@ -0,0 +1,401 @@
+import time
+import threading
+
+import requests
+from web3.exceptions import TransactionNotFound, ProviderConnectionError, RequestTimedOut
+
+# --- 1. CONFIGURATION ---
+
+RECEIPT_TIMEOUT = 300   # seconds before an unmined transaction is reported as timed out
+STUCK_AFTER = 45        # seconds without a receipt before a transaction is re-sent with higher fees
+FEE_BUMP = 1.125        # nodes only accept a replacement that raises both fee fields by at least 10%
+MAX_SPEED_UPS = 5
+# A send that failed with one of these may still have reached the node
+TRANSPORT_ERRORS = (requests.exceptions.RequestException, ProviderConnectionError, RequestTimedOut, OSError)
+TRACK_INTERVAL = 2      # seconds between receipt checks in the background tracker
+
+
+def _bump(value, factor):
+    return int(value * factor) + 1
+
+
+# --- 2. NONCES ---
+
+class NonceManager:
+    """
+    Hands out nonces locally so several transactions can be in flight at once.
+    The node is asked only once at start-up (or after `resync`), and snapshots of
+    the node's pending nonce can be passed to `observe` to catch transactions sent
+    with the same key from somewhere else.
+    """
+
+    def __init__(self, w3, address):
+        self.w3 = w3
+        self.address = address
+        self._next = None
+        self._lock = threading.Lock()
+
+    def next(self):
+        with self._lock:
+            if self._next is None:
+                self._next = self.w3.eth.get_transaction_count(self.address, 'pending')
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def release(self, nonce):
+        """Gives back a nonce that was never broadcast, so it doesn't leave a gap."""
+        with self._lock:
+            if self._next == nonce + 1:
+                self._next = nonce
+            else:
+                # Later nonces are already out; let the node tell us where we are
+                self._next = None
+
+    def observe(self, node_pending_nonce):
+        with self._lock:
+            if self._next is None or node_pending_nonce > self._next:
+                self._next = node_pending_nonce
+
+    def resync(self):
+        with self._lock:
+            self._next = None
+
+
+# --- 3. TRANSACTIONS IN FLIGHT ---
+
+class PendingTransaction:
+    """One nonce the agent has used, with every hash sent for it (the original and its speed-ups)."""
+
+    def __init__(self, label, nonce, txn, tx_hash):
+        self.label = label
+        self.nonce = nonce
+        self.txn = txn
+        self.hashes = [tx_hash]
+        self.first_sent_at = self.sent_at = time.monotonic()
+        self.receipt = None
+        self.timed_out = False
+        self.speed_ups = 0
+        self.quote = None     # FeeQuote it was priced with, if a FeeEstimator priced it
+        self.gas_key = None
+
+    @property
+    def tx_hash(self):
+        return self.receipt['transactionHash'] if self.receipt else self.hashes[-1]
+
+    @property
+    def succeeded(self):
+        return self.receipt is not None and self.receipt['status'] == 1
+
+    def __repr__(self):
+        state = "pending" if self.receipt is None else ("ok" if self.succeeded else "failed")
+        return f"<PendingTransaction {self.label} nonce={self.nonce} {state}>"
+
+
+class TransactionManager:
+    """
+    Sends transactions without waiting for them. `submit` signs and broadcasts
+    with a locally managed nonce and returns immediately, so a burst of actions
+    goes out back-to-back and can land in the same block.
+
+    `poll` checks all in-flight transactions with one batched request, re-sends
+    the ones stuck longer than `stuck_after` with bumped fees (same nonce), and
+    returns the ones that finished. `start_tracking` runs `poll` on a background
+    thread; finished transactions are then collected with `take_finished`.
+
+    A transaction that times out can still be mined later, so it stays on a watch
+    list until it is mined or its nonce is dropped or used by another transaction.
+    Callers should not send the same action again while `is_watching` its label.
+
+    With a FeeEstimator, gas and fees left out of `tx_fields` are filled in for the
+    requested urgency, speed-ups pay at least the current "high" quote, and every
+    finished transaction is recorded for the estimator's report.
+    """
+
+    def __init__(self, w3, account, reader=None, chain_id=None, stuck_after=STUCK_AFTER,
+                 receipt_timeout=RECEIPT_TIMEOUT, fee_bump=FEE_BUMP, max_fee_cap=None, fee_estimator=None):
+        self.w3 = w3
+        self.account = account
+        self.reader = reader
+        self.fee_estimator = fee_estimator
+        self._chain_id = chain_id
+        self.nonces = NonceManager(w3, account.address)
+        self.stuck_after = stuck_after
+        self.receipt_timeout = receipt_timeout
+        self.fee_bump = max(fee_bump, 1.1)
+        self.max_fee_cap = max_fee_cap
+        self.in_flight = {}   # nonce -> PendingTransaction
+        self.watching = {}    # nonce -> PendingTransaction that timed out but may still be mined
+        self._finished = []
+        self._lock = threading.RLock()
+        self._tracker = None
+        self._stop = threading.Event()
+
+    @property
+    def chain_id(self):
+        if self._chain_id is None:
+            self._chain_id = self.reader.chain_id if self.reader else self.w3.eth.chain_id
+        return self._chain_id
+
+    # --- Sending ---
+
+    def _send(self, txn):
+        signed = self.account.sign_transaction(txn)
+        return self.w3.eth.send_raw_transaction(signed.raw_transaction)
+
+    def submit(self, contract_function, tx_fields=None, label=None, urgency=None):
+        """
+        Builds, signs and broadcasts `contract_function` (e.g. `contract.functions.invest()`)
+        with the given gas/fee fields. Returns a PendingTransaction right away.
+        """
+        label = label or contract_function.fn_name
+        fields = dict(tx_fields or {})
+        quote = gas_key = None
+        if self.fee_estimator is not None:
+            if 'maxFeePerGas' not in fields:
+                quote = self.fee_estimator.quote(urgency)
+                fields['maxFeePerGas'] = quote.max_fee
+                fields['maxPriorityFeePerGas'] = quote.priority_fee
+            if 'gas' not in fields:
+                fields['gas'] = self.fee_estimator.gas_limit(contract_function, self.account.address, fields.get('value', 0))
+                gas_key = self.fee_estimator.gas_key(contract_function)
+
+        nonce = self.nonces.next()
+        try:
+            txn = contract_function.build_transaction({
+                'from': self.account.address,
+                'nonce': nonce,
+                'chainId': self.chain_id,
+                **fields,
+            })
+            tx_hash = self._send(txn)
+        except TRANSPORT_ERRORS:
+            # The transaction may be in the node's pool under this nonce; ask the node again
+            self.nonces.resync()
+            raise
+        except Exception as e:
+            if "nonce too low" in str(e):
+                self.nonces.resync()
+            else:
+                self.nonces.release(nonce)
+            raise
+        pending = PendingTransaction(label, nonce, txn, tx_hash)
+        pending.quote, pending.gas_key = quote, gas_key
+        with self._lock:
+            self.in_flight[nonce] = pending
+        print(f"Sent {label} (nonce {nonce}): {tx_hash.hex()}")
+        return pending
+
+    def speed_up(self, pending, factor=None):
+        """Re-sends the transaction under the same nonce with both fees raised. Returns True if it was accepted."""
+        factor = max(factor or self.fee_bump, 1.1)
+        txn = dict(pending.txn)
+        txn['maxPriorityFeePerGas'] = _bump(txn['maxPriorityFeePerGas'], factor)
+        txn['maxFeePerGas'] = _bump(txn['maxFeePerGas'], factor)
+        if self.fee_estimator is not None:
+            # A fixed bump may still be below what the market pays now
+            quote = self.fee_estimator.quote("high")
+            txn['maxPriorityFeePerGas'] = max(txn['maxPriorityFeePerGas'], quote.priority_fee)
+            txn['maxFeePerGas'] = max(txn['maxFeePerGas'], quote.max_fee)
+        if self.max_fee_cap and txn['maxFeePerGas'] > self.max_fee_cap:
+            print(f"Not speeding up {pending.label} (nonce {pending.nonce}): max fee would pass the cap.")
+            return False
+        try:
+            tx_hash = self._send(txn)
+        except Exception as e:
+            # "nonce too low" / "already known" mean an earlier version got mined; poll() will find it
+            print(f"Speed-up of {pending.label} (nonce {pending.nonce}) rejected: {e}")
+            return False
+        with self._lock:
+            pending.txn = txn
+            pending.hashes.append(tx_hash)
+            pending.sent_at = time.monotonic()
+            pending.speed_ups += 1
+        print(f"Sped up {pending.label} (nonce {pending.nonce}) to {self.w3.from_wei(txn['maxFeePerGas'], 'gwei'):.2f} gwei: {tx_hash.hex()}")
+        return True
+
+    # --- Tracking receipts ---
+
+    def _get_receipts(self, tx_hashes):
+        if self.reader is not None:
+            return self.reader.get_receipts(tx_hashes)
+        receipts = []
+        for tx_hash in tx_hashes:
+            try:
+                receipts.append(self.w3.eth.get_transaction_receipt(tx_hash))
+            except TransactionNotFound:
+                receipts.append(None)
+        return receipts
+
+    def poll(self):
+        """Checks every in-flight transaction once. Returns the PendingTransactions that finished."""
+        # The RPC calls and speed-ups run outside the lock, so submit() is never held up by them
+        with self._lock:
+            waiting = list(self.in_flight.values())
+            watched = list(self.watching.values())
+        if not waiting and not watched:
+            return []
+        if watched:
+            # Read before the receipts: a nonce used up without one of our receipts was used by something else
+            mined_nonce = self.w3.eth.get_transaction_count(self.account.address, 'latest')
+            pending_nonce = self.w3.eth.get_transaction_count(self.account.address, 'pending')
+        # Any of the hashes sent for a nonce may be the one that got mined
+        sent = [(pending, tx_hash) for pending in waiting + watched for tx_hash in pending.hashes]
+        receipts = self._get_receipts([tx_hash for _, tx_hash in sent])
+
+        finished, stuck = [], []
+        with self._lock:
+            for (pending, _), receipt in zip(sent, receipts):
+                if receipt is not None and pending.receipt is None:
+                    pending.receipt = receipt
+                    if pending.timed_out:
+                        print(f"!!! {pending.label} (nonce {pending.nonce}) was mined after it timed out, in block {receipt['blockNumber']}.")
+                        self.watching.pop(pending.nonce, None)
+                    else:
+                        finished.append(pending)
+
+            now = time.monotonic()
+            for pending in waiting:
+                if pending.receipt is not None or pending.timed_out:
+                    continue
+                if now - pending.first_sent_at > self.receipt_timeout:
+                    print(f"!!! {pending.label} (nonce {pending.nonce}) not mined after {self.receipt_timeout} s.")
+                    pending.timed_out = True
+                    finished.append(pending)
+                elif now - pending.sent_at > self.stuck_after and pending.speed_ups < MAX_SPEED_UPS:
+                    pending.sent_at = now  # so a concurrent poll doesn't speed it up as well
+                    stuck.append(pending)
+
+            for pending in watched:
+                if pending.receipt is None and self.watching.get(pending.nonce) is pending \
+                        and (mined_nonce > pending.nonce or pending_nonce <= pending.nonce):
+                    print(f"{pending.label} (nonce {pending.nonce}) was dropped; it can no longer be mined.")
+                    del self.watching[pending.nonce]
+
+            for pending in finished:
+                if self.in_flight.get(pending.nonce) is pending:
+                    del self.in_flight[pending.nonce]
+                if pending.timed_out:
+                    self.watching[pending.nonce] = pending
+                if self.fee_estimator is not None:
+                    self.fee_estimator.record(pending)
+                if pending.receipt is not None:
+                    status = "succeeded" if pending.succeeded else "FAILED"
+                    print(f"{pending.label} (nonce {pending.nonce}) {status} in block {pending.receipt['blockNumber']}.")
+            if any(p.timed_out for p in finished):
+                # A dropped transaction leaves a nonce gap; start again from the node's view
+                self.nonces.resync()
+
+        for pending in stuck:
+            self.speed_up(pending)
+        return finished
+
+    def is_watching(self, label):
+        """Whether a timed-out transaction sent under `label` may still be mined."""
+        with self._lock:
+            return any(pending.label == label for pending in self.watching.values())
+
+    def wait(self, pendings=None, timeout=RECEIPT_TIMEOUT, interval=1):
+        """Polls until the given transactions (default: all in flight) are finished or `timeout` passes."""
+        targets = list(pendings if pendings is not None else self.in_flight.values())
+        deadline = time.monotonic() + timeout
+        while any(p.receipt is None and not p.timed_out for p in targets):
+            if time.monotonic() > deadline:
+                break
+            self.poll()
+            if any(p.receipt is None and not p.timed_out for p in targets):
+                time.sleep(interval)
+        return targets
+
+    def take_finished(self):
+        """Returns and clears the transactions the background tracker saw finish since the last call."""
+        with self._lock:
+            finished, self._finished = self._finished, []
+        return finished
+
+    def start_tracking(self, interval=TRACK_INTERVAL):
+        """Runs `poll` every `interval` seconds on a daemon thread."""
+        if self._tracker is not None:
+            return
+
+        def track():
+            while not self._stop.wait(interval):
+                try:
+                    finished = self.poll()
+                    with self._lock:
+                        self._finished.extend(finished)
+                except Exception as e:
+                    print(f"Receipt tracker error: {e}")
+
+        self._stop.clear()
+        self._tracker = threading.Thread(target=track, name="receipt-tracker", daemon=True)
+        self._tracker.start()
+
+    def stop_tracking(self):
+        self._stop.set()
+        if self._tracker is not None:
+            self._tracker.join()
+            self._tracker = None
+
+
+# --- 4. SERIAL VS. PIPELINED SUBMISSION ON THE DEV CHAIN ---
+
+if __name__ == "__main__":
+    from web3 import Web3
+    from eth_account import Account
+    from contract_abi import CROWDFUNDING_ABI
+    from dev_chain import DevChain, DevChainProvider
+    from rpc_batch import ChainReader
+
+    NUM_TXS = 10
+    BLOCK_SECONDS = 0.5  # wall-clock block time of the simulated chain
+
+    agent = Account.create()
+    chain = DevChain(CROWDFUNDING_ABI, agent.address, auto_mine=False)
+    chain.fund(agent.address, 10 ** 21)
+    w3 = Web3(DevChainProvider(chain, cache_allowed_requests=True))
+    contract = w3.eth.contract(address=chain.contract_address, abi=CROWDFUNDING_ABI)
+    reader = ChainReader(w3, contract, agent.address)
+    fees = {'gas': 100000, 'maxFeePerGas': 2 * 10 ** 10, 'maxPriorityFeePerGas': 10 ** 9, 'value': 10 ** 15}
+
+    creator = chain.new_account()
+    for i in range(NUM_TXS):
+        data = contract.encode_abi("createCampaign", args=[creator.address, f"Campaign {i}", "", 10 ** 18, chain.time + 86400, ""])
+        chain.send_as(creator, chain.contract_address, data)
+    chain.mine()
+
+    miner_stop = threading.Event()
+
+    def miner():
+        while not miner_stop.wait(BLOCK_SECONDS):
+            chain.mine()
+
+    threading.Thread(target=miner, daemon=True).start()
+
+    def run(label, pipelined):
+        manager = TransactionManager(w3, agent, reader=reader)
+        start_block = chain.head["number"]
+        start = time.perf_counter()
+        sent = []
+        for i in range(NUM_TXS):
+            sent.append(manager.submit(contract.functions.donateToCampaign(i), fees, label=f"donation {i}"))
+            if not pipelined:
+                manager.wait([sent[-1]], interval=0.05)
+        manager.wait(sent, interval=0.05)
+        blocks = {p.receipt['blockNumber'] for p in sent}
+        return label, time.perf_counter() - start, len(blocks), chain.head["number"] - start_block
+
+    results = [run("serial (send, wait, send, ...)", False), run("pipelined (send all, then track)", True)]
+
+    # With blocks 75% full the base fee climbs every block, so a transaction priced
+    # just under it sits in the mempool until it is sped up
+    chain.background_gas = chain.block_gas_limit * 3 // 4
+    manager = TransactionManager(w3, agent, reader=reader, stuck_after=1.0, fee_bump=1.5)
+    stuck = manager.submit(contract.functions.donateToCampaign(0), dict(fees, maxFeePerGas=chain.base_fee * 9 // 10), label="underpriced donation")
+    manager.wait([stuck], timeout=10, interval=0.2)
+    miner_stop.set()
+
+    print(f"\n{NUM_TXS} transactions, one block every {BLOCK_SECONDS} s\n")
+    for label, seconds, blocks_used, blocks_elapsed in results:
+        print(f"{label:<34} {seconds:>6.2f} s   mined across {blocks_used} block(s), {blocks_elapsed} block(s) elapsed")
+    print(f"\nUnderpriced tx: {stuck.speed_ups} speed-up(s), mined: {stuck.receipt is not None}")
@@ -0,0 +1,89 @@
+# benchmark_detectors.py
+#
+# Latency and accuracy of generate_embedding() with each CONFIG["DETECTOR_BACKEND"]. Needs a folder
+# of face photos, one sub-folder per person (e.g. a few LFW identities, or document photos plus
+# selfies). For every backend it reports how many images had no face found, per-image latency,
+# and match decisions at CONFIG["SIMILARITY_THRESHOLD"]: genuine pairs accepted and impostor
+# pairs rejected.
+#
+#   python benchmark_detectors.py faces/                      # all backends
+#   python benchmark_detectors.py faces/ mediapipe cascade    # only these
+
+import os
+import sys
+import time
+import random
+from itertools import combinations
+
+import cv2
+import numpy as np
+
+import face_reco
+
+BACKENDS = ["deepface", "mediapipe", "cascade"]
+MAX_IMPOSTOR_PAIRS = 5000
+SEED = 7
+
+
+def load_images(folder):
+    images, labels = [], []
+    for identity, person in enumerate(sorted(os.listdir(folder))):
+        person_dir = os.path.join(folder, person)
+        if not os.path.isdir(person_dir): continue
+        for name in sorted(os.listdir(person_dir)):
+            image = cv2.imread(os.path.join(person_dir, name))
+            if image is not None:
+                images.append(image)
+                labels.append(identity)
+    return images, labels
+
+
+def percentile(values, p):
+    if not values: return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run_backend(backend, images):
+    """Embeddings (None where no face was found) and per-image latencies in ms."""
+    face_reco.CONFIG["DETECTOR_BACKEND"] = backend
+    face_reco.generate_embedding(images[0]) # warm-up: model and detector loading is not counted
+    embeddings, latencies = [], []
+    for image in images:
+        start = time.perf_counter()
+        embeddings.append(face_reco.generate_embedding(image))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return embeddings, latencies
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_detectors.py <faces folder> [backend ...]")
+        sys.exit(1)
+    images, labels = load_images(sys.argv[1])
+    backends = sys.argv[2:] or BACKENDS
+    threshold = face_reco.CONFIG["SIMILARITY_THRESHOLD"]
+
+    rng = random.Random(SEED)
+    genuine = [(i, j) for i, j in combinations(range(len(images)), 2) if labels[i] == labels[j]]
+    impostor = [(i, j) for i, j in combinations(range(len(images)), 2) if labels[i] != labels[j]]
+    impostor = rng.sample(impostor, min(len(impostor), MAX_IMPOSTOR_PAIRS))
+    sizes = [max(image.shape[:2]) for image in images]
+    print(f"{len(images)} images of {len(set(labels))} people (median longest side {int(np.median(sizes))} px), "
+          f"{len(genuine)} genuine and {len(impostor)} impostor pairs, threshold {threshold}\n")
+
+    # A pair where either image had no face counts as a rejection, as it is in /upload
+    print(f"{'backend':<10} {'no face':>8} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'genuine accepted':>17} {'impostors rejected':>19}")
+    for backend in backends:
+        embeddings, latencies = run_backend(backend, images)
+        similarity = lambda i, j: face_reco.compare_embeddings(embeddings[i], embeddings[j]) if embeddings[i] is not None and embeddings[j] is not None else None
+        accepted = sum(1 for i, j in genuine if (s := similarity(i, j)) is not None and s > threshold)
+        rejected = sum(1 for i, j in impostor if (s := similarity(i, j)) is None or s <= threshold)
+        missed = sum(1 for e in embeddings if e is None)
+        print(f"{backend:<10} {missed:>8} {percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} "
+              f"{sum(latencies) / len(latencies):>8.1f} {accepted / max(len(genuine), 1):>17.1%} "
+              f"{rejected / max(len(impostor), 1):>19.1%}")
+
+
+if __name__ == "__main__":
+    main()
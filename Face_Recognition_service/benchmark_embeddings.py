@@ -0,0 +1,130 @@
+# benchmark_embeddings.py
+#
+# Size, speed and accuracy of the embedding formats in embedding_codec.py. Accuracy is measured
+# against float64 cosine similarity (what /upload used to compute): the mean/max error, and how
+# many match / no-match decisions at CONFIG["SIMILARITY_THRESHOLD"] flip.
+#
+#   python benchmark_embeddings.py            # synthetic Facenet-like embeddings
+#   python benchmark_embeddings.py faces/     # real embeddings from faces/<person>/<image>.jpg
+
+import os
+import sys
+import json
+import time
+
+import numpy as np
+
+from embedding_codec import FORMATS, quantize, cosine_similarity, QuantizedEmbedding, EmbeddingMatrix
+
+SIMILARITY_THRESHOLD = 0.55   # face_reco.CONFIG["SIMILARITY_THRESHOLD"]
+DIM = 128
+NUM_IDENTITIES = 1000
+SAMPLES_PER_IDENTITY = 4
+GALLERY_SIZE = 20000          # stored embeddings for the 1:N test
+NUM_PROBES = 200
+SEED = 7
+
+
+def synthetic_embeddings(rng):
+    """
+    Facenet-like vectors: uneven per-dimension spread (a few large dimensions stretch the int8
+    scale) and per-sample noise chosen so that genuine pairs land around the threshold.
+    """
+    spread = rng.lognormal(0.0, 0.5, DIM).astype(np.float32)
+    centers = rng.normal(size=(NUM_IDENTITIES, DIM)).astype(np.float32) * spread
+    embeddings, labels = [], []
+    for identity, center in enumerate(centers):
+        for _ in range(SAMPLES_PER_IDENTITY):
+            noise = rng.uniform(0.6, 1.3)
+            embeddings.append(center + rng.normal(size=DIM).astype(np.float32) * spread * noise)
+            labels.append(identity)
+    return np.array(embeddings), np.array(labels)
+
+
+def image_embeddings(folder):
+    """Embeddings of folder/<person>/<image> through face_reco.generate_embedding (loads DeepFace)."""
+    import cv2
+    from face_reco import generate_embedding
+    embeddings, labels = [], []
+    for identity, person in enumerate(sorted(os.listdir(folder))):
+        person_dir = os.path.join(folder, person)
+        for name in sorted(os.listdir(person_dir)) if os.path.isdir(person_dir) else []:
+            embedding = generate_embedding(cv2.imread(os.path.join(person_dir, name)))
+            if embedding is not None:
+                embeddings.append(embedding)
+                labels.append(identity)
+    return np.array(embeddings, dtype=np.float32), np.array(labels)
+
+
+def reference_cosine(a, b):
+    a, b = a.astype(np.float64), b.astype(np.float64)
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def timed(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    rng = np.random.default_rng(SEED)
+    if len(sys.argv) > 1:
+        embeddings, labels = image_embeddings(sys.argv[1])
+        source = f"{len(embeddings)} embeddings of {len(set(labels))} people from {sys.argv[1]}"
+    else:
+        embeddings, labels = synthetic_embeddings(rng)
+        source = f"{len(embeddings)} synthetic embeddings of {NUM_IDENTITIES} identities"
+    n = len(embeddings)
+
+    # Every genuine pair, plus as many random impostor pairs
+    genuine = [(i, j) for i in range(n) for j in range(i + 1, n) if labels[i] == labels[j]]
+    impostor = []
+    while len(impostor) < len(genuine):
+        i, j = rng.integers(n, size=2)
+        if labels[i] != labels[j]:
+            impostor.append((int(i), int(j)))
+    pairs = genuine + impostor
+    reference = np.array([reference_cosine(embeddings[i], embeddings[j]) for i, j in pairs])
+    near = np.abs(reference - SIMILARITY_THRESHOLD) < 0.01
+
+    gallery = embeddings[rng.integers(n, size=GALLERY_SIZE)]
+    probes = embeddings[rng.integers(n, size=NUM_PROBES)]
+    gallery64 = gallery.astype(np.float64) / np.linalg.norm(gallery.astype(np.float64), axis=1, keepdims=True)
+    reference_top1 = [int(np.argmax(gallery64 @ p.astype(np.float64))) for p in probes]
+
+    json_bytes = len(json.dumps([float(v) for v in embeddings[0]]))
+    _, baseline_compare = timed(lambda: reference_cosine(embeddings[0], embeddings[1]), 2000)
+    print(f"{source}; {len(genuine)} genuine + {len(impostor)} impostor pairs, "
+          f"{int(near.sum())} within 0.01 of the {SIMILARITY_THRESHOLD} threshold")
+    print(f"JSON list (generate_embedding output): {json_bytes} bytes, "
+          f"float64 numpy compare {baseline_compare * 1e6:.1f} us\n")
+
+    print(f"{'format':<8} {'bytes':>6} {'encode us':>10} {'decode us':>10} {'compare us':>11} {'mean err':>10} {'max err':>10} "
+          f"{'flips':>6} {'1:N MB':>8} {'1:N Mcmp/s':>11} {'top-1 agree':>12}")
+    for fmt in FORMATS:
+        quantized = [quantize(e, fmt) for e in embeddings]
+        blob = quantized[0].to_bytes()
+        _, encode = timed(lambda: quantize(embeddings[0], fmt).to_bytes(), 2000)
+        _, decode = timed(lambda: QuantizedEmbedding.from_bytes(blob), 2000)
+        _, compare = timed(lambda: cosine_similarity(quantized[0], quantized[1]), 2000)
+
+        similarities = np.array([cosine_similarity(quantized[i], quantized[j]) for i, j in pairs])
+        errors = np.abs(similarities - reference)
+        flips = int(np.sum((similarities > SIMILARITY_THRESHOLD) != (reference > SIMILARITY_THRESHOLD)))
+
+        matrix = EmbeddingMatrix(fmt, DIM)
+        matrix.add(gallery)
+        probe_codes = [quantize(p, fmt) for p in probes]
+        top1, elapsed = timed(lambda: [int(np.argmax(matrix.similarities(p))) for p in probe_codes])
+        agree = sum(a == b for a, b in zip(top1, reference_top1)) / NUM_PROBES
+        throughput = GALLERY_SIZE * NUM_PROBES / elapsed / 1e6
+
+        print(f"{fmt:<8} {len(blob):>6} {encode * 1e6:>10.1f} {decode * 1e6:>10.1f} {compare * 1e6:>11.1f} "
+              f"{errors.mean():>10.2e} {errors.max():>10.2e} {flips:>6} {matrix.nbytes / 2 ** 20:>8.2f} "
+              f"{throughput:>11.1f} {agree:>11.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import struct
+import base64
+
+import numpy as np
+
+# --- 1. FORMAT ---
+#
+# Compact forms of the Facenet embedding generate_embedding() returns (a list of 128 floats,
+# about 2.7 KB as JSON). Vectors are stored as float32, float16, or int8 codes with one scale
+# factor per vector (symmetric: value ~= code * scale).
+#
+# Binary layout, little-endian: a 12-byte header, then the codes.
+#   magic    2 bytes  b"FE"
+#   version  uint8    1
+#   format   uint8    0 = float32, 1 = float16, 2 = int8
+#   dim      uint16
+#   (pad)    2 bytes
+#   scale    float32  1.0 for the float formats
+# A 128-d embedding is 524 bytes as float32, 268 as float16 and 140 as int8.
+
+MAGIC = b"FE"
+VERSION = 1
+FORMATS = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+FORMAT_CODES = {"float32": 0, "float16": 1, "int8": 2}
+FORMAT_NAMES = {code: name for name, code in FORMAT_CODES.items()}
+HEADER = struct.Struct("<2sBBHxxf")
+MATRIX_CHUNK = 4096  # rows converted to float32 at a time when scoring an EmbeddingMatrix
+MATRIX_MIN_CAPACITY = 64  # rows allocated up front; the buffer doubles whenever it fills
+
+
+# --- 2. ONE EMBEDDING ---
+
+class QuantizedEmbedding:
+    """
+    One embedding in a compact format. The norm of the stored codes is kept alongside
+    them, so a cosine similarity costs one dot product on the codes: cosine is
+    scale-invariant, so int8 codes are compared without dequantizing.
+    """
+    __slots__ = ("format", "codes", "scale", "norm")
+
+    def __init__(self, fmt, codes, scale=1.0):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown embedding format: '{fmt}'. Choose one of {tuple(FORMATS)}.")
+        self.format = fmt
+        self.codes = np.ascontiguousarray(codes, dtype=FORMATS[fmt])
+        self.scale = float(scale)
+        self.norm = float(np.linalg.norm(self.codes.astype(np.float32)))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def dequantize(self):
+        """The embedding as float32 values."""
+        return self.codes.astype(np.float32) * np.float32(self.scale)
+
+    def to_bytes(self):
+        return HEADER.pack(MAGIC, VERSION, FORMAT_CODES[self.format], len(self.codes), self.scale) + self.codes.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, fmt_code, dim, scale = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or fmt_code not in FORMAT_NAMES:
+            raise ValueError("Not a serialized face embedding (bad magic, version or format).")
+        fmt = FORMAT_NAMES[fmt_code]
+        codes = np.frombuffer(data, dtype=FORMATS[fmt], count=dim, offset=HEADER.size)
+        return cls(fmt, codes, scale)
+
+    def to_base64(self):
+        """For JSON payloads."""
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def from_base64(cls, text):
+        return cls.from_bytes(base64.b64decode(text))
+
+
+def quantize(embedding, fmt="int8"):
+    """Converts an embedding (list or array of floats) to a QuantizedEmbedding in `fmt`."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    if fmt == "int8":
+        peak = float(np.max(np.abs(vector))) if vector.size else 0.0
+        scale = peak / 127 if peak > 0 else 1.0
+        return QuantizedEmbedding(fmt, np.clip(np.rint(vector / scale), -127, 127), scale)
+    return QuantizedEmbedding(fmt, vector)
+
+
+def cosine_similarity(a, b):
+    """Cosine similarity of two QuantizedEmbeddings, computed on their stored codes."""
+    if a.norm == 0 or b.norm == 0:
+        return 0.0
+    if a.format == b.format == "int8":
+        # Exact integer dot product; the scales cancel out of the cosine
+        dot = int(np.dot(a.codes.astype(np.int32), b.codes.astype(np.int32)))
+    else:
+        dot = float(np.dot(a.codes.astype(np.float32), b.codes.astype(np.float32)))
+    return dot / (a.norm * b.norm)
+
+
+# --- 3. MANY EMBEDDINGS ---
+
+class EmbeddingMatrix:
+    """
+    Stored embeddings of one format, one row each, for scoring a probe against all of
+    them at once (1:N matching). Rows are kept in their compact dtype and converted to
+    float32 MATRIX_CHUNK rows at a time; int8 products stay exact in float32.
+
+    Rows live in buffers that double in size when full, so adding embeddings one at a
+    time costs amortised O(1) per row instead of copying the whole matrix every time.
+    """
+
+    def __init__(self, fmt="int8", dim=128):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown embedding format: '{fmt}'. Choose one of {tuple(FORMATS)}.")
+        self.format = fmt
+        self._size = 0
+        self._codes = np.empty((MATRIX_MIN_CAPACITY, dim), dtype=FORMATS[fmt])
+        self._norms = np.empty(MATRIX_MIN_CAPACITY, dtype=np.float32)
+        self._scales = np.empty(MATRIX_MIN_CAPACITY, dtype=np.float32)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def codes(self):
+        return self._codes[:self._size]
+
+    @property
+    def norms(self):
+        return self._norms[:self._size]
+
+    @property
+    def scales(self):
+        return self._scales[:self._size]
+
+    def _reserve(self, rows):
+        capacity = len(self._codes)
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        for name in ("_codes", "_norms", "_scales"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.norms.nbytes + self.scales.nbytes
+
+    def add(self, embeddings):
+        """Adds embeddings (float lists/arrays or QuantizedEmbeddings). Returns the row index of the first."""
+        quantized = [e if isinstance(e, QuantizedEmbedding) else quantize(e, self.format) for e in embeddings]
+        if any(q.format != self.format for q in quantized):
+            raise ValueError(f"EmbeddingMatrix holds {self.format} embeddings only.")
+        first = self._size
+        end = first + len(quantized)
+        self._reserve(end)
+        for row, q in enumerate(quantized, first):
+            self._codes[row] = q.codes
+            self._norms[row] = q.norm
+            self._scales[row] = q.scale
+        self._size = end
+        return first
+
+    def similarities(self, probe):
+        """Cosine similarity of `probe` (float list/array or QuantizedEmbedding) against every row."""
+        probe = probe if isinstance(probe, QuantizedEmbedding) else quantize(probe, self.format)
+        if probe.norm == 0 or not len(self):
+            return np.zeros(len(self), dtype=np.float32)
+        vector = probe.codes.astype(np.float32)
+        dots = np.concatenate([self.codes[i:i + MATRIX_CHUNK].astype(np.float32) @ vector
+                               for i in range(0, len(self), MATRIX_CHUNK)])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.nan_to_num(dots / (self.norms * probe.norm))
@@ -7,11 +7,12 @@ from flask_cors import CORS
 import os
 import json
 import uuid
-from threading import Thread
+from threading import Thread, Lock
 import random
 import logging
 import re
 import pytesseract
+from embedding_codec import quantize, cosine_similarity
 
 # --- IMPORTANT: TESSERACT INSTALLATION PATH (For Windows Users) ---
 # If you are on Windows and Tesseract is not in your system's PATH,
@@ -27,7 +28,11 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 
 CONFIG = {
     "SIMILARITY_THRESHOLD": 0.55, # Stricter threshold for better accuracy
-    "NUM_LIVENESS_CHALLENGES": 2 # Number of random challenges to perform
+    "NUM_LIVENESS_CHALLENGES": 2, # Number of random challenges to perform
+    "EMBEDDING_FORMAT": "float32", # "float32", "float16" or "int8" (see embedding_codec.py and benchmark_embeddings.py)
+    "DETECTOR_BACKEND": "deepface", # "deepface" (DeepFace's own detector), "mediapipe" or "cascade" (see benchmark_detectors.py)
+    "DETECTION_MAX_SIDE": 640, # Frames are downscaled to this for detection; the face is cropped from the full-size frame
+    "FACE_MARGIN": 0.2 # Extra border around the detected face box, as a fraction of its size
 }
 
 # Folder setup
@@ -39,6 +44,12 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 mp_face_mesh = mp.solutions.face_mesh
 face_mesh = mp_face_mesh.FaceMesh(max_num_faces=1, min_detection_confidence=0.6, min_tracking_confidence=0.6)
 
+# Fast face detectors for embedding generation (CONFIG["DETECTOR_BACKEND"])
+mp_face_detection = mp.solutions.face_detection
+face_detector = mp_face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5)
+face_cascade = cv2.CascadeClassifier(os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml"))
+detector_lock = Lock() # MediaPipe graphs are not safe to call from several request threads at once
+
 # Liveness Challenges Dictionary
 LIVENESS_CHALLENGES = {
     "blink": "Please blink your eyes.",
@@ -77,11 +88,73 @@ def preprocess_image_for_face(image):
     return image
 
 
+def detect_face_mediapipe(small):
+    """Returns (box, eyes) of the largest face in `small` in its pixel coordinates, or None."""
+    with detector_lock:
+        results = face_detector.process(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+    if not results.detections: return None
+    h, w = small.shape[:2]
+    detection = max(results.detections, key=lambda d: d.location_data.relative_bounding_box.width * d.location_data.relative_bounding_box.height)
+    bbox = detection.location_data.relative_bounding_box
+    box = (bbox.xmin * w, bbox.ymin * h, bbox.width * w, bbox.height * h)
+    # Keypoints 0 and 1 are the right and left eye (left and right in the image)
+    eyes = [(p.x * w, p.y * h) for p in detection.location_data.relative_keypoints[:2]]
+    return box, eyes
+
+def detect_face_cascade(small):
+    """Returns (box, None) of the largest face found by the Haar cascade, or None. No landmarks, so no alignment."""
+    gray = cv2.equalizeHist(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+    faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(40, 40))
+    if len(faces) == 0: return None
+    return tuple(float(v) for v in max(faces, key=lambda f: f[2] * f[3])), None
+
+FACE_DETECTORS = {"mediapipe": detect_face_mediapipe, "cascade": detect_face_cascade}
+
+def crop_face(image, box, eyes=None):
+    """Cuts the face out of the full-size image, rotated so the eyes are level when they are known."""
+    x, y, w, h = box
+    # Work on a region twice the face size, so rotating it does not pull in empty corners
+    x0, y0 = max(0, int(x - w / 2)), max(0, int(y - h / 2))
+    region = image[y0:int(y + h * 1.5), x0:int(x + w * 1.5)]
+    if eyes:
+        (rx, ry), (lx, ly) = eyes
+        angle = np.degrees(np.arctan2(ly - ry, lx - rx))
+        center = ((rx + lx) / 2 - x0, (ry + ly) / 2 - y0)
+        rotation = cv2.getRotationMatrix2D(center, angle, 1.0)
+        region = cv2.warpAffine(region, rotation, (region.shape[1], region.shape[0]), borderMode=cv2.BORDER_REPLICATE)
+    margin = CONFIG["FACE_MARGIN"]
+    left, top = max(0, int(x - x0 - w * margin)), max(0, int(y - y0 - h * margin))
+    return region[top:int(y - y0 + h * (1 + margin)), left:int(x - x0 + w * (1 + margin))]
+
+def detect_face(image):
+    """
+    Finds the face with the configured fast detector on a downscaled copy of the image and
+    returns the aligned face crop from the full-size image, or None if there is no face.
+    """
+    detector = FACE_DETECTORS[CONFIG["DETECTOR_BACKEND"]]
+    scale = min(1.0, CONFIG["DETECTION_MAX_SIDE"] / max(image.shape[:2]))
+    small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else image
+    found = detector(small)
+    if found is None: return None
+    box, eyes = found
+    box = tuple(v / scale for v in box)
+    eyes = [(ex / scale, ey / scale) for ex, ey in eyes] if eyes else None
+    face = crop_face(image, box, eyes)
+    return face if face.size > 0 else None
+
 def generate_embedding(image):
     """Generates a face embedding from an image using DeepFace."""
     try:
         processed_image = preprocess_image_for_face(image)
-        embedding_objs = DeepFace.represent(processed_image, model_name='Facenet', enforce_detection=True)
+        if CONFIG["DETECTOR_BACKEND"] == "deepface":
+            embedding_objs = DeepFace.represent(processed_image, model_name='Facenet', enforce_detection=True)
+        else:
+            # Detect and align once here; Facenet only sees the face crop
+            face = detect_face(processed_image) if processed_image is not None else None
+            if face is None:
+                logging.warning(f"No face detected by the {CONFIG['DETECTOR_BACKEND']} detector for embedding generation.")
+                return None
+            embedding_objs = DeepFace.represent(face, model_name='Facenet', detector_backend='skip')
         if embedding_objs and len(embedding_objs) > 0:
             return embedding_objs[0]['embedding']
         logging.warning("No face detected by DeepFace for embedding generation.")
@@ -90,6 +163,11 @@ def generate_embedding(image):
         logging.warning(f"Could not generate face embedding: {e}")
         return None
 
+def compare_embeddings(embedding_a, embedding_b):
+    """Cosine similarity of two embeddings, computed in the configured EMBEDDING_FORMAT."""
+    fmt = CONFIG["EMBEDDING_FORMAT"]
+    return cosine_similarity(quantize(embedding_a, fmt), quantize(embedding_b, fmt))
+
 def extract_text_with_ocr(image):
     """Enhances image and extracts text using Pytesseract."""
     try:
@@ -179,7 +257,49 @@ def perform_liveness_check(landmarks, challenge):
     elif challenge == "nod_down": return check_nod(landmarks, 'down')
     return False
 
-# --- 4. FLASK API ROUTES ---
+# --- 4. IDENTITY VERIFICATION ---
+
+def verify_identity(doc_img_bytes, live_img_bytes):
+    """
+    OCR of the document plus a face match against the live capture. Returns (response body,
+    HTTP status); used by /upload and by the gateway's /onboard endpoint.
+    """
+    # --- OCR Processing ---
+    doc_img_for_ocr = preprocess_image_for_ocr(doc_img_bytes)
+    if doc_img_for_ocr is None: return {"message": "Cannot process document image for OCR."}, 400
+    
+    extracted_text = extract_text_with_ocr(doc_img_for_ocr)
+    ocr_data = parse_aadhar_data(extracted_text)
+
+    # --- Face Matching ---
+    # Use the same image bytes to create an image for face detection
+    doc_img_for_face = cv2.imdecode(np.frombuffer(doc_img_bytes, np.uint8), cv2.IMREAD_COLOR)
+    doc_embedding = generate_embedding(doc_img_for_face)
+    if doc_embedding is None:
+        return {"verification_status": "Not Verified", "message": "Could not find a face in the document."}, 400
+
+    live_face_img = cv2.imdecode(np.frombuffer(live_img_bytes, np.uint8), cv2.IMREAD_COLOR)
+    live_embedding = generate_embedding(live_face_img)
+    if live_embedding is None:
+        return {"verification_status": "Not Verified", "message": "Could not detect a face from the camera."}, 400
+    
+    # Calculate Cosine Similarity
+    similarity = compare_embeddings(live_embedding, doc_embedding)
+    
+    if similarity > CONFIG["SIMILARITY_THRESHOLD"]:
+        return {
+            "verification_status": "Verified",
+            "message": f"Identity Verified! (Similarity: {similarity:.2f})",
+            "extracted_data": ocr_data
+        }, 200
+    else:
+        return {
+            "verification_status": "Not Verified",
+            "message": f"Face does not match document (Similarity: {similarity:.2f}).",
+            "extracted_data": ocr_data # Return OCR data even if face doesn't match
+        }, 200
+
+# --- 5. FLASK API ROUTES ---
 
 @app.route('/')
 def index():
@@ -225,45 +345,9 @@ def upload():
     if 'document' not in request.files or 'live_face' not in request.files:
         return jsonify({"message": "Document and live face images are required."}), 400
 
-    doc_file = request.files['document']
-    live_file = request.files['live_face']
-
-    # --- OCR Processing ---
-    doc_img_bytes = doc_file.read()
-    doc_img_for_ocr = preprocess_image_for_ocr(doc_img_bytes)
-    if doc_img_for_ocr is None: return jsonify({"message": "Cannot process document image for OCR."}), 400
-    
-    extracted_text = extract_text_with_ocr(doc_img_for_ocr)
-    ocr_data = parse_aadhar_data(extracted_text)
-
-    # --- Face Matching ---
-    # Use the same image bytes to create an image for face detection
-    doc_img_for_face = cv2.imdecode(np.frombuffer(doc_img_bytes, np.uint8), cv2.IMREAD_COLOR)
-    doc_embedding = generate_embedding(doc_img_for_face)
-    if doc_embedding is None:
-        return jsonify({"verification_status": "Not Verified", "message": "Could not find a face in the document."}), 400
-
-    live_face_img = cv2.imdecode(np.frombuffer(live_file.read(), np.uint8), cv2.IMREAD_COLOR)
-    live_embedding = generate_embedding(live_face_img)
-    if live_embedding is None:
-        return jsonify({"verification_status": "Not Verified", "message": "Could not detect a face from the camera."}), 400
-    
-    # Calculate Cosine Similarity
-    similarity = np.dot(live_embedding, doc_embedding) / (np.linalg.norm(live_embedding) * np.linalg.norm(doc_embedding))
-    
-    if similarity > CONFIG["SIMILARITY_THRESHOLD"]:
-        return jsonify({
-            "verification_status": "Verified",
-            "message": f"Identity Verified! (Similarity: {similarity:.2f})",
-            "extracted_data": ocr_data
-        })
-    else:
-        return jsonify({
-            "verification_status": "Not Verified",
-            "message": f"Face does not match document (Similarity: {similarity:.2f}).",
-            "extracted_data": ocr_data # Return OCR data even if face doesn't match
-        })
+    body, status = verify_identity(request.files['document'].read(), request.files['live_face'].read())
+    return jsonify(body), status
 
-# --- 5. MAIN FUNCTION ---
+# --- 6. MAIN FUNCTION ---
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
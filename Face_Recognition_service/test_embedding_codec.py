@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from embedding_codec import FORMATS, EmbeddingMatrix, QuantizedEmbedding, cosine_similarity, quantize
+
+SIZES = {"float32": 524, "float16": 268, "int8": 140}
+TOLERANCE = {"float32": 1e-6, "float16": 1e-3, "int8": 1e-2}
+
+
+@pytest.fixture
+def embeddings():
+    return np.random.default_rng(7).normal(size=(50, 128)).astype(np.float32)
+
+
+def reference_cosine(a, b):
+    a, b = a.astype(np.float64), b.astype(np.float64)
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_bytes_and_base64_round_trip(embeddings, fmt):
+    q = quantize(embeddings[0], fmt)
+    blob = q.to_bytes()
+    assert len(blob) == SIZES[fmt]
+    for decoded in (QuantizedEmbedding.from_bytes(blob), QuantizedEmbedding.from_base64(q.to_base64())):
+        assert decoded.format == fmt and decoded.scale == pytest.approx(q.scale)
+        np.testing.assert_array_equal(decoded.codes, q.codes)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_dequantize_is_close_to_the_original(embeddings, fmt):
+    restored = quantize(embeddings[0], fmt).dequantize()
+    peak = np.max(np.abs(embeddings[0]))
+    assert np.max(np.abs(restored - embeddings[0])) <= TOLERANCE[fmt] * peak
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_cosine_similarity_matches_float64(embeddings, fmt):
+    a, b = quantize(embeddings[0], fmt), quantize(embeddings[1], fmt)
+    assert cosine_similarity(a, b) == pytest.approx(reference_cosine(embeddings[0], embeddings[1]), abs=TOLERANCE[fmt])
+    assert cosine_similarity(a, a) == pytest.approx(1.0, abs=1e-6)
+    assert cosine_similarity(a, quantize(np.zeros(128), fmt)) == 0.0
+
+
+def test_bad_data_is_rejected():
+    with pytest.raises(ValueError):
+        QuantizedEmbedding.from_bytes(b"XX" + bytes(138))
+    with pytest.raises(ValueError):
+        quantize([0.1, 0.2], "int4")
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_matrix_scores_every_row(embeddings, fmt):
+    matrix = EmbeddingMatrix(fmt, 128)
+    # One at a time, to go past the initial capacity
+    for e in embeddings[:-10]:
+        matrix.add([e])
+    assert matrix.add(embeddings[-10:]) == 40
+    assert len(matrix) == 50
+
+    probe = quantize(embeddings[3], fmt)
+    scores = matrix.similarities(probe)
+    assert int(np.argmax(scores)) == 3
+    expected = [cosine_similarity(probe, quantize(e, fmt)) for e in embeddings]
+    np.testing.assert_allclose(scores, expected, atol=1e-5)
+
+
+def test_matrix_rejects_other_formats(embeddings):
+    with pytest.raises(ValueError):
+        EmbeddingMatrix("int8").add([quantize(embeddings[0], "float16")])
+    assert len(EmbeddingMatrix("int8").similarities(embeddings[0])) == 0
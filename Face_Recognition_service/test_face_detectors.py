@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+# face_reco loads OpenCV, MediaPipe, DeepFace and Tesseract at import time
+for module in ("cv2", "mediapipe", "deepface", "pytesseract"):
+    pytest.importorskip(module)
+
+import face_reco
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setitem(face_reco.CONFIG, "DETECTION_MAX_SIDE", 100)
+    monkeypatch.setitem(face_reco.CONFIG, "FACE_MARGIN", 0.0)
+    return face_reco.CONFIG
+
+
+def image_with_face(size=400, box=(100, 120, 80, 80)):
+    """A black image with a white square where the "face" is."""
+    image = np.zeros((size, size, 3), dtype=np.uint8)
+    x, y, w, h = box
+    image[y:y + h, x:x + w] = 255
+    return image
+
+
+def test_crop_face_without_eyes_is_the_box(config):
+    face = face_reco.crop_face(image_with_face(), (100, 120, 80, 80))
+    assert face.shape[:2] == (80, 80)
+    assert face.min() == 255
+
+
+def test_crop_face_with_level_eyes_is_not_rotated(config):
+    face = face_reco.crop_face(image_with_face(), (100, 120, 80, 80), eyes=[(120, 140), (160, 140)])
+    assert face.shape[:2] == (80, 80)
+    assert face.min() == 255
+
+
+def test_detect_face_maps_the_box_back_to_full_size(config, monkeypatch):
+    seen = []
+
+    def detector(small):
+        seen.append(small.shape[:2])
+        return (25, 30, 20, 20), None  # (100, 120, 80, 80) at a quarter of the size
+
+    monkeypatch.setitem(face_reco.FACE_DETECTORS, "stub", detector)
+    monkeypatch.setitem(config, "DETECTOR_BACKEND", "stub")
+    face = face_reco.detect_face(image_with_face())
+    assert seen == [(100, 100)]
+    assert face.shape[:2] == (80, 80) and face.min() == 255
+
+
+def test_no_face_gives_no_embedding(config, monkeypatch):
+    monkeypatch.setitem(face_reco.FACE_DETECTORS, "stub", lambda small: None)
+    monkeypatch.setitem(config, "DETECTOR_BACKEND", "stub")
+    assert face_reco.detect_face(image_with_face()) is None
+    assert face_reco.generate_embedding(image_with_face()) is None
@@ -4,6 +4,8 @@ import os
 import joblib
 from flask import Flask, request, jsonify # No longer importing render_template
 from flask_cors import CORS
+from model_registry import registry
+from screening import LinearScorer, Screener, EXPLAIN_TOP_N, MAX_BATCH_SIZE
 
 # --- 1. Setup ---
 app = Flask(__name__)
@@ -14,12 +16,53 @@ CORS(app)
 MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
 MODEL_PATH = os.path.join(MODELS_DIR, 'best_model.pkl')
 
-if not os.path.exists(MODEL_PATH):
-    print(f"Error: The model file 'best_model.pkl' was not found in the '{MODELS_DIR}' directory.")
-    pipeline = None
-else:
+def load_pipeline():
+    if not os.path.exists(MODEL_PATH):
+        print(f"Error: The model file 'best_model.pkl' was not found in the '{MODELS_DIR}' directory.")
+        return None
     pipeline = joblib.load(MODEL_PATH)
     print("✅ Best model pipeline loaded successfully.")
+    return pipeline
+
+# Registered in the shared registry so the gateway and the enricher use the same loaded model
+registry.register("classifier", load_pipeline)
+pipeline = registry.get("classifier")
+# Per-n-gram scores for /explain and the screener, built on first use. It raises ValueError
+# for a model it can't take apart, which must not stop /predict from working.
+registry.register("scorer", lambda: LinearScorer(registry.get("classifier")))
+
+def predict_description(description):
+    """Returns "Genuine" or "Requires Review" for one campaign description."""
+    # The pipeline handles the prediction
+    prediction = pipeline.predict([description])
+    return "Genuine" if prediction[0] == 1 else "Requires Review"
+
+# Risk-tiered screening: the decision score picks which campaigns get web enrichment (see screening.py).
+# Built on first use, so its enrichment workers only start when screening is used.
+def get_screener():
+    # Imported here, so importing app.py (e.g. for /predict alone) doesn't load the enrichment stack
+    from web_enricher import get_web_enrichment
+    return Screener(registry.get("scorer"), enrich=get_web_enrichment)
+
+registry.register("screener", get_screener)
+
+def read_descriptions():
+    """
+    Reads {"description": "..."} or {"descriptions": ["...", ...]} from the JSON body.
+    Returns (body, descriptions, None), or (None, None, error message) if the body is not
+    an object, a description is not a non-empty string, or there are more than MAX_BATCH_SIZE.
+    """
+    req_data = request.get_json(silent=True)
+    if not isinstance(req_data, dict):
+        return None, None, 'Send a JSON object with a "description" or a list of "descriptions".'
+    descriptions = req_data['descriptions'] if 'descriptions' in req_data else [req_data.get('description')]
+    if not isinstance(descriptions, list) or not descriptions:
+        return None, None, '"descriptions" must be a non-empty list of strings.'
+    if not all(isinstance(d, str) and d.strip() for d in descriptions):
+        return None, None, 'Provide a non-empty "description" or a list of non-empty "descriptions".'
+    if len(descriptions) > MAX_BATCH_SIZE:
+        return None, None, f'At most {MAX_BATCH_SIZE} "descriptions" per request.'
+    return req_data, descriptions, None
 
 # --- 3. Define Routes ---
 @app.route('/')
@@ -41,16 +84,72 @@ def predict():
     if not description:
         return jsonify({'error': 'Please provide a campaign description.'}), 400
 
-    # The pipeline handles the prediction
-    prediction = pipeline.predict([description])
-    
     # Return a clean JSON response instead of rendering a template
-    if prediction[0] == 1:
-        result = "Genuine"
-    else:
-        result = "Requires Review"
+    return jsonify({'prediction': predict_description(description)})
+
+@app.route('/explain', methods=['POST'])
+def explain():
+    """
+    Why a campaign got its prediction: the n-grams that moved the score most, for
+    {"description": ...} or {"descriptions": [...]}, and optionally "top_n".
+    """
+    if pipeline is None:
+        return jsonify({'error': 'Model is not loaded'}), 500
 
-    return jsonify({'prediction': result})
+    req_data, descriptions, error = read_descriptions()
+    if error:
+        return jsonify({'error': error}), 400
+    top_n = req_data.get('top_n', EXPLAIN_TOP_N)
+    if isinstance(top_n, bool) or not isinstance(top_n, int) or top_n < 1:
+        return jsonify({'error': '"top_n" must be a positive integer.'}), 400
+
+    try:
+        scorer = registry.get("scorer")
+    except ValueError as e:
+        print(f"Error: {e}")
+        return jsonify({'error': 'explanation unavailable'}), 500
+
+    results = [scorer.explain(description, top_n) for description in descriptions]
+    return jsonify(results[0] if 'descriptions' not in req_data else {'results': results})
+
+@app.route('/screen', methods=['POST'])
+def screen():
+    """Screens {"description": ...} or {"descriptions": [...]}; borderline ones get a job_id for their enrichment."""
+    if pipeline is None:
+        return jsonify({'error': 'Model is not loaded'}), 500
+
+    req_data, descriptions, error = read_descriptions()
+    if error:
+        return jsonify({'error': error}), 400
+
+    try:
+        screener = registry.get("screener")
+    except ValueError as e:
+        print(f"Error: {e}")
+        return jsonify({'error': 'screening unavailable'}), 500
+    results = screener.screen_batch(descriptions)
+    return jsonify(results[0] if 'descriptions' not in req_data else {'results': results})
+
+@app.route('/screen/<job_id>', methods=['GET'])
+def screen_result(job_id):
+    """The enrichment result of a borderline campaign."""
+    # Nothing has been queued if the screener was never built
+    result = registry.get("screener").result(job_id) if registry.is_loaded("screener") else None
+    if result is None:
+        return jsonify({'error': 'Unknown or expired job id.'}), 404
+    return jsonify(result)
+
+@app.route('/screen/stats', methods=['GET'])
+def screen_stats():
+    """Throughput and latency per tier, and the enrichment queue depth."""
+    if pipeline is None:
+        return jsonify({'error': 'Model is not loaded'}), 500
+    try:
+        screener = registry.get("screener")
+    except ValueError as e:
+        print(f"Error: {e}")
+        return jsonify({'error': 'screening unavailable'}), 500
+    return jsonify(dict(screener.stats.snapshot(), queue_depth=screener.queue_depth()))
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
\ No newline at end of file
@@ -0,0 +1,168 @@
+# html_stream.py
+
+import re
+import codecs
+from html.parser import HTMLParser
+
+# lxml's push parser is much faster than the pure-Python one; fall back if it isn't installed
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# --- 1. Configuration ---
+
+# Anything inside these tags never reaches the summarizer
+SKIP_TAGS = {"script", "style", "noscript", "template", "nav", "svg", "iframe"}
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024   # stop downloading after 2 MB of HTML
+DEFAULT_MAX_CHARS = 50000             # ...or once we have this much visible text
+DEFAULT_CHUNK_SIZE = 16 * 1024
+
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_-]+)', re.IGNORECASE)
+
+
+# --- 2. Text Collection ---
+
+class _TextCollector:
+    """Receives parser events and keeps the visible text, skipping SKIP_TAGS subtrees."""
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.pieces = []
+        self.char_count = 0
+        self._pending = []
+        self._skip_depth = 0
+
+    @property
+    def done(self):
+        return self.char_count >= self.max_chars
+
+    def _flush(self):
+        # Text nodes can arrive split across chunks, so only emit at tag boundaries
+        if self._pending:
+            text = " ".join("".join(self._pending).split())
+            self._pending = []
+            if text and not self.done:
+                self.pieces.append(text)
+                self.char_count += len(text) + 1
+
+    def start(self, tag, attrib=None):
+        self._flush()
+        if tag.lower() in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def end(self, tag):
+        self._flush()
+        if tag.lower() in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, data):
+        if not self._skip_depth:
+            self._pending.append(data)
+
+    def close(self):
+        self._flush()
+        return " ".join(self.pieces)[:self.max_chars]
+
+
+class _StdlibParser(HTMLParser):
+    """Adapter that forwards html.parser callbacks to a _TextCollector."""
+
+    def __init__(self, collector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+
+class StreamingTextExtractor:
+    """
+    Incremental HTML-to-text extractor. Feed it byte chunks as they arrive and
+    check `done` to stop reading once enough text has been collected.
+    """
+
+    def __init__(self, max_chars=DEFAULT_MAX_CHARS, encoding=None, use_lxml=True):
+        self.collector = _TextCollector(max_chars)
+        self.encoding = encoding
+        self.use_lxml = use_lxml and etree is not None
+        self._parser = None
+        self._decoder = None  # only the html.parser path decodes bytes itself
+
+    @property
+    def done(self):
+        return self.collector.done
+
+    def _start_parser(self, first_chunk):
+        # Without an HTTP charset, look for a <meta charset> in the first chunk and default to UTF-8
+        if not self.encoding:
+            match = META_CHARSET_PATTERN.search(first_chunk[:4096])
+            self.encoding = match.group(1).decode('ascii') if match else 'utf-8'
+        try:
+            self.encoding = codecs.lookup(self.encoding).name
+        except LookupError:
+            self.encoding = 'utf-8'
+        if self.use_lxml:
+            try:
+                self._parser = etree.HTMLParser(target=self.collector, encoding=self.encoding)
+            except LookupError:
+                self.encoding = 'utf-8'
+                self._parser = etree.HTMLParser(target=self.collector, encoding=self.encoding)
+        else:
+            self._decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+            self._parser = _StdlibParser(self.collector)
+
+    def feed(self, chunk):
+        if self._parser is None:
+            self._start_parser(chunk)
+        if self._decoder is None:
+            self._parser.feed(chunk)
+        else:
+            self._parser.feed(self._decoder.decode(chunk))
+
+    def close(self):
+        if self._parser is None:
+            return ""
+        if self._decoder is None:
+            return self._parser.close()
+        self._parser.feed(self._decoder.decode(b"", final=True))
+        self._parser.close()
+        return self.collector.close()
+
+
+# --- 3. Helpers ---
+
+def extract_text_from_response(response, max_bytes=DEFAULT_MAX_BYTES, max_chars=DEFAULT_MAX_CHARS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Reads a `requests` response opened with stream=True and returns its visible text."""
+    # requests guesses ISO-8859-1 for any text/* response, so only trust an explicit charset
+    # and otherwise let the parser read the page's own <meta> declaration
+    content_type = response.headers.get('Content-Type', '').lower()
+    encoding = response.encoding if 'charset=' in content_type else None
+    extractor = StreamingTextExtractor(max_chars=max_chars, encoding=encoding)
+    bytes_read = 0
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            extractor.feed(chunk)
+            bytes_read += len(chunk)
+            if extractor.done or bytes_read >= max_bytes:
+                break
+    finally:
+        response.close()
+    return extractor.close()
+
+
+def extract_text(html_bytes, max_chars=DEFAULT_MAX_CHARS, chunk_size=DEFAULT_CHUNK_SIZE, use_lxml=True):
+    """Runs the streaming extractor over an in-memory document (used by the benchmark)."""
+    extractor = StreamingTextExtractor(max_chars=max_chars, use_lxml=use_lxml)
+    for start in range(0, len(html_bytes), chunk_size):
+        extractor.feed(html_bytes[start:start + chunk_size])
+        if extractor.done:
+            break
+    return extractor.close()
@@ -0,0 +1,89 @@
+# keyword_extractor.py
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from model_registry import timed_import
+
+# --- 1. Configuration ---
+
+SPACY_MODEL = "en_core_web_sm"
+
+# noun_chunks needs tok2vec, tagger, attribute_ruler and parser; the entities need ner.
+# Nothing reads lemmas, so the lemmatizer is never loaded.
+EXCLUDED_COMPONENTS = ["lemmatizer"]
+
+KEYWORD_ENTITY_LABELS = {"GPE", "ORG"}
+DEFAULT_CACHE_SIZE = 10000
+
+
+def load_keyword_pipeline(model=SPACY_MODEL):
+    """Loads the spaCy pipeline trimmed down to what keyword extraction uses."""
+    # spaCy takes seconds to import, so only pay for it when a pipeline is actually needed
+    spacy = timed_import("spacy")
+    return spacy.load(model, exclude=EXCLUDED_COMPONENTS)
+
+
+def keywords_from_doc(doc):
+    """Noun chunks plus place/organisation entities, de-duplicated in order of appearance."""
+    keywords = [chunk.text for chunk in doc.noun_chunks]
+    keywords += [ent.text for ent in doc.ents if ent.label_ in KEYWORD_ENTITY_LABELS]
+    return " ".join(dict.fromkeys(keywords))
+
+
+# --- 2. The Extractor ---
+
+class KeywordExtractor:
+    """
+    Turns campaign descriptions into search queries. Results are memoized per
+    description hash, and batches run through `nlp.pipe` so a backlog of
+    campaigns is processed as one stream instead of one `nlp()` call each.
+    """
+
+    def __init__(self, nlp=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.nlp = nlp if nlp is not None else load_keyword_pipeline()
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()  # the screener's workers share one extractor
+
+    @staticmethod
+    def _key(description):
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+    def _remember(self, key, keywords):
+        with self._lock:
+            self._cache[key] = keywords
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def extract(self, description):
+        return self.extract_batch([description])[0]
+
+    def extract_batch(self, descriptions, batch_size=256, n_process=1):
+        """Returns one keyword string per description, in the same order."""
+        results = [None] * len(descriptions)
+        pending = OrderedDict()  # hash -> indices still waiting for this text
+        with self._lock:
+            for i, description in enumerate(descriptions):
+                key = self._key(description)
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[i] = self._cache[key]
+                else:
+                    pending.setdefault(key, []).append(i)
+
+        if pending:
+            texts = [descriptions[indices[0]] for indices in pending.values()]
+            docs = self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+            for (key, indices), doc in zip(pending.items(), docs):
+                keywords = keywords_from_doc(doc)
+                self._remember(key, keywords)
+                for i in indices:
+                    results[i] = keywords
+        return results
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
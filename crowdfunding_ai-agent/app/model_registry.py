@@ -0,0 +1,90 @@
+# model_registry.py
+
+import time
+import importlib
+import threading
+
+# --- 1. Import-time profiling ---
+
+# module name -> seconds spent in its first import through timed_import()
+import_times = {}
+
+
+def timed_import(module_name):
+    """Imports a module and records how long the first import took."""
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    import_times.setdefault(module_name, time.perf_counter() - start)
+    return module
+
+
+# --- 2. The Registry ---
+
+class ModelRegistry:
+    """
+    Holds heavy, shared objects (spaCy pipelines, summarizers, search indexes, ML
+    models) behind names. Nothing is built until the first `get()`, and each
+    object is built exactly once even when several threads ask at the same time.
+    Call `warmup()` at process start when latency matters more than startup time.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._instances = {}
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+        self.load_times = {}
+
+    def register(self, name, loader):
+        """Registers a zero-argument function that builds the object for `name`."""
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def set(self, name, instance):
+        """Puts an already-built object in place, e.g. a stub for tests or benchmarks."""
+        with self._registry_lock:
+            self._instances[name] = instance
+            self._locks.setdefault(name, threading.Lock())
+
+    def is_loaded(self, name):
+        return name in self._instances
+
+    def get(self, name):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if name not in self._locks:
+            raise KeyError(f"No model registered under '{name}'")
+        with self._locks[name]:
+            if name not in self._instances:
+                start = time.perf_counter()
+                self._instances[name] = self._loaders[name]()
+                self.load_times[name] = time.perf_counter() - start
+            return self._instances[name]
+
+    def warmup(self, names=None):
+        """Loads the given models (all registered ones by default) and returns their load times."""
+        for name in names if names is not None else list(self._loaders):
+            self.get(name)
+        return dict(self.load_times)
+
+    def profile(self):
+        """Load and import timings collected so far, slowest first."""
+        return {
+            "models": dict(sorted(self.load_times.items(), key=lambda item: -item[1])),
+            "imports": dict(sorted(import_times.items(), key=lambda item: -item[1])),
+        }
+
+    def print_profile(self):
+        report = self.profile()
+        print("--- Model load times ---")
+        for name, seconds in report["models"].items():
+            print(f"  {name:<24} {seconds * 1000:>9.1f} ms")
+        print("--- Import times ---")
+        for name, seconds in report["imports"].items():
+            print(f"  {name:<24} {seconds * 1000:>9.1f} ms")
+
+
+# One registry per process, shared by every module that loads models
+registry = ModelRegistry()
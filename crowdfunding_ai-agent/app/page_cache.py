@@ -0,0 +1,133 @@
+# page_cache.py
+
+import os
+import time
+import zlib
+import sqlite3
+import threading
+from collections import namedtuple
+
+# --- 1. Configuration ---
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+DEFAULT_CACHE_PATH = os.path.join(DATA_DIR, 'page_cache.sqlite')
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+CachedPage = namedtuple("CachedPage", ["url", "text", "etag", "last_modified", "fetched_at"])
+
+
+# --- 2. The Cache ---
+
+class PageCache:
+    """
+    Disk-backed cache of the *extracted* text of web pages, keyed by URL.
+
+    Entries younger than `ttl_seconds` are served without touching the network.
+    Older entries are revalidated with If-None-Match / If-Modified-Since, so a
+    304 response costs one round-trip and no parsing. Text is zlib-compressed,
+    and the least recently used pages are evicted once the stored size goes over
+    `max_bytes`.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES, compress_level=6):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at)")
+        self._conn.commit()
+
+    def get(self, url):
+        """Returns the CachedPage for a URL (fresh or stale), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        body, etag, last_modified, fetched_at = row
+        page = CachedPage(url, zlib.decompress(body).decode('utf-8'), etag, last_modified, fetched_at)
+        if self.is_fresh(page):
+            self.hits += 1
+        return page
+
+    def is_fresh(self, page):
+        return page is not None and time.time() - page.fetched_at < self.ttl_seconds
+
+    def conditional_headers(self, page):
+        """Headers that let the server answer 304 Not Modified for a stale entry."""
+        headers = {}
+        if page is not None:
+            if page.etag:
+                headers['If-None-Match'] = page.etag
+            if page.last_modified:
+                headers['If-Modified-Since'] = page.last_modified
+        return headers
+
+    def put(self, url, text, etag=None, last_modified=None):
+        body = zlib.compress(text.encode('utf-8'), self.compress_level)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, body, size, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, len(body), etag, last_modified, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url):
+        """Marks an entry as freshly validated after a 304 response."""
+        now = time.time()
+        with self._lock:
+            self.revalidations += 1
+            self._conn.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY accessed_at").fetchall():
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        return {
+            "entries": count,
+            "stored_bytes": total,
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+        }
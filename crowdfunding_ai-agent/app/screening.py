@@ -0,0 +1,243 @@
+# screening.py
+
+import os
+import math
+import time
+import uuid
+import queue
+import threading
+from collections import Counter, OrderedDict
+
+# --- 1. Configuration ---
+
+# LinearSVC decision score tiers: at or above GENUINE_THRESHOLD the campaign is clearly genuine,
+# at or below REVIEW_THRESHOLD it clearly needs review; anything in between is borderline and
+# gets web enrichment. A wider band sends more campaigns to enrichment; a narrower one answers
+# more of them from the score alone and gets more of those wrong. On data/test_dataset.csv
+# (1000 descriptions; the model alone is 62.7% accurate):
+#
+#   genuine / review    borderline (enriched)    accuracy of the clear tiers
+#   +0.5 / -0.5         75.3%                    100%
+#   +0.5 / -0.3         58.1%                    100%    <- default
+#   +0.3 / -0.3         48.8%                    91.8%
+#   +0.2 / -0.2         34.3%                    87.2%
+#
+# The band is lopsided because scores below zero are tightly grouped: -0.3 already excludes
+# every misclassified "Requires Review" case, while +0.5 is the first cut with no false "Genuine".
+GENUINE_THRESHOLD = float(os.getenv("SCREENING_GENUINE_THRESHOLD", 0.5))
+REVIEW_THRESHOLD = float(os.getenv("SCREENING_REVIEW_THRESHOLD", -0.3))
+ENRICHMENT_WORKERS = int(os.getenv("SCREENING_ENRICHMENT_WORKERS", 4))
+ENRICHMENT_QUEUE_SIZE = int(os.getenv("SCREENING_QUEUE_SIZE", 256))
+RESULTS_KEPT = 10000  # finished enrichment jobs kept for lookup, oldest dropped first
+MAX_BATCH_SIZE = int(os.getenv("SCREENING_MAX_BATCH_SIZE", 100))  # descriptions per /screen or /explain request
+
+TIERS = ("genuine", "review", "borderline")
+EXPLAIN_TOP_N = 10
+
+
+# --- 2. The Scorer ---
+
+class LinearScorer:
+    """
+    The TF-IDF + LinearSVC pipeline from best_model.pkl, scored and explained n-gram by n-gram.
+    `features` reads the description's non-zero tf-idf values from the vectorizer itself and
+    pairs them with the classifier's coefficients. For the common vectorizer settings, `score`
+    also keeps each vocabulary n-gram's idf and coefficient in a dict, which gives the same number
+    as `pipeline.decision_function` without sklearn's per-call overhead (microseconds instead of
+    most of a millisecond). That shortcut is checked against decision_function when the scorer
+    is built, and left off if the two disagree.
+    """
+
+    def __init__(self, pipeline):
+        self.vectorizer, classifier = pipeline.steps[0][1], pipeline.steps[-1][1]
+        coef = getattr(classifier, "coef_", None)
+        if coef is None or coef.shape[0] != 1:
+            raise ValueError("LinearScorer needs a pipeline ending in a two-class linear model.")
+        self.coef = coef[0]
+        self.intercept = float(classifier.intercept_[0])
+        self.names = self.vectorizer.get_feature_names_out()
+        self.weights = self._lookup_weights()
+        if self.weights is not None and not self._lookup_agrees(pipeline):
+            print("LinearScorer: the n-gram lookup does not match decision_function; scoring through the vectorizer.")
+            self.weights = None
+
+    def _lookup_weights(self):
+        vectorizer = self.vectorizer
+        if vectorizer.norm not in ("l2", None) or vectorizer.binary:
+            return None
+        self.analyzer = vectorizer.build_analyzer()
+        self.sublinear_tf = vectorizer.sublinear_tf
+        self.normalize = vectorizer.norm == "l2"
+        idf = vectorizer.idf_ if vectorizer.use_idf else [1.0] * len(self.names)
+        return {term: (float(idf[i]), float(self.coef[i])) for term, i in vectorizer.vocabulary_.items()}
+
+    def _lookup_agrees(self, pipeline):
+        # Probe texts made of the model's strongest n-grams, one of them repeated
+        terms = [self.names[i] for i in sorted(range(len(self.names)), key=lambda i: -abs(self.coef[i]))[:120]]
+        probes = [" ".join(terms[i:i + 12]) for i in range(0, len(terms), 12)] + [" ".join(terms[:3] * 2), ""]
+        expected = pipeline.decision_function(probes)
+        return all(abs(self._lookup_score(probe) - value) <= 1e-9 for probe, value in zip(probes, expected))
+
+    def _lookup_score(self, description):
+        rows = []
+        for term, count in Counter(self.analyzer(description)).items():
+            weight = self.weights.get(term)
+            if weight is not None:
+                tf = 1 + math.log(count) if self.sublinear_tf else count
+                rows.append((tf * weight[0], weight[1]))
+        norm = math.sqrt(sum(value * value for value, _ in rows)) if self.normalize else 1.0
+        return self.intercept + (sum(value * coef for value, coef in rows) / norm if norm else 0.0)
+
+    def features(self, description):
+        """(n-gram, tf-idf value, coefficient) for each n-gram of the description in the vocabulary."""
+        row = self.vectorizer.transform([description])
+        return [(str(self.names[i]), float(value), float(self.coef[i])) for i, value in zip(row.indices, row.data)]
+
+    def score(self, description):
+        """The LinearSVC decision score: above 0 predicts "Genuine"."""
+        if self.weights is not None:
+            return self._lookup_score(description)
+        return self.intercept + sum(value * coef for _, value, coef in self.features(description))
+
+    def explain(self, description, top_n=EXPLAIN_TOP_N):
+        """
+        The score broken down by n-gram (contribution = tf-idf value x coefficient), largest
+        first. Positive contributions push towards "Genuine", negative towards "Requires Review";
+        the intercept plus every contribution adds up to the score.
+        """
+        contributions = sorted(((term, value, coef, value * coef) for term, value, coef in self.features(description)),
+                               key=lambda row: -abs(row[3]))
+        score = self.intercept + sum(row[3] for row in contributions)
+        return {
+            "prediction": "Genuine" if score > 0 else "Requires Review",
+            "score": round(score, 4),
+            "intercept": round(self.intercept, 4),
+            "top_ngrams": [{"ngram": term, "tfidf": round(value, 4), "weight": round(coef, 4), "contribution": round(contribution, 4)}
+                           for term, value, coef, contribution in contributions[:top_n]],
+            "other_ngrams": len(contributions[top_n:]),
+            "other_contribution": round(sum(row[3] for row in contributions[top_n:]), 4),
+        }
+
+
+# --- 3. Per-tier Statistics ---
+
+class TierStats:
+    """Counts and time spent per tier, plus the enrichment queue's counters. Thread-safe."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.counts = Counter()
+        self.seconds = Counter()
+        self.max_seconds = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, tier, seconds):
+        with self._lock:
+            self.counts[tier] += 1
+            self.seconds[tier] += seconds
+            self.max_seconds[tier] = max(self.max_seconds[tier], seconds)
+
+    def increment(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            uptime = time.monotonic() - self.started
+            tiers = {}
+            for tier in TIERS + ("enrichment",):
+                count = self.counts[tier]
+                tiers[tier] = {
+                    "count": count,
+                    "per_second": round(count / uptime, 3) if uptime else 0.0,
+                    "mean_ms": round(self.seconds[tier] / count * 1000, 3) if count else 0.0,
+                    "max_ms": round(self.max_seconds[tier] * 1000, 3),
+                }
+            return {"uptime_seconds": round(uptime, 1), "tiers": tiers,
+                    "enrichment_failed": self.counts["enrichment_failed"],
+                    "enrichment_rejected": self.counts["enrichment_rejected"]}
+
+
+# --- 4. The Screener ---
+
+class Screener:
+    """
+    Screens campaign descriptions by their decision score. Clear cases are answered on the
+    spot; borderline ones are queued for `enrich` (web_enricher.get_web_enrichment in app.py),
+    which runs on `workers` background threads. The queue holds at most `queue_size` jobs: when it is full, the borderline case
+    is still answered but its enrichment is reported as "rejected" so the caller can retry.
+    """
+
+    def __init__(self, scorer, enrich, genuine_threshold=GENUINE_THRESHOLD,
+                 review_threshold=REVIEW_THRESHOLD, workers=ENRICHMENT_WORKERS, queue_size=ENRICHMENT_QUEUE_SIZE):
+        if review_threshold > genuine_threshold:
+            raise ValueError("review_threshold must not be above genuine_threshold.")
+        self.scorer = scorer
+        self.enrich = enrich
+        self.genuine_threshold = genuine_threshold
+        self.review_threshold = review_threshold
+        self.stats = TierStats()
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.results = OrderedDict()
+        self._results_lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._work, name=f"enrichment-{i}", daemon=True) for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def tier(self, score):
+        if score >= self.genuine_threshold: return "genuine"
+        if score <= self.review_threshold: return "review"
+        return "borderline"
+
+    def screen(self, description):
+        """Scores one description and, if it is borderline, queues its enrichment."""
+        start = time.perf_counter()
+        score = self.scorer.score(description)
+        tier = self.tier(score)
+        result = {"tier": tier, "score": round(score, 4), "prediction": "Genuine" if score > 0 else "Requires Review"}
+        if tier == "borderline":
+            job_id = uuid.uuid4().hex
+            # Recorded before queueing, so a fast worker's "running" is never overwritten
+            self._set_result(job_id, {"status": "queued"})
+            try:
+                self.jobs.put_nowait((job_id, description))
+                result.update(job_id=job_id, enrichment="queued")
+            except queue.Full:
+                with self._results_lock:
+                    self.results.pop(job_id, None)
+                self.stats.increment("enrichment_rejected")
+                result["enrichment"] = "rejected"
+        self.stats.record(tier, time.perf_counter() - start)
+        return result
+
+    def screen_batch(self, descriptions):
+        return [self.screen(description) for description in descriptions]
+
+    def result(self, job_id):
+        """The enrichment job's status ("queued", "running", "done" or "failed"), or None if unknown."""
+        with self._results_lock:
+            return self.results.get(job_id)
+
+    def queue_depth(self):
+        return self.jobs.qsize()
+
+    def _set_result(self, job_id, value):
+        with self._results_lock:
+            self.results[job_id] = value
+            self.results.move_to_end(job_id)
+            while len(self.results) > RESULTS_KEPT:
+                self.results.popitem(last=False)
+
+    def _work(self):
+        while True:
+            job_id, description = self.jobs.get()
+            self._set_result(job_id, {"status": "running"})
+            start = time.perf_counter()
+            try:
+                summary = self.enrich(description)
+                self._set_result(job_id, {"status": "done", "summary": summary})
+            except Exception as e:
+                self.stats.increment("enrichment_failed")
+                self._set_result(job_id, {"status": "failed", "message": str(e)})
+            self.stats.record("enrichment", time.perf_counter() - start)
+            self.jobs.task_done()
@@ -0,0 +1,206 @@
+# search_backends.py
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import heapq
+from collections import Counter
+
+# --- 1. Configuration ---
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+DEFAULT_INDEX_PATH = os.path.join(DATA_DIR, 'search_index.json')
+
+# A small stop-word list keeps the index lean without pulling in NLTK.
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "he", "her", "his", "in", "is", "it", "its", "of", "on", "or", "our", "she",
+    "that", "the", "their", "them", "they", "this", "to", "us", "was", "we",
+    "were", "will", "with", "you", "your", "help", "me", "my",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lower-cases the text and splits it into index terms, dropping stop words."""
+    return [tok for tok in TOKEN_PATTERN.findall(text.lower()) if tok not in STOP_WORDS and len(tok) > 1]
+
+
+# --- 2. Provider Interface ---
+
+class SearchProvider:
+    """Base class for anything that can turn a query into a ranked list of links."""
+    name = "base"
+
+    def search(self, query, num_results=5):
+        raise NotImplementedError
+
+    def get_document_text(self, url):
+        """Returns already-known text for a URL, or None if the page must be fetched."""
+        return None
+
+
+class GoogleSearchProvider(SearchProvider):
+    """The original behaviour: live Google search through the `googlesearch` package."""
+    name = "Google"
+
+    def __init__(self, tld="co.in", pause=2, lang='en'):
+        self.tld = tld
+        self.pause = pause
+        self.lang = lang
+
+    def search(self, query, num_results=5):
+        # Imported here so the offline backend works without the package installed
+        from googlesearch import search
+        try:
+            return list(search(query, tld=self.tld, num=num_results, stop=num_results, pause=self.pause, lang=self.lang))
+        except Exception as e:
+            print(f"An error occurred during Google search: {e}")
+            return []
+
+
+class LocalIndexSearchProvider(SearchProvider):
+    """An in-memory inverted index over our own corpus, ranked with Okapi BM25."""
+    name = "local index"
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs = []          # doc_id -> {"url", "title", "text", "length"}
+        self.url_to_id = {}
+        self.postings = {}      # term -> {doc_id: term frequency}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.url_to_id)
+
+    def add_document(self, url, text, title=""):
+        """Adds (or replaces) one page in the index."""
+        if url in self.url_to_id:
+            self.remove_document(url)
+
+        terms = Counter(tokenize(f"{title} {text}"))
+        length = sum(terms.values())
+        doc_id = len(self.docs)
+        self.docs.append({"url": url, "title": title, "text": text, "length": length})
+        self.url_to_id[url] = doc_id
+        self.total_length += length
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        return doc_id
+
+    def remove_document(self, url):
+        """Drops a page from the index. The slot is kept so other doc ids stay valid."""
+        doc_id = self.url_to_id.pop(url, None)
+        if doc_id is None:
+            return False
+        doc = self.docs[doc_id]
+        for term in set(tokenize(f"{doc['title']} {doc['text']}")):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.total_length -= doc["length"]
+        self.docs[doc_id] = None
+        return True
+
+    def search(self, query, num_results=5):
+        live_docs = len(self.url_to_id)
+        if not live_docs:
+            return []
+
+        avg_length = self.total_length / live_docs
+        scores = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1 + (live_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in posting.items():
+                norm = self.k1 * (1 - self.b + self.b * self.docs[doc_id]["length"] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(num_results, scores.items(), key=lambda item: item[1])
+        return [self.docs[doc_id]["url"] for doc_id, _ in best]
+
+    def get_document_text(self, url):
+        doc_id = self.url_to_id.get(url)
+        return None if doc_id is None else self.docs[doc_id]["text"]
+
+    # --- Persistence and corpus import ---
+
+    def import_jsonl(self, path):
+        """Loads a corpus where each line is {"url": ..., "title": ..., "text": ...}."""
+        count = 0
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get("url") and record.get("text"):
+                    self.add_document(record["url"], record["text"], record.get("title", ""))
+                    count += 1
+        return count
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        """Writes the documents to disk; postings are rebuilt on load."""
+        docs = [{"url": d["url"], "title": d["title"], "text": d["text"]} for d in self.docs if d is not None]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"k1": self.k1, "b": self.b, "docs": docs}, f)
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        index = cls(k1=data.get("k1", 1.5), b=data.get("b", 0.75))
+        for doc in data["docs"]:
+            index.add_document(doc["url"], doc["text"], doc.get("title", ""))
+        return index
+
+
+# --- 3. Factory ---
+
+def create_search_provider(backend="google", index_path=DEFAULT_INDEX_PATH):
+    """Builds the provider named by `backend` ("google" or "local")."""
+    if backend == "local":
+        if os.path.exists(index_path):
+            return LocalIndexSearchProvider.load(index_path)
+        print(f"Warning: local search index '{index_path}' not found, starting with an empty index.")
+        return LocalIndexSearchProvider()
+    if backend == "google":
+        return GoogleSearchProvider()
+    raise ValueError(f"Unknown search backend: '{backend}'")
+
+
+# Build an index from a JSONL corpus, or query an existing one:
+#   python search_backends.py build corpus.jsonl [index.json]
+#   python search_backends.py query "apollo hospital delhi" [index.json]
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[1] not in ("build", "query"):
+        print("Usage: python search_backends.py build <corpus.jsonl> [index.json] | query <text> [index.json]")
+        sys.exit(1)
+
+    command, argument = sys.argv[1], sys.argv[2]
+    path = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_INDEX_PATH
+
+    if command == "build":
+        index = LocalIndexSearchProvider()
+        start = time.perf_counter()
+        count = index.import_jsonl(argument)
+        index.save(path)
+        print(f"✅ Indexed {count} documents ({len(index.postings)} terms) in {time.perf_counter() - start:.2f}s -> {path}")
+    else:
+        index = LocalIndexSearchProvider.load(path)
+        start = time.perf_counter()
+        links = index.search(argument)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Top results for '{argument}' ({elapsed_ms:.2f} ms over {len(index)} documents):")
+        for link in links:
+            print(f"  - {link}")
@@ -0,0 +1,220 @@
+# summarizer.py
+
+import re
+import math
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+
+from model_registry import registry, timed_import
+
+# --- 1. Configuration ---
+
+SUMMARY_MODES = ("lsa", "textrank", "centroid")
+DEFAULT_MODE = "lsa"
+
+MIN_SENTENCE_WORDS = 6      # shorter "sentences" are menu items, buttons and bylines
+MAX_SENTENCE_WORDS = 60     # longer ones are usually run-together boilerplate
+MAX_SENTENCES = 200         # ranking cost grows with the square of this
+DEFAULT_CACHE_SIZE = 1000
+
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?])\s+(?=["\'(\[]?[A-Z0-9])')
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "been", "but", "by", "for", "from", "had",
+    "has", "have", "he", "her", "his", "i", "in", "is", "it", "its", "not", "of", "on",
+    "or", "our", "she", "that", "the", "their", "they", "this", "to", "was", "we",
+    "were", "which", "who", "will", "with", "you",
+}
+
+
+# --- 2. Loading the LSA backend (sumy + NLTK) ---
+
+def ensure_punkt():
+    """Downloads the NLTK sentence tokenizer data if it is missing."""
+    nltk = timed_import("nltk")
+    # Newer NLTK releases read 'punkt_tab'; older ones read 'punkt'
+    for resource in ('punkt', 'punkt_tab'):
+        try:
+            nltk.data.find(f'tokenizers/{resource}')
+        except LookupError:
+            print(f"Downloading NLTK '{resource}' model for summarization...")
+            nltk.download(resource, quiet=True)
+
+
+def load_lsa_summarizer():
+    ensure_punkt()
+    parsers = timed_import("sumy.parsers.plaintext")
+    tokenizers = timed_import("sumy.nlp.tokenizers")
+    lsa = timed_import("sumy.summarizers.lsa")
+    return {
+        "parser": parsers.PlaintextParser,
+        "tokenizer": tokenizers.Tokenizer("english"),
+        "summarizer": lsa.LsaSummarizer(),
+    }
+
+
+registry.register("lsa_summarizer", load_lsa_summarizer)
+
+
+# --- 3. Sentence handling ---
+
+def split_sentences(text):
+    return [s.strip() for s in SENTENCE_SPLIT_PATTERN.split(text) if s.strip()]
+
+
+def prefilter_sentences(sentences, min_words=MIN_SENTENCE_WORDS, max_words=MAX_SENTENCE_WORDS, max_sentences=MAX_SENTENCES):
+    """Drops boilerplate-looking and repeated sentences, then keeps the first `max_sentences`."""
+    kept = []
+    seen = set()
+    for sentence in sentences:
+        words = sentence.split()
+        if not min_words <= len(words) <= max_words:
+            continue
+        letters = sum(ch.isalpha() for ch in sentence)
+        if letters < 0.6 * len(sentence):
+            continue
+        key = sentence.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(sentence)
+        if max_sentences and len(kept) >= max_sentences:
+            break
+    return kept
+
+
+def _terms(sentence):
+    return [w for w in WORD_PATTERN.findall(sentence.lower()) if w not in STOP_WORDS]
+
+
+def tfidf_vectors(sentences):
+    """One sparse {term: weight} vector per sentence, L2-normalised."""
+    term_counts = [Counter(_terms(s)) for s in sentences]
+    df = Counter(term for counts in term_counts for term in counts)
+    n = len(sentences)
+    vectors = []
+    for counts in term_counts:
+        vec = {term: tf * (math.log((1 + n) / (1 + df[term])) + 1) for term, tf in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        vectors.append({term: w / norm for term, w in vec.items()})
+    return vectors
+
+
+def _cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(term, 0.0) for term, w in a.items())
+
+
+# --- 4. Ranking algorithms ---
+
+def rank_textrank(sentences, damping=0.85, iterations=30, tolerance=1e-4):
+    """PageRank over the sentence-similarity graph, built sparsely from shared terms only."""
+    vectors = tfidf_vectors(sentences)
+    n = len(sentences)
+
+    # Accumulate dot products through an inverted index so unrelated pairs cost nothing
+    postings = {}
+    for i, vec in enumerate(vectors):
+        for term, w in vec.items():
+            postings.setdefault(term, []).append((i, w))
+    edges = [dict() for _ in range(n)]
+    for entries in postings.values():
+        for a in range(len(entries)):
+            i, wi = entries[a]
+            for b in range(a + 1, len(entries)):
+                j, wj = entries[b]
+                edges[i][j] = edges[i].get(j, 0.0) + wi * wj
+                edges[j][i] = edges[j].get(i, 0.0) + wi * wj
+
+    out_weight = [sum(e.values()) for e in edges]
+    scores = [1.0 / n] * n
+    for _ in range(iterations):
+        new_scores = []
+        for i in range(n):
+            incoming = sum(scores[j] * w / out_weight[j] for j, w in edges[i].items() if out_weight[j])
+            new_scores.append((1 - damping) / n + damping * incoming)
+        delta = sum(abs(x - y) for x, y in zip(scores, new_scores))
+        scores = new_scores
+        if delta < tolerance:
+            break
+    return scores
+
+
+def rank_centroid(sentences):
+    """Cosine similarity of each sentence to the TF-IDF centroid of the whole page."""
+    vectors = tfidf_vectors(sentences)
+    centroid = Counter()
+    for vec in vectors:
+        centroid.update(vec)
+    return [_cosine(vec, centroid) for vec in vectors]
+
+
+# --- 5. The Summarizer ---
+
+class Summarizer:
+    """
+    Extractive summarizer for scraped pages. Sentences are pre-filtered and capped
+    before ranking, so the cost no longer grows with the page size. Summaries are
+    cached per (page-text hash, mode, length).
+    """
+
+    def __init__(self, mode=DEFAULT_MODE, max_sentences=MAX_SENTENCES, prefilter=True, cache_size=DEFAULT_CACHE_SIZE):
+        if mode not in SUMMARY_MODES:
+            raise ValueError(f"Unknown summary mode: '{mode}'. Choose one of {SUMMARY_MODES}.")
+        self.mode = mode
+        self.max_sentences = max_sentences
+        self.prefilter = prefilter
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()  # guards _cache; summarize() runs on several enrichment threads
+
+    def select_sentences(self, text):
+        sentences = split_sentences(text)
+        if self.prefilter:
+            sentences = prefilter_sentences(sentences, max_sentences=self.max_sentences)
+        elif self.max_sentences:
+            sentences = sentences[:self.max_sentences]
+        return sentences
+
+    def _summarize_lsa(self, sentences, num_sentences):
+        lsa = registry.get("lsa_summarizer")
+        parser = lsa["parser"].from_string(" ".join(sentences), lsa["tokenizer"])
+        return [str(sentence) for sentence in lsa["summarizer"](parser.document, num_sentences)]
+
+    def _summarize_ranked(self, sentences, num_sentences, mode):
+        scores = rank_textrank(sentences) if mode == "textrank" else rank_centroid(sentences)
+        best = sorted(range(len(sentences)), key=lambda i: -scores[i])[:num_sentences]
+        # Keep the page's own order so the summary reads naturally
+        return [sentences[i] for i in sorted(best)]
+
+    def summarize(self, text, num_sentences=3, mode=None):
+        mode = mode or self.mode
+        if mode not in SUMMARY_MODES:
+            raise ValueError(f"Unknown summary mode: '{mode}'. Choose one of {SUMMARY_MODES}.")
+
+        key = (hashlib.sha1(text.encode('utf-8')).hexdigest(), mode, num_sentences)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        sentences = self.select_sentences(text)
+        if not sentences:
+            # Nothing survived the filter (e.g. a page of short fragments); rank what there is
+            sentences = split_sentences(text)[:self.max_sentences or None]
+        if len(sentences) <= num_sentences:
+            chosen = sentences
+        elif mode == "lsa":
+            chosen = self._summarize_lsa(sentences, num_sentences)
+        else:
+            chosen = self._summarize_ranked(sentences, num_sentences, mode)
+
+        summary = " ".join(chosen)
+        with self._lock:
+            self._cache[key] = summary
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return summary
@@ -0,0 +1,126 @@
+# test_explain.py
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+from sklearn.svm import LinearSVC
+
+from screening import LinearScorer
+
+TRAIN = [
+    ("Help fund surgery for my daughter at Apollo hospital, bills attached", 1),
+    ("School library needs new books for children in our village", 1),
+    ("Flood relief for farmers who lost their crops and homes", 1),
+    ("Medical treatment for cancer patient, hospital estimate attached", 1),
+    ("Send money fast guaranteed returns double your donation", 0),
+    ("Urgent urgent send money now no questions asked", 0),
+    ("Win big prize lottery donate now guaranteed", 0),
+    ("Quick cash needed no details just donate fast", 0),
+]
+TEST = [
+    "Surgery for a child at the hospital",
+    "Guaranteed returns, send money now",
+    "Books and uniforms for village children",
+    "completely unrelated words",
+]
+
+
+def train(**vectorizer_options):
+    pipeline = Pipeline([("tfidf", TfidfVectorizer(**vectorizer_options)), ("svc", LinearSVC())])
+    texts, labels = zip(*TRAIN)
+    return pipeline.fit(texts, labels)
+
+
+@pytest.mark.parametrize("options, lookup", [
+    ({}, True),
+    ({"ngram_range": (1, 2), "sublinear_tf": True}, True),
+    ({"norm": None}, True),
+    ({"use_idf": False, "stop_words": "english"}, True),
+    # Not covered by the n-gram lookup: scored through the vectorizer instead
+    ({"binary": True}, False),
+    ({"norm": "l1"}, False),
+])
+def test_score_matches_decision_function(options, lookup):
+    pipeline = train(**options)
+    scorer = LinearScorer(pipeline)
+    assert (scorer.weights is not None) == lookup
+    for description, expected in zip(TEST, pipeline.decision_function(TEST)):
+        assert scorer.score(description) == pytest.approx(expected, abs=1e-9)
+        assert scorer.explain(description)["score"] == round(expected, 4)
+
+
+def test_explain_adds_up_to_the_score():
+    pipeline = train(ngram_range=(1, 2))
+    scorer = LinearScorer(pipeline)
+    for description in TEST:
+        result = scorer.explain(description, top_n=3)
+        score = scorer.score(description)
+        assert result["score"] == round(score, 4)
+        assert result["prediction"] == ("Genuine" if pipeline.predict([description])[0] == 1 else "Requires Review")
+        parts = result["intercept"] + sum(row["contribution"] for row in result["top_ngrams"]) + result["other_contribution"]
+        assert parts == pytest.approx(score, abs=1e-3)
+        assert len(result["top_ngrams"]) <= 3
+        sizes = [abs(row["contribution"]) for row in result["top_ngrams"]]
+        assert sizes == sorted(sizes, reverse=True)
+
+
+def test_unknown_words_leave_only_the_intercept():
+    scorer = LinearScorer(train())
+    result = scorer.explain("zzz qqq")
+    assert result["top_ngrams"] == [] and result["other_ngrams"] == 0
+    assert result["score"] == result["intercept"]
+
+
+def test_lookup_that_disagrees_is_switched_off(monkeypatch):
+    monkeypatch.setattr(LinearScorer, "_lookup_score", lambda self, description: 0.0)
+    pipeline = train()
+    scorer = LinearScorer(pipeline)
+    assert scorer.weights is None
+    assert scorer.score(TEST[0]) == pytest.approx(pipeline.decision_function(TEST[:1])[0], abs=1e-9)
+
+
+def test_non_linear_classifiers_are_rejected():
+    pipeline = Pipeline([("tfidf", TfidfVectorizer()), ("nb", MultinomialNB())])
+    texts, labels = zip(*TRAIN)
+    with pytest.raises(ValueError):
+        LinearScorer(pipeline.fit(texts, labels))
+
+
+# --- The shipped model and the /explain route ---
+
+@pytest.fixture
+def app():
+    app = pytest.importorskip("app")
+    if app.pipeline is None:
+        pytest.skip("models/best_model.pkl is not available")
+    return app
+
+
+def test_shipped_model_matches_decision_function(app):
+    descriptions = [description for description, _ in TRAIN]
+    for description, expected in zip(descriptions, app.pipeline.decision_function(descriptions)):
+        assert app.registry.get("scorer").score(description) == pytest.approx(expected, abs=1e-9)
+
+
+def test_explain_route(app):
+    client = app.app.test_client()
+    single = client.post('/explain', json={"description": TRAIN[0][0], "top_n": 2}).get_json()
+    assert len(single["top_ngrams"]) <= 2
+    batch = client.post('/explain', json={"descriptions": [TRAIN[0][0], TRAIN[4][0]]}).get_json()
+    assert [r["score"] for r in batch["results"]][0] == single["score"]
+    assert client.post('/explain', json={"description": "x", "top_n": 0}).status_code == 400
+    assert client.post('/explain', json={"description": "x", "top_n": True}).status_code == 400
+    assert client.post('/explain', json={"descriptions": []}).status_code == 400
+
+
+def test_model_the_scorer_cannot_read_leaves_predict_working(app, monkeypatch):
+    def unsupported():
+        raise ValueError("LinearScorer needs a pipeline ending in a two-class linear model.")
+    monkeypatch.delitem(app.registry._instances, "scorer", raising=False)
+    monkeypatch.setitem(app.registry._loaders, "scorer", unsupported)
+    client = app.app.test_client()
+    response = client.post('/explain', json={"description": TRAIN[0][0]})
+    assert response.status_code == 500 and response.get_json() == {"error": "explanation unavailable"}
+    assert client.post('/predict', json={"description": TRAIN[0][0]}).status_code == 200
+
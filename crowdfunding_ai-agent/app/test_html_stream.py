@@ -0,0 +1,64 @@
+# test_html_stream.py
+
+import pytest
+
+from html_stream import StreamingTextExtractor, extract_text, extract_text_from_response
+
+PAGE = (b"<html><head><title>Fundraiser</title><style>p { color: red }</style>"
+        b"<script>var tracking = 1;</script></head><body><nav>Home | About</nav>"
+        b"<p>Help Asha get her surgery.</p><p>Every donation counts.</p></body></html>")
+
+
+class FakeResponse:
+    def __init__(self, body, content_type="text/html", encoding="ISO-8859-1"):
+        self.body = body
+        self.headers = {"Content-Type": content_type}
+        self.encoding = encoding
+        self.chunks_read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            self.chunks_read += 1
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("use_lxml", [True, False])
+def test_skips_scripts_styles_and_navigation(use_lxml):
+    text = extract_text(PAGE, chunk_size=16, use_lxml=use_lxml)
+    assert "Help Asha get her surgery." in text and "Every donation counts." in text
+    assert "tracking" not in text and "color" not in text and "About" not in text
+
+
+@pytest.mark.parametrize("use_lxml", [True, False])
+def test_text_is_capped_at_max_chars(use_lxml):
+    page = b"<html><body>" + b"<p>word word word</p>" * 1000 + b"</body></html>"
+    assert len(extract_text(page, max_chars=100, use_lxml=use_lxml)) <= 100
+
+
+@pytest.mark.parametrize("use_lxml", [True, False])
+def test_empty_body_gives_empty_text(use_lxml):
+    assert StreamingTextExtractor(use_lxml=use_lxml).close() == ""
+    assert extract_text_from_response(FakeResponse(b"")) == ""
+
+
+def test_response_stops_reading_once_enough_text_is_collected():
+    response = FakeResponse(b"<html><body>" + b"<p>word word word</p>" * 10000 + b"</body></html>")
+    text = extract_text_from_response(response, max_chars=100, chunk_size=1024)
+    assert len(text) <= 100
+    assert response.chunks_read < 5
+    assert response.closed
+
+
+def test_response_stops_reading_at_max_bytes():
+    response = FakeResponse(b"<html><body><p>" + b"a" * 100000 + b"</p></body></html>")
+    extract_text_from_response(response, max_bytes=4096, chunk_size=1024)
+    assert response.chunks_read == 4
+
+
+def test_meta_charset_is_used_without_an_http_charset():
+    page = '<html><head><meta charset="windows-1251"></head><body><p>Привет</p></body></html>'.encode("windows-1251")
+    assert extract_text_from_response(FakeResponse(page)) == "Привет"
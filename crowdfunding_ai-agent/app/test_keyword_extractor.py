@@ -0,0 +1,55 @@
+# test_keyword_extractor.py
+
+from types import SimpleNamespace
+
+from keyword_extractor import KeywordExtractor
+
+
+class FakeNlp:
+    """Stands in for spaCy: capitalised words are noun chunks, words after "in" are places."""
+
+    def __init__(self):
+        self.texts = []
+
+    def pipe(self, texts, batch_size=256, n_process=1):
+        for text in texts:
+            self.texts.append(text)
+            words = text.split()
+            chunks = [SimpleNamespace(text=w) for w in words if w[:1].isupper()]
+            ents = [SimpleNamespace(text=b, label_="GPE") for a, b in zip(words, words[1:]) if a == "in"]
+            ents.append(SimpleNamespace(text="tomorrow", label_="DATE"))
+            yield SimpleNamespace(noun_chunks=chunks, ents=ents)
+
+
+def test_keywords_are_noun_chunks_and_places_without_duplicates():
+    extractor = KeywordExtractor(nlp=FakeNlp())
+    assert extractor.extract("Surgery for Asha in Delhi at Apollo in delhi") == "Surgery Asha Delhi Apollo delhi"
+
+
+def test_batch_keeps_order_and_runs_each_text_once():
+    nlp = FakeNlp()
+    extractor = KeywordExtractor(nlp=nlp)
+    results = extractor.extract_batch(["School in Pune", "Clinic Fund", "School in Pune"])
+    assert results == ["School Pune", "Clinic Fund", "School Pune"]
+    assert nlp.texts == ["School in Pune", "Clinic Fund"]
+
+
+def test_cached_descriptions_skip_the_pipeline():
+    nlp = FakeNlp()
+    extractor = KeywordExtractor(nlp=nlp)
+    extractor.extract("Clinic Fund")
+    assert extractor.extract_batch(["Clinic Fund", "Flood Relief"]) == ["Clinic Fund", "Flood Relief"]
+    assert nlp.texts == ["Clinic Fund", "Flood Relief"]
+    extractor.clear_cache()
+    extractor.extract("Clinic Fund")
+    assert nlp.texts.count("Clinic Fund") == 2
+
+
+def test_cache_drops_the_least_recently_used_entry():
+    nlp = FakeNlp()
+    extractor = KeywordExtractor(nlp=nlp, cache_size=2)
+    extractor.extract_batch(["A one", "B two"])
+    extractor.extract("A one")
+    extractor.extract("C three")
+    extractor.extract_batch(["A one", "B two"])
+    assert nlp.texts == ["A one", "B two", "C three", "B two"]
@@ -0,0 +1,64 @@
+# test_model_registry.py
+
+import threading
+import time
+
+import pytest
+
+from model_registry import ModelRegistry, import_times, timed_import
+
+
+def test_nothing_is_built_until_first_get():
+    registry = ModelRegistry()
+    built = []
+    registry.register("model", lambda: built.append(1) or "the model")
+    assert not registry.is_loaded("model") and built == []
+    assert registry.get("model") == "the model"
+    assert registry.get("model") == "the model"
+    assert built == [1]
+    assert "model" in registry.profile()["models"]
+
+
+def test_concurrent_gets_build_once():
+    registry = ModelRegistry()
+    built = []
+
+    def slow_loader():
+        time.sleep(0.05)
+        built.append(1)
+        return object()
+
+    registry.register("model", slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("model"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_set_replaces_the_loader():
+    registry = ModelRegistry()
+    registry.register("model", lambda: pytest.fail("loader should not run"))
+    registry.set("model", "stub")
+    assert registry.get("model") == "stub"
+
+
+def test_unknown_name_raises_key_error():
+    with pytest.raises(KeyError):
+        ModelRegistry().get("missing")
+
+
+def test_warmup_loads_every_registered_model():
+    registry = ModelRegistry()
+    registry.register("a", lambda: "A")
+    registry.register("b", lambda: "B")
+    assert set(registry.warmup()) == {"a", "b"}
+    assert registry.is_loaded("a") and registry.is_loaded("b")
+
+
+def test_timed_import_records_the_first_import():
+    assert timed_import("json").dumps([]) == "[]"
+    assert "json" in import_times
@@ -0,0 +1,65 @@
+# test_page_cache.py
+
+import pytest
+
+import page_cache
+from page_cache import PageCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(page_cache.time, "time", clock)
+    return clock
+
+
+def test_miss_then_fresh_hit(clock):
+    cache = PageCache(":memory:", ttl_seconds=60)
+    assert cache.get("https://a.example") is None
+    cache.put("https://a.example", "Some page text", etag='"v1"')
+    page = cache.get("https://a.example")
+    assert page.text == "Some page text"
+    assert cache.is_fresh(page)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_entry_expires_after_the_ttl(clock):
+    cache = PageCache(":memory:", ttl_seconds=60)
+    cache.put("https://a.example", "text", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    clock.now += 61
+    page = cache.get("https://a.example")
+    assert page is not None and not cache.is_fresh(page)
+    assert cache.conditional_headers(page) == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert cache.stats()["hits"] == 0
+
+
+def test_touch_makes_a_stale_entry_fresh_again(clock):
+    cache = PageCache(":memory:", ttl_seconds=60)
+    cache.put("https://a.example", "text")
+    clock.now += 61
+    cache.touch("https://a.example")
+    assert cache.is_fresh(cache.get("https://a.example"))
+    assert cache.stats()["revalidations"] == 1
+
+
+def test_least_recently_used_pages_are_evicted(clock, tmp_path):
+    cache = PageCache(str(tmp_path / "cache.sqlite"), max_bytes=220, compress_level=0)
+    for i in range(3):
+        clock.now += 1
+        cache.put(f"https://{i}.example", "x" * 60)
+    # Reading page 0 makes page 1 the least recently used
+    clock.now += 1
+    cache.get("https://0.example")
+    clock.now += 1
+    cache.put("https://3.example", "x" * 60)
+    assert cache.get("https://1.example") is None
+    assert cache.get("https://0.example") is not None
+    assert cache.stats()["stored_bytes"] <= 220
@@ -0,0 +1,110 @@
+# test_screening.py
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from screening import Screener, MAX_BATCH_SIZE
+
+
+class FakeScorer:
+    """Scores are looked up by description, so each test picks its own tiers."""
+
+    def __init__(self, scores):
+        self.scores = scores
+
+    def score(self, description):
+        return self.scores[description]
+
+
+SCORES = {"clear": 1.2, "bad": -0.8, "unsure": 0.1, "broken": 0.0}
+
+
+def wait_for(screener, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while screener.result(job_id)["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return screener.result(job_id)
+
+
+def enrich(description):
+    if description == "broken":
+        raise RuntimeError("search failed")
+    return f"Summary of {description}"
+
+
+def test_clear_cases_are_answered_from_the_score():
+    screener = Screener(FakeScorer(SCORES), enrich=enrich, workers=0)
+    assert screener.screen("clear") == {"tier": "genuine", "score": 1.2, "prediction": "Genuine"}
+    assert screener.screen("bad") == {"tier": "review", "score": -0.8, "prediction": "Requires Review"}
+    assert screener.queue_depth() == 0
+
+
+def test_borderline_cases_are_enriched_in_the_background():
+    screener = Screener(FakeScorer(SCORES), enrich=enrich, workers=2)
+    result = screener.screen("unsure")
+    assert result["tier"] == "borderline" and result["enrichment"] == "queued"
+    assert wait_for(screener, result["job_id"]) == {"status": "done", "summary": "Summary of unsure"}
+
+    failed = screener.screen("broken")
+    assert wait_for(screener, failed["job_id"]) == {"status": "failed", "message": "search failed"}
+    stats = screener.stats.snapshot()
+    assert stats["tiers"]["borderline"]["count"] == 2 and stats["enrichment_failed"] == 1
+
+
+def test_full_queue_rejects_enrichment_but_still_answers():
+    screener = Screener(FakeScorer(SCORES), enrich=enrich, workers=0, queue_size=1)
+    first, second = screener.screen_batch(["unsure", "unsure"])
+    assert first["enrichment"] == "queued"
+    assert second["enrichment"] == "rejected" and "job_id" not in second
+    assert second["tier"] == "borderline" and second["prediction"] == "Genuine"
+    assert screener.stats.snapshot()["enrichment_rejected"] == 1
+    assert screener.result("unknown") is None
+
+
+def test_thresholds_must_be_ordered():
+    with pytest.raises(ValueError):
+        Screener(FakeScorer(SCORES), enrich, genuine_threshold=-0.5, review_threshold=0.5, workers=0)
+
+
+# --- The /screen route ---
+
+def test_app_imports_the_enricher_only_when_screening():
+    pytest.importorskip("app")
+    code = "import sys, app; sys.exit('web_enricher' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__))).returncode == 0
+
+
+@pytest.fixture
+def client():
+    app = pytest.importorskip("app")
+    if app.pipeline is None:
+        pytest.skip("models/best_model.pkl is not available")
+    app.registry.set("screener", Screener(FakeScorer(SCORES), enrich=enrich, workers=0))
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize("body", [
+    [],
+    {"description": ""},
+    {"description": 42},
+    {"descriptions": []},
+    {"descriptions": "clear"},
+    {"descriptions": ["clear", "  "]},
+    {"descriptions": ["clear"] * (MAX_BATCH_SIZE + 1)},
+])
+def test_screen_rejects_bad_bodies(client, body):
+    response = client.post('/screen', json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_screen_single_and_batch(client):
+    assert client.post('/screen', json={"description": "clear"}).get_json()["tier"] == "genuine"
+    results = client.post('/screen', json={"descriptions": ["clear", "bad"]}).get_json()["results"]
+    assert [r["tier"] for r in results] == ["genuine", "review"]
+    assert client.get('/screen/unknown').status_code == 404
+    assert client.get('/screen/stats').get_json()["tiers"]["genuine"]["count"] == 2
@@ -0,0 +1,71 @@
+# test_search_backends.py
+
+import json
+
+import pytest
+
+from search_backends import LocalIndexSearchProvider, create_search_provider, tokenize
+
+
+@pytest.fixture
+def index():
+    index = LocalIndexSearchProvider()
+    index.add_document("https://a.example", "Apollo hospital in Delhi treats heart patients", title="Apollo Hospital")
+    index.add_document("https://b.example", "A school library fundraiser for new books")
+    index.add_document("https://c.example", "Delhi school children need books and uniforms")
+    return index
+
+
+def test_tokenize_drops_stop_words_and_single_letters():
+    assert tokenize("The Apollo hospital, a clinic in Delhi") == ["apollo", "hospital", "clinic", "delhi"]
+
+
+def test_search_ranks_the_best_match_first(index):
+    assert index.search("apollo hospital")[0] == "https://a.example"
+    # Both mention school and books; the shorter page scores higher
+    assert index.search("school books") == ["https://b.example", "https://c.example"]
+    assert index.search("unknown words") == []
+
+
+def test_num_results_limits_the_list(index):
+    assert len(index.search("delhi school books", num_results=1)) == 1
+
+
+def test_remove_document_drops_it_from_results(index):
+    assert index.remove_document("https://a.example")
+    assert not index.remove_document("https://a.example")
+    assert len(index) == 2
+    assert "https://a.example" not in index.search("apollo delhi")
+    assert index.get_document_text("https://a.example") is None
+
+
+def test_add_document_replaces_an_existing_url(index):
+    index.add_document("https://b.example", "Flood relief for farmers")
+    assert len(index) == 3
+    assert index.search("library") == []
+    assert index.search("flood relief") == ["https://b.example"]
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    index.remove_document("https://b.example")
+    path = tmp_path / "index.json"
+    index.save(path)
+    loaded = LocalIndexSearchProvider.load(path)
+    assert len(loaded) == 2
+    assert loaded.search("delhi") == index.search("delhi")
+    assert loaded.get_document_text("https://c.example") == index.get_document_text("https://c.example")
+
+
+def test_import_jsonl_skips_records_without_text(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    records = [{"url": "https://x.example", "text": "Blood bank in Mumbai"}, {"url": "https://y.example"}]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n\n", encoding="utf-8")
+    index = LocalIndexSearchProvider()
+    assert index.import_jsonl(path) == 1
+    assert index.search("mumbai") == ["https://x.example"]
+
+
+def test_create_search_provider(tmp_path):
+    assert len(create_search_provider("local", tmp_path / "missing.json")) == 0
+    with pytest.raises(ValueError):
+        create_search_provider("bing")
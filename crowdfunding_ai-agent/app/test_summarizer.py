@@ -0,0 +1,73 @@
+# test_summarizer.py
+
+import pytest
+
+import summarizer
+from summarizer import Summarizer, prefilter_sentences, rank_centroid, rank_textrank, split_sentences
+
+PAGE = (
+    "Home. About us. Donate now. "
+    "The flood destroyed hundreds of homes in the villages near the river. "
+    "Volunteers are rebuilding the homes with donated bricks and cement from the city. "
+    "Our newsletter comes out every month with news from the team. "
+    "Families who lost their homes in the flood are staying in the village school. "
+    "The flood relief fund pays for bricks, cement and food for the families."
+)
+
+
+def test_split_sentences():
+    assert split_sentences("One thing. Two things! Three? 4 more.") == ["One thing.", "Two things!", "Three?", "4 more."]
+
+
+def test_prefilter_drops_short_repeated_and_symbol_heavy_sentences():
+    sentences = [
+        "Donate now.",
+        "The school needs new desks for every one of its classrooms.",
+        "the school needs new desks for every one of its classrooms.",
+        "#### ---- 12/12/2023 ---- 10:45 ---- $$$$ ----",
+        "Teachers have been asking for the desks since last year.",
+    ]
+    assert prefilter_sentences(sentences) == [sentences[1], sentences[4]]
+    assert prefilter_sentences(sentences, max_sentences=1) == [sentences[1]]
+
+
+@pytest.mark.parametrize("rank", [rank_textrank, rank_centroid])
+def test_off_topic_sentence_ranks_last(rank):
+    sentences = prefilter_sentences(split_sentences(PAGE))
+    scores = rank(sentences)
+    assert len(scores) == len(sentences)
+    assert min(range(len(scores)), key=scores.__getitem__) == sentences.index(
+        "Our newsletter comes out every month with news from the team.")
+
+
+@pytest.mark.parametrize("mode", ["textrank", "centroid"])
+def test_summary_keeps_page_order_and_skips_boilerplate(mode):
+    summary = Summarizer(mode=mode).summarize(PAGE, num_sentences=2)
+    chosen = split_sentences(summary)
+    assert len(chosen) == 2
+    assert "newsletter" not in summary and "Donate now" not in summary
+    assert PAGE.index(chosen[0]) < PAGE.index(chosen[1])
+
+
+def test_short_pages_are_returned_whole():
+    text = "The clinic needs a new x-ray machine for the patients."
+    assert Summarizer(mode="centroid").summarize(text) == text
+
+
+def test_summaries_are_cached_per_text_mode_and_length(monkeypatch):
+    calls = []
+    real_rank = summarizer.rank_centroid
+    monkeypatch.setattr(summarizer, "rank_centroid", lambda sentences: calls.append(1) or real_rank(sentences))
+    s = Summarizer(mode="centroid")
+    first = s.summarize(PAGE, num_sentences=2)
+    assert s.summarize(PAGE, num_sentences=2) == first
+    assert len(calls) == 1
+    s.summarize(PAGE, num_sentences=1)
+    assert len(calls) == 2
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        Summarizer(mode="bert")
+    with pytest.raises(ValueError):
+        Summarizer().summarize(PAGE, mode="bert")
@@ -1,85 +1,108 @@
 # web_enricher.py
 
-# --- Step 1: All imports at the top ---
-import spacy
-import requests
-from bs4 import BeautifulSoup
-from googlesearch import search
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.lsa import LsaSummarizer
-import nltk
-
-# --- Step 2: Ensure necessary NLTK data is available for the summarizer ---
-# This is a small "setup" step to make sure `sumy` works correctly.
-try:
-    nltk.data.find('tokenizers/punkt')
-except nltk.downloader.DownloadError:
-    print("Downloading NLTK 'punkt' model for summarization...")
-    nltk.download('punkt')
-
-
-# --- Step 3: Your functions remain mostly the same, as they are correct ---
-
-# Load the spaCy model once when the module is loaded
-nlp = spacy.load("en_core_web_sm")
+# --- Step 1: Imports ---
+# Only light modules are imported here. spaCy, sumy/NLTK, requests and the search
+# backends are loaded on first use through the model registry, so importing this
+# module is fast. Call `warmup()` to load everything up front instead.
+import os
+import sys
+from model_registry import registry, timed_import
+from search_backends import create_search_provider, DEFAULT_INDEX_PATH
+from page_cache import PageCache, DEFAULT_CACHE_PATH, DEFAULT_TTL_SECONDS
+from html_stream import extract_text_from_response
+from keyword_extractor import KeywordExtractor
+from summarizer import Summarizer, DEFAULT_MODE
+
+# --- Step 2: Your functions remain mostly the same, as they are correct ---
+
+# Pick the search backend: "google" (live, default) or "local" (offline BM25 index)
+SEARCH_BACKEND = os.getenv("ENRICHER_SEARCH_BACKEND", "google")
+SEARCH_INDEX_PATH = os.getenv("ENRICHER_SEARCH_INDEX", DEFAULT_INDEX_PATH)
+
+# Scraped page text is cached on disk so repeat enrichments skip the download and the parse.
+# Set ENRICHER_PAGE_CACHE=off to always fetch pages live.
+PAGE_CACHE_PATH = os.getenv("ENRICHER_PAGE_CACHE", DEFAULT_CACHE_PATH)
+PAGE_CACHE_TTL = int(os.getenv("ENRICHER_PAGE_CACHE_TTL", DEFAULT_TTL_SECONDS))
+
+# Summary ranking: "lsa" (sumy, the original), or the cheaper "textrank" / "centroid"
+SUMMARY_MODE = os.getenv("ENRICHER_SUMMARY_MODE", DEFAULT_MODE)
+
+# Heavy objects, built once on first use
+registry.register("keyword_extractor", KeywordExtractor)
+registry.register("search_provider", lambda: create_search_provider(SEARCH_BACKEND, SEARCH_INDEX_PATH))
+registry.register("summarizer", lambda: Summarizer(mode=SUMMARY_MODE))
+registry.register("requests", lambda: timed_import("requests"))
+registry.register("page_cache", lambda: None if PAGE_CACHE_PATH == "off" else PageCache(PAGE_CACHE_PATH, ttl_seconds=PAGE_CACHE_TTL))
+
+def warmup(names=None):
+    """Loads the enricher's models now rather than on the first request."""
+    return registry.warmup(names)
+
+def set_search_provider(provider):
+    """Swaps the search backend, e.g. to an in-memory index for tests or benchmarks."""
+    registry.set("search_provider", provider)
 
 def find_clues(description):
     """This function takes a description and pulls out the important keywords."""
-    doc = nlp(description)
-    keywords = []
-    for chunk in doc.noun_chunks:
-        keywords.append(chunk.text)
-    for ent in doc.ents:
-        if ent.label_ in ["GPE", "ORG"]:
-            keywords.append(ent.text)
-    return " ".join(list(set(keywords)))
+    return registry.get("keyword_extractor").extract(description)
+
+def find_clues_batch(descriptions, n_process=1, batch_size=256):
+    """Same as find_clues, for many descriptions at once through spaCy's nlp.pipe."""
+    return registry.get("keyword_extractor").extract_batch(descriptions, batch_size=batch_size, n_process=n_process)
 
 def perform_search(query):
-    """This function takes a query and returns the top 5 Google search result links."""
-    print(f"Searching Google for: '{query}'")
-    try:
-        links = []
-        for link in search(query, tld="co.in", num=5, stop=5, pause=2, lang='en'):
-            links.append(link)
-        return links
-    except Exception as e:
-        print(f"An error occurred during Google search: {e}")
-        return []
+    """This function takes a query and returns the top 5 result links from the active search backend."""
+    search_provider = registry.get("search_provider")
+    print(f"Searching {search_provider.name} for: '{query}'")
+    return search_provider.search(query, num_results=5)
 
 def read_webpage(url):
-    """This function visits a URL and scrapes all its text."""
+    """This function visits a URL and scrapes all its text, using the page cache when it can."""
+    page_cache = registry.get("page_cache")
+    cached = page_cache.get(url) if page_cache else None
+    if page_cache and page_cache.is_fresh(cached):
+        print(f"\nUsing cached content for: {url}")
+        return cached.text
+
     print(f"\nReading content from: {url}")
+    requests = registry.get("requests")
     try:
         # Adding a user-agent header can help avoid being blocked by some websites
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}
-        response = requests.get(url, timeout=10, headers=headers)
+        if page_cache:
+            headers.update(page_cache.conditional_headers(cached))
+        # Stream the body so large pages are parsed as they arrive and cut off once we have enough text
+        response = requests.get(url, timeout=10, headers=headers, stream=True)
+        if response.status_code == 304 and cached:
+            # The page has not changed since we cached it
+            response.close()
+            page_cache.touch(url)
+            return cached.text
         if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            text = soup.get_text(separator=' ', strip=True)
+            text = extract_text_from_response(response)
+            if page_cache and text:
+                page_cache.put(url, text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
             return text
         else:
+            response.close()
             return f"Could not retrieve the webpage. Status code: {response.status_code}"
     except Exception as e:
         return f"An error occurred while reading the webpage: {e}"
 
-def summarize_text(full_text, num_sentences=3):
-    """This function takes a long text and summarizes it."""
+def summarize_text(full_text, num_sentences=3, mode=None):
+    """This function takes a long text and summarizes it (see summarizer.py for the modes)."""
     # --- Improvement: Check if there's any text to summarize ---
     if not full_text or full_text.isspace():
         return "The webpage contained no text to summarize."
         
     print("\nSummarizing the text...")
-    parser = PlaintextParser.from_string(full_text, Tokenizer("english"))
-    summarizer = LsaSummarizer()
-    summary_sentences = summarizer(parser.document, num_sentences)
-    summary = " ".join([str(sentence) for sentence in summary_sentences])
-    return summary
+    return registry.get("summarizer").summarize(full_text, num_sentences, mode)
 
-def get_web_enrichment(description):
+def get_web_enrichment(description, query=None):
     """The main function that runs the whole detective process."""
     print("--- Starting Web Enrichment Process ---")
-    query = find_clues(description)
+    if query is None:
+        query = find_clues(description)
     if not query:
         return "Could not find specific keywords to search."
         
@@ -87,7 +110,8 @@ def get_web_enrichment(description):
     if not links:
         return "No relevant web pages found for the keywords."
         
-    text = read_webpage(links[0])
+    # The local index already holds the page text, so only fetch when it doesn't
+    text = registry.get("search_provider").get_document_text(links[0]) or read_webpage(links[0])
     # --- Improvement: Better checking of the scraped text before summarizing ---
     if text.startswith("Could not retrieve") or text.startswith("An error occurred") or text.startswith("The webpage contained no text"):
         return text # Return the error message directly
@@ -96,9 +120,19 @@ def get_web_enrichment(description):
     print("--- Web Enrichment Process Finished ---")
     return summary
 
+def get_web_enrichment_batch(descriptions, n_process=1):
+    """Enriches a backlog of campaigns, extracting all the keywords in one batched pass first."""
+    queries = find_clues_batch(descriptions, n_process=n_process)
+    return [get_web_enrichment(description, query) for description, query in zip(descriptions, queries)]
+
 # This block allows you to test this file directly if you want
 # by running `python web_enricher.py` in your terminal
+# Pass --profile to also print how long each model and import took.
 if __name__ == '__main__':
+    if '--profile' in sys.argv:
+        warmup()
+        registry.print_profile()
+
     # --- FINAL TEST ---
     campaign = "Help us raise funds for medical treatment for Rohan Gupta suffering from Leukemia at Apollo Hospital Delhi."
     final_result = get_web_enrichment(campaign)
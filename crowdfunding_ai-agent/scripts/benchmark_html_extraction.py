@@ -0,0 +1,85 @@
+# benchmark_html_extraction.py
+#
+# Compares the old read_webpage path (full BeautifulSoup tree + get_text) with the
+# streaming extractor in app/html_stream.py, on synthetic pages or on saved HTML files.
+# Every extractor runs twice: without a text cap, which compares the parsers alone, and
+# with read_webpage's DEFAULT_MAX_CHARS cap, where the streaming extractor can stop early
+# (BeautifulSoup still parses the whole page before its text is cut to the same length).
+#
+#   python benchmark_html_extraction.py                 # synthetic pages of several sizes
+#   python benchmark_html_extraction.py page1.html ...  # your own saved pages
+
+import os
+import sys
+import time
+import random
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from html_stream import extract_text, etree, DEFAULT_MAX_CHARS
+
+REPEATS = 3
+WORDS = ("hospital patient treatment donation campaign doctor surgery family support "
+         "medical funds leukemia apollo delhi community care report news").split()
+
+
+def make_page(target_bytes, seed=42):
+    """Builds a news-like page padded with the script/style/nav noise real sites carry."""
+    rng = random.Random(seed)
+    parts = ["<html><head><title>Campaign news</title><style>body{margin:0}</style></head><body>",
+             "<nav><a href='/'>Home</a><a href='/news'>News</a></nav>"]
+    size = sum(len(p) for p in parts)
+    while size < target_bytes:
+        if rng.random() < 0.2:
+            block = "<script>var data = %s;</script>" % ([rng.random() for _ in range(40)],)
+        else:
+            sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 25)))
+            block = f"<p>{sentence.capitalize()}.</p>"
+        parts.append(block)
+        size += len(block)
+    parts.append("</body></html>")
+    return "".join(parts).encode('utf-8')
+
+
+UNCAPPED = sys.maxsize
+
+
+def soup_path(html_bytes, max_chars=UNCAPPED):
+    soup = BeautifulSoup(html_bytes, 'html.parser')
+    return soup.get_text(separator=' ', strip=True)[:max_chars]
+
+
+def measure(func, html_bytes):
+    """Returns (best wall time in ms, peak traced memory in MB, output length)."""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        text = func(html_bytes)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(html_bytes)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / (1024 * 1024), len(text)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        pages = [(os.path.basename(p), open(p, 'rb').read()) for p in sys.argv[1:]]
+    else:
+        pages = [(f"synthetic {kb} KB", make_page(kb * 1024)) for kb in (50, 500, 5000)]
+
+    extractors = [("BeautifulSoup (old)", soup_path)]
+    if etree is not None:
+        extractors.append(("streaming lxml", lambda b, cap: extract_text(b, max_chars=cap)))
+    extractors.append(("streaming html.parser", lambda b, cap: extract_text(b, max_chars=cap, use_lxml=False)))
+
+    print(f"{'page':<20} {'extractor':<24} {'text cap':>9} {'time ms':>10} {'peak MB':>9} {'chars':>9}")
+    for page_name, html_bytes in pages:
+        for cap, cap_label in ((UNCAPPED, "none"), (DEFAULT_MAX_CHARS, str(DEFAULT_MAX_CHARS))):
+            for name, func in extractors:
+                ms, peak_mb, chars = measure(lambda b: func(b, cap), html_bytes)
+                print(f"{page_name:<20} {name:<24} {cap_label:>9} {ms:>10.1f} {peak_mb:>9.1f} {chars:>9}")
+        print()
@@ -0,0 +1,90 @@
+# benchmark_summarizer.py
+#
+# Latency vs. quality of the summarization modes in app/summarizer.py across page sizes.
+# Quality is ROUGE-1 F1 against the original path (sumy LSA over the *whole*, unfiltered
+# page). If sumy/NLTK data is unavailable, the unfiltered centroid summary is the reference.
+#
+#   python benchmark_summarizer.py                 # synthetic pages of several sizes
+#   python benchmark_summarizer.py page1.txt ...   # your own scraped page texts
+
+import os
+import sys
+import time
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+from model_registry import registry
+from summarizer import Summarizer, SUMMARY_MODES, WORD_PATTERN
+
+NUM_SENTENCES = 3
+TOPIC_WORDS = ("patient hospital leukemia treatment apollo delhi doctors chemotherapy family "
+               "donation funds surgery recovery campaign").split()
+FILLER_WORDS = ("the a of and to in for with on by city council weather market sports "
+                "cricket traffic election season festival report").split()
+BOILERPLATE = ["Home", "Subscribe now", "Share this article", "Advertisement", "Read more", "Sign in"]
+
+
+def make_page(target_bytes, seed=7):
+    """Builds news-page text: a few on-topic sentences among filler and navigation crumbs."""
+    rng = random.Random(seed)
+    parts, size = [], 0
+    while size < target_bytes:
+        roll = rng.random()
+        if roll < 0.15:
+            part = rng.choice(BOILERPLATE)
+        else:
+            vocab = TOPIC_WORDS if roll < 0.35 else FILLER_WORDS
+            words = [rng.choice(vocab) for _ in range(rng.randint(8, 30))]
+            part = " ".join(words).capitalize() + "."
+        parts.append(part)
+        size += len(part) + 1
+    return " ".join(parts)
+
+
+def rouge1_f1(candidate, reference):
+    cand = Counter(WORD_PATTERN.findall(candidate.lower()))
+    ref = Counter(WORD_PATTERN.findall(reference.lower()))
+    overlap = sum((cand & ref).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(cand.values())
+    recall = overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+if __name__ == '__main__':
+    try:
+        registry.get("lsa_summarizer")
+        modes = SUMMARY_MODES
+        reference_mode = "lsa"
+    except Exception as e:
+        print(f"LSA backend unavailable ({e.__class__.__name__}); using unfiltered centroid as the reference.\n")
+        modes = tuple(m for m in SUMMARY_MODES if m != "lsa")
+        reference_mode = "centroid"
+
+    if len(sys.argv) > 1:
+        pages = [(os.path.basename(p), open(p, encoding='utf-8').read()) for p in sys.argv[1:]]
+    else:
+        pages = [(f"synthetic {kb} KB", make_page(kb * 1024)) for kb in (10, 100, 500)]
+
+    # The original behaviour: no filtering and no sentence cap
+    baseline = Summarizer(mode=reference_mode, max_sentences=None, prefilter=False, cache_size=0)
+
+    print(f"{'page':<18} {'mode':<22} {'latency ms':>11} {'ROUGE-1 F1':>11}")
+    for page_name, text in pages:
+        reference, ref_ms = timed(lambda: baseline.summarize(text, NUM_SENTENCES))
+        print(f"{page_name:<18} {reference_mode + ' (unfiltered)':<22} {ref_ms:>11.1f} {1.0:>11.3f}")
+        for mode in modes:
+            summarizer = Summarizer(mode=mode)
+            summary, ms = timed(lambda: summarizer.summarize(text, NUM_SENTENCES))
+            _, cached_ms = timed(lambda: summarizer.summarize(text, NUM_SENTENCES))
+            print(f"{page_name:<18} {mode:<22} {ms:>11.1f} {rouge1_f1(summary, reference):>11.3f}"
+                  f"   (cached: {cached_ms:.2f} ms)")
+        print()
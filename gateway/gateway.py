@@ -0,0 +1,193 @@
+# gateway.py
+#
+# One process that hosts the KYC service (Face_Recognition_service/face_reco.py), the campaign
+# classifier (crowdfunding_ai-agent/app/app.py) and the web enricher, instead of three servers
+# that each load their own models. Everything is loaded once through the shared model registry
+# and all work runs on one thread pool.
+#
+#   /onboard            identity check + genuineness prediction + web enrichment, run concurrently
+#   /onboard/<job_id>   the result of a part that was still running when /onboard answered
+#   /kyc/...            the face_reco.py routes (/kyc/upload, /kyc/verify-liveness, ...)
+#   /classifier/...     the app.py routes (/classifier/predict)
+#
+# Needs the dependencies of both services installed in one environment.
+#
+#   python gateway.py
+
+import os
+import sys
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from flask import Flask, request, jsonify
+from flask_cors import CORS
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+from werkzeug.serving import run_simple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'Face_Recognition_service'))
+sys.path.insert(0, os.path.join(ROOT, 'crowdfunding_ai-agent', 'app'))
+
+from model_registry import registry, timed_import
+
+# --- 1. CONFIGURATION ---
+
+PORT = int(os.getenv("GATEWAY_PORT", 5002))
+WORKERS = int(os.getenv("GATEWAY_WORKERS", 8))
+# Seconds /onboard waits before answering with whatever has finished; a request can ask for less
+LATENCY_BUDGET = float(os.getenv("GATEWAY_LATENCY_BUDGET", 8.0))
+# Tasks queued or running at once; /onboard answers 503 rather than queue more behind them
+MAX_OUTSTANDING = int(os.getenv("GATEWAY_MAX_OUTSTANDING", 4 * WORKERS))
+RESULTS_KEPT = 10000  # finished background parts kept for /onboard/<job_id>, oldest dropped first
+# Models the services register that are loaded at startup. Anything else (e.g. app.py's screener,
+# which starts worker threads) is built on first use.
+WARMUP_MODELS = ["classifier", "keyword_extractor", "search_provider", "summarizer", "lsa_summarizer"]
+
+# Each service module is imported once, on first use or at warmup; importing it loads its models
+registry.register("kyc_service", lambda: timed_import("face_reco"))
+registry.register("classifier_service", lambda: timed_import("app"))
+registry.register("enricher_service", lambda: timed_import("web_enricher"))
+
+pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="gateway")
+outstanding = threading.BoundedSemaphore(MAX_OUTSTANDING)
+jobs = OrderedDict()  # job id -> result of a part that outlived its request
+jobs_lock = threading.Lock()
+
+app = Flask(__name__)
+CORS(app)
+
+
+# --- 2. THE TASKS ---
+
+def run_kyc(doc_img_bytes, live_img_bytes):
+    body, status = registry.get("kyc_service").verify_identity(doc_img_bytes, live_img_bytes)
+    return dict(body, http_status=status)
+
+def run_prediction(description):
+    return {"prediction": registry.get("classifier_service").predict_description(description)}
+
+def run_enrichment(description):
+    return {"summary": registry.get("enricher_service").get_web_enrichment(description)}
+
+def timed(task, *args):
+    """Runs a task and returns (result, error message, seconds taken)."""
+    start = time.perf_counter()
+    try:
+        return task(*args), None, time.perf_counter() - start
+    except Exception as e:
+        return None, str(e), time.perf_counter() - start
+
+def part_result(future):
+    """The response entry for a finished part, and the seconds it took."""
+    result, error, seconds = future.result()
+    return (dict(result, status="done") if error is None else {"status": "error", "message": error}), seconds
+
+def set_job(job_id, value):
+    with jobs_lock:
+        jobs[job_id] = value
+        jobs.move_to_end(job_id)
+        while len(jobs) > RESULTS_KEPT:
+            jobs.popitem(last=False)
+
+def track_job(future):
+    """Gives a still-running part a job id; its result is stored there when it finishes."""
+    job_id = uuid.uuid4().hex
+    set_job(job_id, {"status": "running"})
+    future.add_done_callback(lambda f: set_job(job_id, part_result(f)[0]))
+    return job_id
+
+
+# --- 3. ROUTES ---
+
+@app.route('/')
+def index():
+    return "Daan gateway is running (KYC, classifier and enrichment)."
+
+@app.route('/onboard', methods=['POST'])
+def onboard():
+    """
+    Runs the identity check (files 'document' and 'live_face'), the prediction and the web
+    enrichment (form field 'description') side by side, and answers within the latency budget.
+    Parts still running by then come back as "pending" with a job id for /onboard/<job_id>;
+    parts that never got a worker are cancelled and come back as "cancelled". Either way the
+    response is marked partial.
+    """
+    description = request.form.get('description', '').strip()
+    has_images = 'document' in request.files and 'live_face' in request.files
+    if not description and not has_images:
+        return jsonify({"message": "Send a campaign 'description', and/or 'document' and 'live_face' images."}), 400
+    try:
+        budget = min(float(request.form.get('budget', LATENCY_BUDGET)), LATENCY_BUDGET)
+    except ValueError:
+        return jsonify({"message": "'budget' must be a number of seconds."}), 400
+
+    start = time.perf_counter()
+    tasks = {}
+    if has_images:
+        tasks["identity"] = (run_kyc, request.files['document'].read(), request.files['live_face'].read())
+    if description:
+        tasks["prediction"] = (run_prediction, description)
+        if request.form.get('enrich', 'true').lower() != 'false':
+            tasks["enrichment"] = (run_enrichment, description)
+
+    acquired = 0
+    while acquired < len(tasks) and outstanding.acquire(blocking=False):
+        acquired += 1
+    if acquired < len(tasks):
+        for _ in range(acquired):
+            outstanding.release()
+        return jsonify({"message": "The gateway is busy; try again shortly."}), 503
+    futures = {}
+    for name, task in tasks.items():
+        futures[name] = pool.submit(timed, *task)
+        # Released when the part finishes or is cancelled
+        futures[name].add_done_callback(lambda f: outstanding.release())
+    wait(futures.values(), timeout=budget)
+
+    response = {"partial": False, "timings_ms": {}}
+    for name, future in futures.items():
+        if future.done():
+            response[name], seconds = part_result(future)
+            response["timings_ms"][name] = round(seconds * 1000, 1)
+            continue
+        response["partial"] = True
+        if future.cancel():
+            response[name] = {"status": "cancelled"}
+        else:
+            response[name] = {"status": "pending", "job_id": track_job(future)}
+    response["timings_ms"]["total"] = round((time.perf_counter() - start) * 1000, 1)
+    return jsonify(response)
+
+@app.route('/onboard/<job_id>')
+def onboard_job(job_id):
+    """The result of a part /onboard reported as "pending": "running", "done" or "error"."""
+    with jobs_lock:
+        job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"message": f"Unknown job id '{job_id}'."}), 404
+    return jsonify(job)
+
+@app.route('/profile')
+def profile():
+    """Model load and import times, to see what the gateway's startup is spent on."""
+    return jsonify(registry.profile())
+
+
+# --- 4. MAIN FUNCTION ---
+
+def create_app():
+    """The gateway with the two services' own routes mounted under /kyc and /classifier."""
+    registry.warmup(["kyc_service", "classifier_service", "enricher_service"])
+    registry.warmup(WARMUP_MODELS)
+    return DispatcherMiddleware(app, {
+        "/kyc": registry.get("kyc_service").app,
+        "/classifier": registry.get("classifier_service").app,
+    })
+
+if __name__ == '__main__':
+    gateway = create_app()
+    registry.print_profile()
+    run_simple('0.0.0.0', PORT, gateway, threaded=True)
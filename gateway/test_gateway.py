@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import gateway
+from model_registry import ModelRegistry, registry
+
+
+class StubServices:
+    """Stand-ins for app.py and web_enricher.py; `release` lets a slow enrichment finish."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.prediction_delay = 0.0
+        registry.set("classifier_service", SimpleNamespace(predict_description=self.predict_description))
+        registry.set("enricher_service", SimpleNamespace(get_web_enrichment=self.get_web_enrichment))
+
+    def predict_description(self, description):
+        time.sleep(self.prediction_delay)
+        return "Genuine"
+
+    def get_web_enrichment(self, description):
+        self.release.wait(5)
+        return f"Summary of {description}"
+
+
+@pytest.fixture
+def services():
+    services = StubServices()
+    yield services
+    services.release.set()
+
+
+@pytest.fixture
+def client():
+    return gateway.app.test_client()
+
+
+def test_needs_a_description_or_images(client):
+    assert client.post('/onboard', data={}).status_code == 400
+    assert client.post('/onboard', data={'description': 'x', 'budget': 'soon'}).status_code == 400
+
+
+def test_answers_with_every_finished_part(client, services):
+    services.release.set()
+    body = client.post('/onboard', data={'description': 'School books'}).get_json()
+    assert body["partial"] is False
+    assert body["prediction"] == {"prediction": "Genuine", "status": "done"}
+    assert body["enrichment"] == {"summary": "Summary of School books", "status": "done"}
+    assert set(body["timings_ms"]) == {"prediction", "enrichment", "total"}
+
+
+def test_slow_part_comes_back_pending_with_a_job_id(client, services):
+    body = client.post('/onboard', data={'description': 'School books', 'budget': '0.2'}).get_json()
+    assert body["partial"] is True and body["prediction"]["status"] == "done"
+    job_id = body["enrichment"]["job_id"]
+    assert client.get(f'/onboard/{job_id}').get_json() == {"status": "running"}
+
+    services.release.set()
+    for _ in range(50):
+        job = client.get(f'/onboard/{job_id}').get_json()
+        if job["status"] != "running":
+            break
+        time.sleep(0.05)
+    assert job == {"summary": "Summary of School books", "status": "done"}
+
+
+def test_part_that_never_started_is_cancelled(client, services, monkeypatch):
+    monkeypatch.setattr(gateway, "pool", ThreadPoolExecutor(max_workers=1))
+    services.prediction_delay = 0.5
+    body = client.post('/onboard', data={'description': 'School books', 'budget': '0.1'}).get_json()
+    assert body["prediction"]["status"] == "pending"
+    assert body["enrichment"] == {"status": "cancelled"}
+
+
+def test_busy_gateway_answers_503_and_keeps_its_slots(client, services, monkeypatch):
+    monkeypatch.setattr(gateway, "outstanding", threading.BoundedSemaphore(1))
+    assert client.post('/onboard', data={'description': 'School books'}).status_code == 503
+    services.release.set()
+    body = client.post('/onboard', data={'description': 'School books', 'enrich': 'false'}).get_json()
+    assert body["prediction"]["status"] == "done" and "enrichment" not in body
+
+
+def test_unknown_job_id(client):
+    assert client.get('/onboard/nope').status_code == 404
+
+
+def test_create_app_warms_only_the_listed_models(monkeypatch):
+    fresh = ModelRegistry()
+    monkeypatch.setattr(gateway, "registry", fresh)
+    for name in ["kyc_service", "classifier_service"]:
+        fresh.register(name, lambda: SimpleNamespace(app=gateway.Flask(name)))
+    built = []
+    for name in ["enricher_service"] + gateway.WARMUP_MODELS + ["screener"]:
+        fresh.register(name, lambda name=name: built.append(name) or name)
+    gateway.create_app()
+    assert "screener" not in built
+    assert set(gateway.WARMUP_MODELS) <= set(built)